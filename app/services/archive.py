@@ -0,0 +1,246 @@
+# app/services/archive.py
+"""
+Archival of closed months of the append-only tables (stock_movements, audit_logs).
+
+Rows older than the retention window move into one SQLite file per year next to the
+main database (archive/shop-2024.db, ...), so shop.db stays small: backups, VACUUM and
+every range query only see the recent months. Per product, the net quantity of the
+archived movements is added to stock_opening_balances, the opening line of its
+movement ledger.
+
+Moving a year is two transactions: copy into the archive (INSERT OR IGNORE on the
+original ids), then, after checking every row arrived, delete from the main DB and
+update the balances and archive_files in one commit. A crash in between only leaves
+copies that the next run skips, so running it again is always safe.
+
+history() gives a read-only connection with the archives attached and TEMP views
+all_stock_movements / all_audit_logs spanning current and archived rows.
+
+    python -m app.services.archive [--keep-months 12] [--vacuum] [--db path/to/shop.db]
+"""
+import argparse, sqlite3, time
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+from app.services.db_sqlite3 import ConnectionPool, connect, get_pool
+from app.utils import instrumentation
+from app.utils.quantity import sql_to_milli
+from typing import Dict, List, Optional
+
+ARCHIVE_DIR = "archive"
+
+# table -> indexes created in each archive file (the id is the archive's rowid)
+ARCHIVED_TABLES = {
+    "stock_movements": ("product_id, created_at", "created_at"),
+    "audit_logs": ("entity_type, entity_id", "created_at"),
+}
+
+
+def months_back(months: int, today: Optional[date] = None) -> str:
+    """First day (YYYY-MM-01) of the month `months` before the current one."""
+    today = today or date.today()
+    index = today.year * 12 + today.month - 1 - months
+    return f"{index // 12:04d}-{index % 12 + 1:02d}-01"
+
+
+class ArchiveService:
+    def __init__(self, pool: Optional[ConnectionPool] = None):
+        self.pool = pool or get_pool()
+        self.folder = Path(self.pool.db_path).resolve().parent
+
+    # -----------------------
+    # Archiving
+    # -----------------------
+    def archive(self, keep_months: int = 12) -> Dict[int, Dict[str, int]]:
+        """Archive everything before the last `keep_months` closed months plus the current one."""
+        if keep_months < 0:
+            raise ValueError("keep_months must be >= 0")
+        return self.archive_before(months_back(keep_months))
+
+    def archive_before(self, cutoff: str) -> Dict[int, Dict[str, int]]:
+        """
+        Move rows created before `cutoff` (a YYYY-MM-01 no later than the current
+        month) into the yearly archives. Returns {year: {table: rows moved}}.
+        """
+        if len(cutoff) != 10 or not cutoff.endswith("-01") or cutoff > months_back(0):
+            raise ValueError(f"cutoff must be the first day of a closed month (got {cutoff!r})")
+        if self.pool.in_transaction():
+            raise RuntimeError("archive cannot run inside a transaction (ATTACH needs autocommit)")
+
+        with self.pool.read() as conn:
+            oldest = [conn.execute(f"SELECT MIN(created_at) FROM {table}").fetchone()[0]
+                      for table in ARCHIVED_TABLES]
+        oldest = [value for value in oldest if value and value < cutoff]
+        if not oldest:
+            return {}
+
+        moved = {}
+        first_year = int(min(oldest)[:4])
+        last_year = int(cutoff[:4]) - (1 if cutoff[5:7] == "01" else 0)
+        for year in range(first_year, last_year + 1):
+            hi = min(f"{year + 1:04d}-01-01", cutoff)
+            lo = f"{year:04d}-01-01" if year > first_year else ""  # "" also sweeps odd older values
+            counts = self._archive_range(year, lo, hi)
+            if any(counts.values()):
+                moved[year] = counts
+        return moved
+
+    def _archive_range(self, year: int, lo: str, hi: str) -> Dict[str, int]:
+        file = f"{ARCHIVE_DIR}/{Path(self.pool.db_path).stem}-{year}.db"
+        (self.folder / ARCHIVE_DIR).mkdir(exist_ok=True)
+        with self.pool.write() as conn:
+            conn.execute("ATTACH DATABASE ? AS arc", (str(self.folder / file),))
+            try:
+                # 1) copy; committed on its own so a failure below never loses rows
+                with self.pool.transaction():
+                    columns = {table: self._ensure_archive_table(conn, table) for table in ARCHIVED_TABLES}
+                    for table, cols in columns.items():
+                        conn.execute(f"""
+                            INSERT OR IGNORE INTO arc.{table} ({cols})
+                            SELECT {cols} FROM main.{table} WHERE created_at >= ? AND created_at < ?
+                        """, (lo, hi))
+
+                # 2) verify, fold into opening balances, delete
+                with self.pool.transaction():
+                    for table in ARCHIVED_TABLES:
+                        missing = conn.execute(f"""
+                            SELECT COUNT(*) FROM main.{table} m
+                            WHERE m.created_at >= ? AND m.created_at < ?
+                              AND NOT EXISTS (SELECT 1 FROM arc.{table} a WHERE a.id = m.id)
+                        """, (lo, hi)).fetchone()[0]
+                        if missing:
+                            raise RuntimeError(f"{missing} {table} rows were not copied to {file}")
+                    conn.execute("""
+                        INSERT INTO stock_opening_balances (product_id, qty_milli)
+                        SELECT product_id, SUM(qty_milli) FROM main.stock_movements
+                        WHERE created_at >= ? AND created_at < ?
+                        GROUP BY product_id
+                        ON CONFLICT(product_id) DO UPDATE SET qty_milli = qty_milli + excluded.qty_milli
+                    """, (lo, hi))
+                    counts = {}
+                    for table in ARCHIVED_TABLES:
+                        counts[table] = conn.execute(
+                            f"DELETE FROM main.{table} WHERE created_at >= ? AND created_at < ?", (lo, hi)
+                        ).rowcount
+                    conn.execute("""
+                        INSERT INTO archive_files (year, file, archived_through, stock_movements, audit_logs)
+                        VALUES (?, ?, ?, ?, ?)
+                        ON CONFLICT(year) DO UPDATE SET
+                          archived_through = MAX(archived_through, excluded.archived_through),
+                          stock_movements = stock_movements + excluded.stock_movements,
+                          audit_logs = audit_logs + excluded.audit_logs
+                    """, (year, file, hi, counts["stock_movements"], counts["audit_logs"]))
+            finally:
+                conn.execute("DETACH DATABASE arc")
+        return counts
+
+    @staticmethod
+    def _ensure_archive_table(conn: sqlite3.Connection, table: str) -> str:
+        """
+        Create (or add missing columns to) arc.<table> with the main table's columns.
+        Archives written before quantities became milli-units get qty_milli filled
+        from their REAL qty. Returns the column list to copy.
+        """
+        main_cols = [(row[1], row[2]) for row in conn.execute(f"PRAGMA main.table_info({table})")]
+        have = {row[1] for row in conn.execute(f"PRAGMA arc.table_info({table})")}
+        if not have:
+            defs = ", ".join(f"{name} INTEGER PRIMARY KEY" if name == "id" else f"{name} {decl}"
+                             for name, decl in main_cols)
+            conn.execute(f"CREATE TABLE arc.{table} ({defs})")
+            for i, index_cols in enumerate(ARCHIVED_TABLES[table]):
+                conn.execute(f"CREATE INDEX arc.{table}_idx{i} ON {table}({index_cols})")
+        else:
+            for name, decl in main_cols:
+                if name not in have:
+                    conn.execute(f"ALTER TABLE arc.{table} ADD COLUMN {name} {decl}")
+                    if name == "qty_milli" and "qty" in have:
+                        conn.execute(f"UPDATE arc.{table} SET qty_milli = {sql_to_milli('qty')}")
+        return ", ".join(name for name, _ in main_cols)
+
+    def compact(self):
+        """VACUUM the main DB to hand the space of archived rows back to the file system."""
+        with self.pool.write() as conn:
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    # -----------------------
+    # Reading
+    # -----------------------
+    def archives(self) -> List[tuple]:
+        """(year, file, archived_through, stock_movements, audit_logs), oldest first."""
+        with self.pool.read() as conn:
+            return conn.execute("""
+                SELECT year, file, archived_through, stock_movements, audit_logs
+                FROM archive_files ORDER BY year
+            """).fetchall()
+
+    def opening_balance(self, product_id: int) -> int:
+        with self.pool.read() as conn:
+            row = conn.execute("SELECT qty_milli FROM stock_opening_balances WHERE product_id = ?",
+                               (product_id,)).fetchone()
+        return row[0] if row else 0
+
+    @staticmethod
+    def _archived_column(name: str, have: set) -> str:
+        if name in have:
+            return name
+        if name == "qty_milli" and "qty" in have:  # archive not written to since milli-units
+            return f"{sql_to_milli('qty')} AS qty_milli"
+        return f"NULL AS {name}"
+
+    @contextmanager
+    def history(self):
+        """
+        Read-only connection on the main DB with every archive attached (archive_<year>)
+        and TEMP views all_stock_movements / all_audit_logs over current + archived rows.
+        Filter on created_at so SQLite can skip whole archives by their indexes.
+        """
+        conn = connect(self.pool.db_path, read_only=True)
+        try:
+            attached = []
+            for year, file, *_ in conn.execute("SELECT year, file FROM archive_files ORDER BY year").fetchall():
+                path = self.folder / file
+                if path.exists():
+                    conn.execute(f"ATTACH DATABASE ? AS archive_{year}", (path.as_uri() + "?mode=ro",))
+                    attached.append(f"archive_{year}")
+                else:
+                    instrumentation.count("warnings: archive file missing")
+                    instrumentation.log.warning("archive file missing, history will not include it: %s", path)
+
+            conn.execute("PRAGMA query_only = OFF")  # TEMP views only; the files stay mode=ro
+            for table in ARCHIVED_TABLES:
+                cols = [row[1] for row in conn.execute(f"PRAGMA main.table_info({table})")]
+                parts = [f"SELECT {', '.join(cols)} FROM main.{table}"]
+                for schema in attached:
+                    have = {row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})")}
+                    if have:
+                        select = ", ".join(self._archived_column(c, have) for c in cols)
+                        parts.append(f"SELECT {select} FROM {schema}.{table}")
+                conn.execute(f"CREATE TEMP VIEW all_{table} AS {' UNION ALL '.join(parts)}")
+            conn.execute("PRAGMA query_only = ON")
+            yield conn
+        finally:
+            conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Move closed months of stock movements and audit log into yearly archives.")
+    parser.add_argument("--keep-months", type=int, default=12, help="closed months to keep in the main DB (default 12)")
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM the main DB afterwards to shrink the file")
+    parser.add_argument("--db", help="database path (default: the app's shop.db)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    service = ArchiveService(get_pool(args.db))
+    moved = service.archive(args.keep_months)
+    for year, counts in moved.items():
+        print(f"{year}: {counts['stock_movements']} stock movements, {counts['audit_logs']} audit rows archived")
+    if not moved:
+        print(f"Nothing older than {months_back(args.keep_months)} to archive")
+    if args.vacuum:
+        service.compact()
+    print(f"Done in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
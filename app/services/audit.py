@@ -0,0 +1,70 @@
+# app/services/audit.py
+"""
+Structured audit log.
+
+Services call pool.audit.record(...) inside their transaction. Events are only
+appended to a per-transaction buffer; one executemany writes them all right before
+COMMIT (ConnectionPool.before_commit), so they commit or roll back together with the
+business change and cost one statement per transaction instead of one per event.
+
+Rows (audit_logs, migration 5): entity_type, action, entity_id, field and a JSON
+payload ({"old": ..., "new": ...} plus any extra keys). details keeps the readable
+text for tools that only read that column: "sell_price: 12000 -> 12500" for a field
+change, else the action and its extra keys ("import file=list.csv rows=120").
+
+Stock movements (StockService.apply_movements) record one "stock_movement" event per
+line: reason, qty_milli, the running new_stock_milli and reference_id.
+"""
+import json
+from typing import Any, Optional
+
+_INSERT = """
+    INSERT INTO audit_logs (entity_type, action, details, entity_id, field, payload)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+_BUFFER_KEY = "audit"
+
+# json.dumps(...) with options builds a new encoder per call; reuse one
+_encode_payload = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=str).encode
+
+
+def _details(action: str, field: Optional[str], old: Any, new: Any, extra: dict) -> str:
+    if field is not None:
+        return f"{field}: {old} -> {new}"
+    if extra:
+        return action + " " + " ".join(f"{key}={value}" for key, value in extra.items())
+    return action
+
+
+class AuditLog:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def record(self, entity_type: str, action: str, entity_id: Optional[int] = None,
+               field: Optional[str] = None, old: Any = None, new: Any = None, **extra):
+        """Queue one audit event (writes it straight away when called outside a transaction)."""
+        state = self.pool.transaction_state()
+        if state is None:
+            with self.pool.transaction():
+                self.record(entity_type, action, entity_id, field, old, new, **extra)
+            return
+        buffer = state.get(_BUFFER_KEY)
+        if buffer is None:
+            buffer = state[_BUFFER_KEY] = []
+            self.pool.before_commit(lambda conn: self._flush(conn, buffer))
+        # payload is serialised at flush time, once per event, with no text formatting
+        buffer.append((entity_type, action, entity_id, field, old, new, extra))
+
+    @staticmethod
+    def _flush(conn, buffer):
+        if not buffer:
+            return
+        rows = []
+        for entity_type, action, entity_id, field, old, new, extra in buffer:
+            payload = {"old": old, "new": new} if field is not None else {}
+            payload.update(extra)
+            rows.append((entity_type, action, _details(action, field, old, new, extra), entity_id, field,
+                         _encode_payload(payload) if payload else None))
+        conn.executemany(_INSERT, rows)
+        buffer.clear()
@@ -0,0 +1,385 @@
+# app/services/catalog_cache.py
+import json, sys, threading
+from array import array
+from itertools import compress, repeat
+from operator import le, mul
+from app.services.db_sqlite3 import ConnectionPool, get_pool
+from app.services import product_queries as q
+from app.services.product_queries import ProductRecord, ProductRow
+from app.services.events import EventBus, ProductChange, STOCK, DELETED, BULK_CHANGE
+from app.services.query_trace import hot_path
+from app.utils.instrumentation import timed
+from typing import Dict, Iterable, List, Optional
+
+LOAD_CHUNK = 5000  # rows fetched at a time while loading (bounds the load's peak memory)
+
+# CatalogCache columns: app.services.product_queries.CATALOG_COLUMNS, the text ones as
+# StringTable ids, prices (paisa) and quantities (milli-units) as 64-bit ints
+_ALL_COLUMNS = q.CATALOG_COLUMNS
+_TEXT_COLUMNS = frozenset({"short_code", "barcode", "ur_name", "en_name", "company", "unit"})
+_INTERNED = frozenset({"company", "unit"})  # few distinct values: each stored once
+
+
+def _new_columns() -> Dict[str, array]:
+    return {name: array("i" if name in _TEXT_COLUMNS else "q") for name in _ALL_COLUMNS}
+
+
+class StringTable:
+    """
+    Strings packed as UTF-8 into one bytearray and referred to by int ids (0 is None),
+    instead of one Python str object (~50 bytes of header each) per product field.
+    intern() stores a text once however often it is given (company, unit names) and
+    find() looks such a text up; add() always appends (names and codes, which are
+    nearly all distinct, so a lookup dict would cost more than it saves).
+    """
+
+    def __init__(self):
+        self._blob = bytearray()
+        self._ends = array("q", [0])  # string i is _blob[_ends[i - 1]:_ends[i]]
+        self._ids: Dict[str, int] = {}
+
+    def add(self, text: Optional[str]) -> int:
+        if text is None:
+            return 0
+        self._blob += text.encode("utf-8")
+        self._ends.append(len(self._blob))
+        return len(self._ends) - 1
+
+    def intern(self, text: Optional[str]) -> int:
+        if text is None:
+            return 0
+        sid = self._ids.get(text)
+        if sid is None:
+            sid = self._ids[text] = self.add(text)
+        return sid
+
+    def find(self, text: str) -> Optional[int]:
+        """Id of an interned `text` (never adds it)."""
+        return self._ids.get(text)
+
+    def __getitem__(self, sid: int) -> Optional[str]:
+        if not sid:
+            return None
+        return self._blob[self._ends[sid - 1]:self._ends[sid]].decode("utf-8")
+
+    def __len__(self):
+        return len(self._ends) - 1
+
+    def memory(self) -> Dict[str, int]:
+        return {
+            "strings": sys.getsizeof(self._blob) + sys.getsizeof(self._ends),
+            "string index": sys.getsizeof(self._ids) + sum(sys.getsizeof(text) for text in self._ids),
+        }
+
+
+class CatalogCache:
+    """
+    The whole product catalog in memory, column by column: ids, prices (paisa) and
+    quantities (milli-units) in array('q'), the text fields as ids into one StringTable.
+    A product is a slot, the same index in every column; `_slots` maps product id ->
+    slot (an array indexed by id: ids are SQLite's dense rowids) and the slots of
+    deleted products are reused.
+
+    Filters (low stock, by company, ...) go over whole columns in C: map / compress
+    over the arrays, or a bytes search of the column's buffer for an equal id, with no
+    DB round trip. It is where the app reads product data from: ProductIndex maps
+    scanner codes to ids and takes the records from get(), the products list pages ids
+    in name order and takes its rows from page() / rows().
+
+    Loaded once (one streamed SELECT) and then kept current from the pool's product
+    change events: stock changes are written into the stock column, created / updated
+    products are re-read by id, deleted ones free their slot. Changes that arrive while
+    load() runs are queued and applied after it, so they win over the loaded rows. Each
+    applied change is then published on `changes`, for screens that must not read the
+    cache before it has caught up. Text replaced by an edit stays in the StringTable
+    until the next load().
+    """
+
+    def __init__(self, pool: Optional[ConnectionPool] = None):
+        self.pool = pool or get_pool()
+        self._lock = threading.Lock()
+        self.columns: Dict[str, array] = _new_columns()
+        self.strings = StringTable()
+        self._slots = array("i")  # product id -> slot, -1 for none
+        self._free: List[int] = []
+        self._count = 0
+        self._pending: Optional[List[ProductChange]] = None  # changes held back while loading
+        self.changes = EventBus()  # each ProductChange once it is applied here
+
+    @timed
+    def load(self):
+        with self._lock:
+            self._pending = []
+        try:
+            columns, strings = _new_columns(), StringTable()
+            with self.pool.read() as conn:
+                cur = q.CATALOG_ALL.execute(conn)
+                while True:
+                    rows = cur.fetchmany(LOAD_CHUNK)
+                    if not rows:
+                        break
+                    for name, values in zip(_ALL_COLUMNS, zip(*rows)):
+                        if name in _TEXT_COLUMNS:
+                            values = map(strings.intern if name in _INTERNED else strings.add, values)
+                        elif name != "id":
+                            values = (v or 0 for v in values)
+                        columns[name].extend(values)
+            ids = columns["id"]
+            slots = array("i", [-1]) * ((ids[-1] if ids else 0) + 1)  # ids come in order
+            for slot, product_id in enumerate(ids):
+                slots[product_id] = slot
+        except BaseException:
+            self._apply_pending()  # the old columns stay: keep them current
+            raise
+        with self._lock:
+            self.columns, self.strings, self._slots, self._free, self._count = columns, strings, slots, [], len(ids)
+        self._apply_pending()  # committed during the load: newer than what it read
+
+    def _apply_pending(self):
+        while True:  # changes keep queueing behind until the queue is empty: order is kept
+            with self._lock:
+                pending = self._pending
+                self._pending = [] if pending else None
+            if not pending:
+                return
+            for change in pending:
+                self._apply(change)
+
+    # -----------------------
+    # Lookups
+    # -----------------------
+    def get(self, product_id: int) -> Optional[ProductRecord]:
+        with self._lock:  # slot and columns from the same load()
+            slot = self._slot(product_id)
+            if slot is None:
+                return None
+            c, s = self.columns, self.strings
+            return ProductRecord(product_id, s[c["short_code"][slot]], s[c["barcode"][slot]], s[c["ur_name"][slot]],
+                                 s[c["en_name"][slot]], s[c["unit"][slot]], c["sell_price"][slot],
+                                 c["stock_milli"][slot])
+
+    def sell_price_of(self, product_id: int) -> Optional[int]:
+        return self._value(product_id, "sell_price")
+
+    def stock_of(self, product_id: int) -> Optional[int]:
+        return self._value(product_id, "stock_milli")
+
+    def row(self, product_id: int) -> Optional[ProductRow]:
+        """The products list projection of one product (ProductService.fetch_rows)."""
+        with self._lock:
+            return self._row(product_id)
+
+    def rows(self, product_ids: Iterable[int]) -> List[ProductRow]:
+        """List rows of these products, in the given order; ids not in the cache are skipped."""
+        with self._lock:
+            return [row for row in map(self._row, product_ids) if row is not None]
+
+    @timed
+    @hot_path
+    def page(self, after: Optional[tuple] = None, limit: int = 200) -> List[ProductRow]:
+        """
+        One window of the products list in (ur_name, id) order, as ProductService.fetch_page:
+        the ids come from the ur_name index (a keyset range read of the index alone), the
+        rows from the columns. A product committed but not yet here is read in first.
+        """
+        with self.pool.read() as conn:
+            if after is None:
+                ids = [pid for (pid,) in q.PRODUCT_PAGE_IDS_FIRST.rows(conn, (limit,))]
+            else:
+                ids = [pid for (pid,) in q.PRODUCT_PAGE_IDS_AFTER.rows(conn, (after[0], after[1], limit))]
+        missing = [pid for pid in ids if pid not in self]
+        if missing:
+            self.refresh(missing)
+        return self.rows(ids)
+
+    def _row(self, product_id: int) -> Optional[ProductRow]:
+        slot = self._slot(product_id)
+        if slot is None:
+            return None
+        c, s = self.columns, self.strings
+        return ProductRow(product_id, s[c["short_code"][slot]], s[c["ur_name"][slot]], s[c["en_name"][slot]],
+                          s[c["company"][slot]], c["base_price"][slot], c["sell_price"][slot],
+                          c["stock_milli"][slot], s[c["unit"][slot]], c["custom_packing"][slot],
+                          c["packing_size_milli"][slot] or None, c["reorder_threshold_milli"][slot])
+
+    def _value(self, product_id: int, name: str) -> Optional[int]:
+        with self._lock:
+            slot = self._slot(product_id)
+            return None if slot is None else self.columns[name][slot]
+
+    def _slot(self, product_id: int) -> Optional[int]:
+        if 0 < product_id < len(self._slots):
+            slot = self._slots[product_id]
+            if slot >= 0:
+                return slot
+        return None
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, product_id):
+        return self._slot(product_id) is not None
+
+    # -----------------------
+    # Column filters (product ids, ascending)
+    # -----------------------
+    @timed
+    def low_stock(self) -> List[int]:
+        """Products at or below their reorder threshold (as ReorderService.LOW_STOCK_WHERE)."""
+        with self._lock:
+            c = self.columns
+            ids, threshold = c["id"], c["reorder_threshold_milli"]
+            at_or_below = compress(range(len(ids)), map(le, c["stock_milli"], threshold))
+            return sorted(ids[slot] for slot in at_or_below if threshold[slot] > 0)
+
+    @timed
+    def out_of_stock(self) -> List[int]:
+        with self._lock:
+            c = self.columns
+            return sorted(pid for pid in compress(c["id"], map(le, c["stock_milli"], repeat(0))) if pid)
+
+    @timed
+    def by_company(self, company: str) -> List[int]:
+        """Products of one company (exact name)."""
+        with self._lock:
+            sid = self.strings.find(company)
+            return [] if sid is None else self._equal("company", sid)
+
+    def _equal(self, name: str, sid: int) -> List[int]:
+        """Ids of the products whose text column `name` holds string id `sid`."""
+        column, ids = self.columns[name], self.columns["id"]
+        data, wanted, size = column.tobytes(), array(column.typecode, [sid]).tobytes(), column.itemsize
+        found = []
+        at = data.find(wanted)
+        while at >= 0:
+            if at % size == 0:  # a match straddling two items is not one
+                found.append(ids[at // size])
+            at = data.find(wanted, at + 1)
+        return sorted(found)
+
+    def stock_value(self) -> int:
+        """Stock at cost, in paisa: sum of stock x base price."""
+        with self._lock:
+            return sum(map(mul, self.columns["stock_milli"], self.columns["base_price"])) // 1000
+
+    # -----------------------
+    # Maintenance
+    # -----------------------
+    def refresh(self, product_ids: List[int]):
+        """Re-read these products (after create / update); ids no longer in the DB are dropped."""
+        with self.pool.read() as conn:
+            rows = q.CATALOG_ROWS.rows(conn, (json.dumps(list(product_ids)),))
+        with self._lock:
+            for row in rows:
+                self._set_row(row)
+            found = {row[0] for row in rows}
+            for product_id in product_ids:
+                if product_id not in found:
+                    self._remove(product_id)
+
+    def remove(self, product_id: int):
+        with self._lock:
+            self._remove(product_id)
+
+    def set_stock(self, stock: Dict[int, int]):
+        with self._lock:
+            for product_id, stock_milli in stock.items():
+                slot = self._slot(product_id)
+                if slot is not None:
+                    self.columns["stock_milli"][slot] = stock_milli
+
+    def on_change(self, change: ProductChange):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(change)  # load() applies it once the new columns are in
+                return
+        self._apply(change)
+
+    def _apply(self, change: ProductChange):
+        if change.kind == STOCK:
+            self.set_stock(change.stock)
+        elif change.kind == DELETED:
+            for product_id in change.product_ids:
+                self.remove(product_id)
+        elif len(change.product_ids) > BULK_CHANGE:
+            self.load()
+        else:
+            self.refresh(change.product_ids)
+        self.changes.publish(change)
+
+    def _set_row(self, row):
+        product_id = row[0]
+        slot = self._slot(product_id)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+            else:
+                slot = len(self.columns["id"])
+                for column in self.columns.values():
+                    column.append(0)
+            if product_id >= len(self._slots):
+                self._slots.extend(repeat(-1, product_id + 1 - len(self._slots)))
+            self._slots[product_id] = slot
+            self._count += 1
+        for name, value in zip(_ALL_COLUMNS, row):
+            column = self.columns[name]
+            if name in _INTERNED:
+                column[slot] = self.strings.intern(value)
+            elif name in _TEXT_COLUMNS:
+                if self.strings[column[slot]] != value:  # unchanged text is not stored again
+                    column[slot] = self.strings.add(value)
+            else:
+                column[slot] = value or 0
+
+    def _remove(self, product_id: int):
+        slot = self._slot(product_id)
+        if slot is None:
+            return
+        self._slots[product_id] = -1
+        for column in self.columns.values():  # id 0 and zero values: no filter matches a free slot
+            column[slot] = 0
+        self._free.append(slot)
+        self._count -= 1
+
+    # -----------------------
+    # Memory
+    # -----------------------
+    def memory_report(self) -> Dict[str, int]:
+        """Approximate bytes held, by part (sys.getsizeof), and their "total"."""
+        with self._lock:
+            report = {"columns": sum(sys.getsizeof(column) for column in self.columns.values())}
+            report.update(self.strings.memory())
+            report["slot map"] = sys.getsizeof(self._slots) + sys.getsizeof(self._free)
+        report["total"] = sum(report.values())
+        return report
+
+    def format_memory(self) -> str:
+        report = self.memory_report()
+        parts = ", ".join(f"{name} {size / 2 ** 20:.1f}" for name, size in report.items() if name != "total")
+        return (f"catalog cache: {len(self)} products, {len(self.strings)} strings, "
+                f"{report['total'] / 2 ** 20:.1f} MB ({parts})")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_catalog_cache() -> CatalogCache:
+    """
+    Process-wide catalog cache, loaded on first use (main() has get_product_index()
+    load it at startup). It subscribes before loading: changes committed during the
+    load are held back and applied after it, none is lost.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            cache = CatalogCache()
+            cache.pool.events.subscribe(cache.on_change)
+            cache.load()
+            _cache = cache
+        return _cache
+
+
+def loaded_catalog_cache() -> Optional[CatalogCache]:
+    """The process-wide cache if it is loaded yet (diagnostics), without loading it."""
+    return _cache
@@ -0,0 +1,322 @@
+# app/services/catalog_import.py
+"""
+Bulk catalog import from a wholesaler's CSV / XLSX price list.
+
+The file is read as a stream (csv module / openpyxl read-only mode), validated in
+chunks of CHUNK_ROWS and upserted on barcode with one executemany per chunk, all in a
+single transaction: the import lands completely or not at all, with one commit, one
+audit event and one product change event instead of one of each per product.
+
+Columns are matched on the header row (see HEADERS); only barcode is required. A blank
+cell keeps the product's current value, rows that change nothing are not written.
+stock_qty is the opening stock of new products (booked as an inventory_correction
+movement); stock of existing products only changes through stock movements.
+Rejected rows are reported with their line number and reason, the rest is imported.
+
+    python -m app.services.catalog_import prices.csv [--rejects rejects.csv] [--db path/to/shop.db]
+
+.xlsx files need openpyxl (pip install openpyxl); CSV has no extra dependency.
+"""
+import argparse, csv, time
+from datetime import datetime
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from pathlib import Path
+from app.services.db_sqlite3 import ConnectionPool, get_pool
+from app.services.events import ProductChange, CREATED, UPDATED
+from app.services.migrations import fts_insert_trigger_suspended, reindex_products_fts
+from app.utils.quantity import MILLI, scaled_int, to_milli
+from app.utils.instrumentation import timed
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+CHUNK_ROWS = 5000
+
+# header (lower case, spaces -> _) -> field
+HEADERS = {
+    "barcode": "barcode", "ean": "barcode",
+    "short_code": "short_code", "code": "short_code",
+    "ur_name": "ur_name", "urdu_name": "ur_name",
+    "en_name": "en_name", "name": "en_name", "english_name": "en_name",
+    "company": "company", "brand": "company",
+    "base_price": "base_price", "cost": "base_price", "cost_price": "base_price", "purchase_price": "base_price",
+    "sell_price": "sell_price", "price": "sell_price", "sale_price": "sell_price", "retail_price": "sell_price",
+    "unit": "unit",
+    "stock_qty": "stock_qty", "stock": "stock_qty",
+    "reorder_threshold": "reorder_threshold",
+    "packing_size": "packing_size",
+    "supply_pack_qty": "supply_pack_qty", "pack_size": "supply_pack_qty",
+}
+
+UNITS = {"kg": "kg", "kgs": "kg", "gram": "gram", "g": "gram", "grams": "gram",
+         "ltr": "ltr", "l": "ltr", "litre": "ltr", "liter": "ltr", "ml": "ml",
+         "pcs": "pcs", "pc": "pcs", "piece": "pcs", "pieces": "pcs"}
+
+# upserted columns after barcode, in parameter order (?2 ...); stock_milli and the
+# timestamp follow. A NULL parameter keeps the current value on update.
+_COLUMNS = ("short_code", "ur_name", "en_name", "company", "base_price", "sell_price", "unit",
+            "reorder_threshold_milli", "packing_size_milli", "supply_pack_milli")
+# NOT NULL is checked on the candidate row before the barcode conflict, so ur_name needs
+# a value even for updates (new products always have one, see _row)
+_INSERT_DEFAULTS = {"ur_name": "''", "base_price": "0", "sell_price": "0", "unit": "'kg'",
+                    "reorder_threshold_milli": "0", "supply_pack_milli": str(MILLI)}
+
+
+def _upsert_sql() -> str:
+    params = {col: f"?{i}" for i, col in enumerate(_COLUMNS, start=2)}
+    stock, now = f"?{len(_COLUMNS) + 2}", f"?{len(_COLUMNS) + 3}"
+    values = ", ".join(f"COALESCE({params[c]}, {_INSERT_DEFAULTS[c]})" if c in _INSERT_DEFAULTS else params[c]
+                       for c in _COLUMNS)
+    return f"""
+        INSERT INTO products (barcode, {", ".join(_COLUMNS)}, stock_milli, created_at, updated_at)
+        VALUES (?1, {values}, {stock}, {now}, {now})
+        ON CONFLICT(barcode) DO UPDATE SET
+          {", ".join(f"{c} = COALESCE({params[c]}, {c})" for c in _COLUMNS)},
+          updated_at = {now}
+        WHERE {" OR ".join(f"COALESCE({params[c]}, {c}) IS NOT {c}" for c in _COLUMNS)}
+    """
+
+
+_UPSERT = _upsert_sql()
+
+
+def _text(value) -> Optional[str]:
+    """Cell -> stripped text, None when blank. Whole floats (XLSX barcodes) lose the .0."""
+    if value.__class__ is str:  # every CSV cell
+        return value.strip() or None
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip() or None
+
+
+def _paisa(text: Optional[str]) -> Optional[int]:
+    """Rupees -> paisa, exact (half-up); None when blank."""
+    if text is None:
+        return None
+    text = text.replace(",", "")
+    paisa = scaled_int(text, 2)
+    if paisa is not None:
+        return paisa
+    try:
+        paisa = (Decimal(text) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP)
+    except InvalidOperation:
+        raise ValueError(f"invalid price {text!r}") from None
+    if not paisa.is_finite() or paisa < 0:
+        raise ValueError(f"invalid price {text!r}")
+    return int(paisa)
+
+
+def _milli(text: Optional[str], field: str) -> Optional[int]:
+    if text is None:
+        return None
+    milli = to_milli(text)
+    if milli < 0:
+        raise ValueError(f"{field} cannot be negative")
+    return milli
+
+
+class ImportResult:
+    """Outcome of one catalog import."""
+    __slots__ = ("rows", "created", "updated", "unchanged", "rejected", "ignored_columns", "seconds")
+
+    def __init__(self):
+        self.rows = 0                  # data rows read
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0             # valid rows that matched the product as it was
+        self.rejected: List[Tuple[int, str]] = []   # (line number, reason)
+        self.ignored_columns: List[str] = []
+        self.seconds = 0.0
+
+    def __repr__(self):
+        return (f"ImportResult(rows={self.rows}, created={self.created}, updated={self.updated}, "
+                f"unchanged={self.unchanged}, rejected={len(self.rejected)})")
+
+
+class CatalogImporter:
+    def __init__(self, pool: Optional[ConnectionPool] = None):
+        self.pool = pool or get_pool()
+
+    # -----------------------
+    # Reading
+    # -----------------------
+    @staticmethod
+    def read_rows(path) -> Iterator[Tuple[int, list]]:
+        """(line number, cell values) for every row of a CSV or XLSX file, header included."""
+        path = Path(path)
+        suffix = path.suffix.lower()
+        if suffix in (".csv", ".txt"):
+            with open(path, newline="", encoding="utf-8-sig") as f:
+                try:
+                    dialect = csv.Sniffer().sniff(f.read(64 * 1024), delimiters=",;\t|")
+                except csv.Error:
+                    dialect = csv.excel
+                f.seek(0)
+                for line, row in enumerate(csv.reader(f, dialect), start=1):
+                    yield line, row
+        elif suffix in (".xlsx", ".xlsm"):
+            try:
+                from openpyxl import load_workbook
+            except ImportError:
+                raise ValueError("importing .xlsx files needs openpyxl (pip install openpyxl)") from None
+            workbook = load_workbook(path, read_only=True, data_only=True)
+            try:
+                for line, row in enumerate(workbook.active.iter_rows(values_only=True), start=1):
+                    yield line, list(row)
+            finally:
+                workbook.close()
+        else:
+            raise ValueError(f"unsupported file type {suffix!r} (use .csv or .xlsx)")
+
+    # -----------------------
+    # Import
+    # -----------------------
+    @timed
+    def import_file(self, path, created_by: Optional[str] = None,
+                    progress: Optional[Callable[[ImportResult], None]] = None) -> ImportResult:
+        """
+        Upsert every valid row of `path` in one transaction. progress(result) is called
+        after each chunk. Raises ValueError when the file has no barcode column.
+        """
+        start = time.perf_counter()
+        result = ImportResult()
+        rows = self.read_rows(path)
+        header = next(rows, (0, []))[1]
+        fields = []  # (cell index, field)
+        for i, name in enumerate(header):
+            key = (_text(name) or "").lower().replace(" ", "_")
+            if key in HEADERS:
+                fields.append((i, HEADERS[key]))
+            elif key:
+                result.ignored_columns.append(str(name))
+        if not any(field == "barcode" for _, field in fields):
+            raise ValueError("the file needs a barcode column")
+
+        now = datetime.now().isoformat()
+        with self.pool.transaction() as conn:
+            # barcode -> short_code of every product: new vs existing, short code owners
+            short_code_of = dict(conn.execute("SELECT barcode, short_code FROM products WHERE barcode IS NOT NULL"))
+            owner = {code: barcode for barcode, code in short_code_of.items() if code is not None}
+            owner.update(conn.execute("SELECT short_code, NULL FROM products WHERE barcode IS NULL AND short_code IS NOT NULL"))
+
+            with fts_insert_trigger_suspended(conn):
+                chunk = []
+                for line, cells in rows:
+                    values = {field: _text(cells[i]) for i, field in fields if i < len(cells)}
+                    if not any(values.values()):
+                        continue  # blank line
+                    result.rows += 1
+                    try:
+                        chunk.append(self._row(values, short_code_of, owner, now))
+                    except ValueError as e:
+                        result.rejected.append((line, str(e)))
+                    if len(chunk) >= CHUNK_ROWS:
+                        conn.executemany(_UPSERT, chunk)
+                        chunk = []
+                        if progress:
+                            progress(result)
+                if chunk:
+                    conn.executemany(_UPSERT, chunk)
+                # rows written by this import carry its timestamp
+                reindex_products_fts(conn, "p.created_at = ? AND p.updated_at = ?", (now, now))
+
+            touched = conn.execute("SELECT id, created_at = ? FROM products WHERE updated_at = ?", (now, now)).fetchall()
+            created = [pid for pid, new in touched if new]
+            updated = [pid for pid, new in touched if not new]
+            conn.execute("""
+                INSERT INTO stock_movements (product_id, qty_milli, reason, related_doc, unit, created_at, created_by)
+                SELECT id, stock_milli, 'inventory_correction', 'catalog import', unit, ?, ?
+                FROM products WHERE created_at = ? AND updated_at = ? AND stock_milli <> 0
+            """, (now, created_by, now, now))
+            result.created, result.updated = len(created), len(updated)
+            result.unchanged = result.rows - len(result.rejected) - len(touched)
+
+            self.pool.audit.record("product", "import", None, file=Path(path).name, rows=result.rows,
+                                   created=result.created, updated=result.updated,
+                                   rejected=len(result.rejected), by=created_by)
+            for kind, ids in ((CREATED, created), (UPDATED, updated)):
+                if ids:
+                    change = ProductChange(kind, ids)
+                    self.pool.after_commit(lambda change=change: self.pool.events.publish(change))
+
+        result.seconds = time.perf_counter() - start
+        if progress:
+            progress(result)
+        return result
+
+    @staticmethod
+    def _row(values: Dict[str, Optional[str]], short_code_of: Dict[str, Optional[str]],
+             owner: Dict[str, Optional[str]], now: str) -> tuple:
+        """Validate one row -> upsert parameters. ValueError with the reason when rejected."""
+        barcode = values.get("barcode")
+        if barcode is None:
+            raise ValueError("barcode is required")
+        new = barcode not in short_code_of
+
+        ur_name, en_name = values.get("ur_name"), values.get("en_name")
+        if new and ur_name is None:
+            if en_name is None:
+                raise ValueError("a new product needs ur_name or en_name")
+            ur_name = en_name
+
+        unit = values.get("unit")
+        if unit is not None:
+            unit = UNITS.get(unit.lower())
+            if unit is None:
+                raise ValueError(f"unknown unit {values['unit']!r} (kg, gram, ltr, ml, pcs)")
+
+        base_price, sell_price = _paisa(values.get("base_price")), _paisa(values.get("sell_price"))
+        reorder = _milli(values.get("reorder_threshold"), "reorder_threshold")
+        packing = _milli(values.get("packing_size"), "packing_size")
+        supply_pack = _milli(values.get("supply_pack_qty"), "supply_pack_qty")
+        if supply_pack == 0:
+            raise ValueError("supply_pack_qty must be greater than zero")
+        stock = (_milli(values.get("stock_qty"), "stock_qty") or 0) if new else 0
+
+        short_code = values.get("short_code")
+        if short_code is not None:
+            holder = owner.get(short_code, barcode)
+            if holder != barcode:
+                raise ValueError(f"short_code {short_code!r} belongs to {'barcode ' + holder if holder else 'another product'}")
+            previous = short_code_of.get(barcode)
+            if previous is not None and previous != short_code:
+                owner.pop(previous, None)
+            owner[short_code] = barcode
+            short_code_of[barcode] = short_code
+        elif new:
+            short_code_of[barcode] = None
+
+        return (barcode, short_code, ur_name, en_name, values.get("company"), base_price, sell_price,
+                unit, reorder, packing, supply_pack, stock, now)
+
+
+def write_rejects(path, rejected: List[Tuple[int, str]]):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(("line", "reason"))
+        writer.writerows(rejected)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import or update products from a CSV / XLSX price list.")
+    parser.add_argument("file", help="price list (.csv or .xlsx) with a header row and a barcode column")
+    parser.add_argument("--rejects", help="write rejected rows (line, reason) to this CSV")
+    parser.add_argument("--db", help="database path (default: the app's shop.db)")
+    args = parser.parse_args(argv)
+
+    importer = CatalogImporter(get_pool(args.db))
+    result = importer.import_file(args.file, created_by="import",
+                                  progress=lambda r: print(f"{r.rows} rows read, {len(r.rejected)} rejected"))
+    if result.ignored_columns:
+        print(f"Ignored columns: {', '.join(result.ignored_columns)}")
+    print(f"{result.created} created, {result.updated} updated, {result.unchanged} unchanged, "
+          f"{len(result.rejected)} rejected in {result.seconds:.2f}s ({result.rows / max(result.seconds, 1e-9):.0f} rows/s)")
+    for line, reason in result.rejected[:20]:
+        print(f"  line {line}: {reason}")
+    if args.rejects and result.rejected:
+        write_rejects(args.rejects, result.rejected)
+        print(f"Rejected rows written to {args.rejects}")
+
+
+if __name__ == "__main__":
+    main()
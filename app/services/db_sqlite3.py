@@ -1,6 +1,33 @@
 # app/services/db_sqlite3.py
-import os, sqlite3
+import os, sqlite3, threading, time
+from contextlib import contextmanager
 from pathlib import Path
+from app.services.audit import AuditLog
+from app.services.events import EventBus
+from app.services.query_trace import connection_factory
+
+# Connection tuning applied to every connection we hand out.
+#  - WAL lets readers run while a writer commits, and commits only fsync the WAL.
+#  - synchronous=NORMAL is durable across app crashes in WAL mode (power loss may
+#    lose the last commit, never corrupt the file).
+#  - negative cache_size is in KiB (here 16 MB per connection).
+BUSY_TIMEOUT_MS = 5000
+CACHE_SIZE_KB = 16 * 1024
+MMAP_SIZE = 256 * 1024 * 1024
+# prepared statements kept per connection (sqlite3's default is 128); the product
+# statements of app.services.product_queries plus the reports, imports and ledger
+# queries stay prepared instead of being parsed again when the cache churns
+STATEMENT_CACHE = 256
+
+PRAGMAS = (
+    "PRAGMA foreign_keys = ON;",
+    f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS};",
+    "PRAGMA synchronous = NORMAL;",
+    f"PRAGMA cache_size = -{CACHE_SIZE_KB};",
+    f"PRAGMA mmap_size = {MMAP_SIZE};",
+    "PRAGMA temp_store = MEMORY;",
+)
+
 
 def get_default_db_path():
     appdata = os.getenv("APPDATA") or str(Path.home())
@@ -8,16 +35,276 @@ def get_default_db_path():
     folder.mkdir(parents=True, exist_ok=True)
     return str(folder / "shop.db")
 
-_conn = None
 
-def get_connection(db_path: str | None = None):
-    global _conn
-    if _conn:
-        return _conn
+def connect(db_path: str | None = None, read_only: bool = False) -> sqlite3.Connection:
+    """
+    Open a new tuned connection.
+
+    - read_only=False: write connection; switches the database to WAL (persistent setting).
+    - read_only=True: opened with mode=ro and query_only, so it can never take the write lock.
+      The database must already exist (open a write connection first).
+
+    With statement tracing switched on (app.services.query_trace) it is a TracedConnection.
+    """
     if db_path is None:
         db_path = get_default_db_path()
-    conn = sqlite3.connect(db_path, check_same_thread=False)
+    if read_only:
+        uri = Path(db_path).resolve().as_uri() + "?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False, factory=connection_factory(),
+                               cached_statements=STATEMENT_CACHE)
+    else:
+        conn = sqlite3.connect(db_path, check_same_thread=False, factory=connection_factory(),
+                               cached_statements=STATEMENT_CACHE)
+    # check_same_thread=False: ConnectionPool hands a connection to one thread at a time
     conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON;")
-    _conn = conn
+    if not read_only:
+        conn.execute("PRAGMA journal_mode = WAL;")
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    if read_only:
+        conn.execute("PRAGMA query_only = ON;")
     return conn
+
+
+class PoolTimeout(TimeoutError):
+    """Raised when no connection became free within the pool timeout."""
+
+
+class ConnectionPool:
+    """
+    Bounded pool of SQLite connections that is safe to use from any thread.
+
+    - read():        checks out a read-only connection (at most max_readers open at once).
+    - write():       checks out the single write connection (SQLite allows one writer).
+    - transaction(): write() + BEGIN IMMEDIATE, COMMIT on success, ROLLBACK on error.
+
+    Checkouts are per thread and re-entrant: nested read()/transaction() calls on the
+    same thread get the connection the thread already holds, so a service method that
+    opens a transaction can be called from inside another service's transaction and
+    both commit (or roll back) together. A read() inside a transaction uses the write
+    connection so it sees the transaction's own uncommitted changes.
+
+    A connection is only ever used by the thread that checked it out, which is why
+    they are opened with check_same_thread=False.
+    """
+
+    def __init__(self, db_path: str | None = None, max_readers: int = 4, timeout: float = 10.0):
+        self.db_path = db_path or get_default_db_path()
+        self.max_readers = max_readers
+        self.timeout = timeout
+
+        # writer first: creates the file and switches it to WAL before any reader opens
+        self._writer = connect(self.db_path)
+        self._writer.isolation_level = None  # transactions are managed explicitly
+        self._writer_lock = threading.Lock()
+
+        # change notifications for everything written through this pool
+        self.events = EventBus()       # ProductChange
+        self.sale_events = EventBus()  # SaleRecorded
+        # audit events buffered per transaction, flushed right before COMMIT
+        self.audit = AuditLog(self)
+
+        self._cond = threading.Condition()
+        self._idle_readers = []
+        self._open_readers = 0
+        self._local = threading.local()
+
+        # wait accounting
+        self._stats_lock = threading.Lock()
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._max_wait = 0.0
+
+    # -----------------------
+    # Checkout / checkin
+    # -----------------------
+    @contextmanager
+    def read(self):
+        local = self._local
+        if getattr(local, "writer_depth", 0):
+            yield self._writer
+            return
+        if getattr(local, "reader_depth", 0):
+            local.reader_depth += 1
+            try:
+                yield local.reader
+            finally:
+                local.reader_depth -= 1
+            return
+
+        conn = self._checkout_reader()
+        local.reader, local.reader_depth = conn, 1
+        try:
+            yield conn
+        finally:
+            local.reader, local.reader_depth = None, 0
+            self._checkin_reader(conn)
+
+    @contextmanager
+    def write(self):
+        local = self._local
+        if getattr(local, "writer_depth", 0):
+            local.writer_depth += 1
+            try:
+                yield self._writer
+            finally:
+                local.writer_depth -= 1
+            return
+
+        start = time.perf_counter()
+        waited = not self._writer_lock.acquire(blocking=False)
+        if waited and not self._writer_lock.acquire(timeout=self.timeout):
+            raise PoolTimeout(f"write connection busy for more than {self.timeout}s")
+        self._record_checkout(waited, time.perf_counter() - start)
+        local.writer_depth = 1
+        try:
+            yield self._writer
+        finally:
+            local.writer_depth = 0
+            self._writer_lock.release()
+
+    @contextmanager
+    def transaction(self):
+        local = self._local
+        if getattr(local, "in_transaction", False):
+            # join the transaction this thread already has open
+            with self.write() as conn:
+                yield conn
+            return
+
+        with self.write() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            local.in_transaction = True
+            local.before_commit = []
+            local.after_commit = []
+            local.state = {}
+            try:
+                yield conn
+                # may append more hooks while running (e.g. an audit flush registering late)
+                for callback in local.before_commit:
+                    callback(conn)
+                conn.execute("COMMIT")
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+            finally:
+                local.in_transaction = False
+                local.before_commit, local.state = [], None
+                callbacks, local.after_commit = local.after_commit, []
+        for callback in callbacks:
+            callback()
+
+    def in_transaction(self) -> bool:
+        return getattr(self._local, "in_transaction", False)
+
+    def transaction_state(self) -> dict | None:
+        """
+        Scratch dict for the current thread's outermost transaction (None outside one).
+        Starts empty at every BEGIN, so anything left behind by a rollback is dropped.
+        """
+        return getattr(self._local, "state", None) if self.in_transaction() else None
+
+    def before_commit(self, callback):
+        """
+        Run callback(conn) inside the current outermost transaction, right before
+        COMMIT; an exception rolls the whole transaction back. Used to write batched
+        side rows (audit log) in the same commit as the business change.
+        """
+        if not self.in_transaction():
+            raise RuntimeError("before_commit() needs an open transaction")
+        self._local.before_commit.append(callback)
+
+    def after_commit(self, callback):
+        """
+        Run callback once the current thread's outermost transaction commits
+        (dropped on rollback). Outside a transaction it runs immediately.
+        Used to update in-memory caches only with data that is really in the DB.
+        """
+        if getattr(self._local, "in_transaction", False):
+            self._local.after_commit.append(callback)
+        else:
+            callback()
+
+    def _checkout_reader(self):
+        start = time.perf_counter()
+        deadline = start + self.timeout
+        waited = False
+        conn = None
+        with self._cond:
+            while not self._idle_readers and self._open_readers >= self.max_readers:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    raise PoolTimeout(f"no read connection free within {self.timeout}s")
+                waited = True
+                self._cond.wait(remaining)
+            if self._idle_readers:
+                conn = self._idle_readers.pop()
+            else:
+                self._open_readers += 1
+
+        if conn is None:
+            try:
+                conn = connect(self.db_path, read_only=True)
+            except Exception:
+                with self._cond:
+                    self._open_readers -= 1
+                    self._cond.notify()
+                raise
+        self._record_checkout(waited, time.perf_counter() - start)
+        return conn
+
+    def _checkin_reader(self, conn):
+        with self._cond:
+            self._idle_readers.append(conn)
+            self._cond.notify()
+
+    # -----------------------
+    # Stats / lifecycle
+    # -----------------------
+    def _record_checkout(self, waited: bool, seconds: float):
+        with self._stats_lock:
+            self._checkouts += 1
+            if waited:
+                self._waits += 1
+                self._wait_time += seconds
+                self._max_wait = max(self._max_wait, seconds)
+
+    def stats(self) -> dict:
+        """Checkout counters; waits only count checkouts that had to block for a connection."""
+        with self._stats_lock:
+            checkouts, waits, wait_time, max_wait = self._checkouts, self._waits, self._wait_time, self._max_wait
+        with self._cond:
+            open_readers, idle_readers = self._open_readers, len(self._idle_readers)
+        return {
+            "checkouts": checkouts,
+            "waits": waits,
+            "total_wait_ms": wait_time * 1000,
+            "avg_wait_ms": (wait_time / waits * 1000) if waits else 0.0,
+            "max_wait_ms": max_wait * 1000,
+            "readers_open": open_readers,
+            "readers_idle": idle_readers,
+        }
+
+    def close(self):
+        with self._cond:
+            for conn in self._idle_readers:
+                conn.close()
+            self._open_readers -= len(self._idle_readers)
+            self._idle_readers = []
+        with self._writer_lock:
+            self._writer.close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(db_path: str | None = None) -> ConnectionPool:
+    """Process-wide pool used by services that are not given one explicitly."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(db_path)
+        return _pool
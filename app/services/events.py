@@ -0,0 +1,73 @@
+# app/services/events.py
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+from app.utils import instrumentation
+
+# ProductChange kinds
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+STOCK = "stock"      # only stock changed; new stock_milli values are in ProductChange.stock
+
+# a created / updated change touching more products than this (catalog import) is
+# cheaper for caches to apply by reloading than product by product
+BULK_CHANGE = 500
+
+
+class ProductChange:
+    """One committed change to one or more products."""
+    __slots__ = ("kind", "product_ids", "stock")
+
+    def __init__(self, kind: str, product_ids: Iterable[int], stock: Optional[Dict[int, int]] = None):
+        self.kind = kind
+        self.product_ids = tuple(product_ids)
+        self.stock = stock
+
+    def __repr__(self):
+        return f"ProductChange({self.kind!r}, {self.product_ids!r})"
+
+
+class SaleRecorded:
+    """One committed sale (SaleService.checkout). Amounts in paisa."""
+    __slots__ = ("sale_id", "day", "charged_total", "sales_total", "cost_total")
+
+    def __init__(self, sale_id: int, day: str, charged_total: int, sales_total: int, cost_total: int):
+        self.sale_id = sale_id
+        self.day = day                      # 'YYYY-MM-DD'
+        self.charged_total = charged_total  # what the customer paid
+        self.sales_total = sales_total      # sum(line_charged)
+        self.cost_total = cost_total        # sum(line_cost_total)
+
+    def __repr__(self):
+        return f"SaleRecorded({self.sale_id}, {self.day!r}, {self.charged_total})"
+
+
+class EventBus:
+    """
+    In-process change notifications (ProductChange on pool.events, SaleRecorded on
+    pool.sale_events).
+
+    Services publish after their transaction commits (ConnectionPool.after_commit), so
+    subscribers only ever see data that is in the DB. Callbacks run synchronously on the
+    publishing thread, which may be a worker thread: Qt subscribers should forward the
+    change through a signal instead of touching widgets directly.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = []
+
+    def subscribe(self, callback: Callable[[Any], None]):
+        with self._lock:
+            self._subscribers = self._subscribers + [callback]
+
+    def unsubscribe(self, callback: Callable[[Any], None]):
+        with self._lock:
+            self._subscribers = [cb for cb in self._subscribers if cb != callback]
+
+    def publish(self, event):
+        for callback in self._subscribers:
+            try:
+                callback(event)
+            except Exception as e:  # one failing subscriber must not stop the others
+                instrumentation.error("event subscriber", e)
@@ -0,0 +1,238 @@
+# app/services/export.py
+"""
+Export of the catalog and ledgers (products, sales, sale_items, stock_movements) for
+the accountant, as CSV or JSON Lines, optionally gzip-compressed.
+
+Rows are streamed: each table is one query read with fetchmany(FETCH_ROWS) and written
+batch by batch, so memory stays flat however long the ledger is. All tables are read
+in one read transaction on a separate read-only connection (ArchiveService.history(),
+which also covers archived stock movements), so the files are one consistent
+snapshot: every sale_items row has its sale.
+
+Modes:
+  - full: every row.
+  - range: rows created between date_from and date_to (inclusive days); products by
+    their last change.
+  - incremental: rows after the highest id of the table's last full / incremental
+    export (export_runs). products rows change in place, so they are always exported whole.
+
+Values are written as stored: money in paisa, quantities in milli-units (*_milli).
+Files are written as <name>.part and renamed when complete; a failed export removes
+what it wrote and records nothing.
+
+    python -m app.services.export [--incremental | --from YYYY-MM-DD --to YYYY-MM-DD]
+                                  [--format csv|jsonl] [--gzip] [--out folder] [--db path/to/shop.db]
+"""
+import argparse, csv, gzip, json, os, time
+from datetime import datetime
+from itertools import repeat
+from pathlib import Path
+from app.services.archive import ArchiveService
+from app.services.db_sqlite3 import ConnectionPool, get_pool
+from app.services.stock_ledger import next_day
+from app.utils.instrumentation import timed
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+EXPORT_DIR = "exports"
+FETCH_ROWS = 2000
+FORMATS = ("csv", "jsonl")
+
+# table -> (source in the history connection, date column)
+EXPORT_TABLES = {
+    "products": ("main.products", "COALESCE(updated_at, created_at)"),
+    "sales": ("main.sales", "created_at"),
+    "sale_items": ("main.sale_items", "created_at"),
+    "stock_movements": ("all_stock_movements", "created_at"),
+}
+APPEND_ONLY = {"sales", "sale_items", "stock_movements"}
+
+
+def batches(cursor, size: int = FETCH_ROWS) -> Iterator[list]:
+    """Rows of an executed cursor, fetchmany(size) at a time."""
+    while True:
+        rows = cursor.fetchmany(size)
+        if not rows:
+            return
+        yield rows
+
+
+def write_csv(f, columns: Sequence[str], rows: Iterator[list]) -> Iterator[list]:
+    """Header, then each batch of rows as CSV. Passes the batches through once written."""
+    writer = csv.writer(f)
+    writer.writerow(columns)
+    for batch in rows:
+        writer.writerows(batch)
+        yield batch
+
+
+def write_jsonl(f, columns: Sequence[str], rows: Iterator[list]) -> Iterator[list]:
+    """One JSON object per row. Passes the batches through once written."""
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    for batch in rows:
+        f.write("\n".join(map(encode, map(dict, map(zip, repeat(columns), batch)))))
+        f.write("\n")
+        yield batch
+
+
+WRITERS = {"csv": write_csv, "jsonl": write_jsonl}
+
+
+def _free_path(folder: Path, stem: str, suffix: str) -> Path:
+    """folder/stem+suffix, or stem-2, stem-3, ... when an earlier export took the name."""
+    path, n = folder / f"{stem}{suffix}", 1
+    while path.exists():
+        n += 1
+        path = folder / f"{stem}-{n}{suffix}"
+    return path
+
+
+class ExportService:
+    def __init__(self, pool: Optional[ConnectionPool] = None):
+        self.pool = pool or get_pool()
+        self.folder = Path(self.pool.db_path).resolve().parent / EXPORT_DIR
+
+    def last_exported_id(self, table: str) -> int:
+        """Highest id written by the table's last full / incremental export (0 if none)."""
+        with self.pool.read() as conn:
+            row = conn.execute("""
+                SELECT last_id FROM export_runs
+                WHERE table_name = ? AND mode IN ('full', 'incremental')
+                ORDER BY id DESC LIMIT 1
+            """, (table,)).fetchone()
+        return (row[0] or 0) if row else 0
+
+    def runs(self, limit: int = 20) -> List[tuple]:
+        """(created_at, table_name, mode, rows, file) of the latest export runs, newest first."""
+        with self.pool.read() as conn:
+            return conn.execute("""
+                SELECT created_at, table_name, mode, rows, file FROM export_runs
+                ORDER BY id DESC LIMIT ?
+            """, (limit,)).fetchall()
+
+    # -----------------------
+    # Export
+    # -----------------------
+    @timed
+    def export(self, folder=None, tables: Sequence[str] = tuple(EXPORT_TABLES), fmt: str = "csv",
+               compress: bool = False, date_from: Optional[str] = None, date_to: Optional[str] = None,
+               incremental: bool = False,
+               progress: Optional[Callable[[str, int], None]] = None) -> Dict[str, Dict]:
+        """
+        Write one file per table into `folder` (default: exports/ next to the database).
+        date_from / date_to (YYYY-MM-DD) select a range; incremental=True continues
+        after the last export. progress(table, rows written so far) is called per batch.
+        Returns {table: {"file", "rows", "after_id", "last_id"}}.
+        """
+        if fmt not in WRITERS:
+            raise ValueError(f"unknown export format {fmt!r} (use {', '.join(FORMATS)})")
+        unknown = [table for table in tables if table not in EXPORT_TABLES]
+        if unknown:
+            raise ValueError(f"cannot export {', '.join(unknown)} (use {', '.join(EXPORT_TABLES)})")
+        if incremental and (date_from or date_to):
+            raise ValueError("an incremental export cannot also take a date range")
+        if date_from and date_to and date_from > date_to:
+            raise ValueError(f"date_from {date_from} is after date_to {date_to}")
+        mode = "incremental" if incremental else "range" if (date_from or date_to) else "full"
+        cursors = {table: self.last_exported_id(table) for table in tables if incremental}
+
+        folder = Path(folder) if folder else self.folder
+        folder.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        suffix = f".{fmt}.gz" if compress else f".{fmt}"
+
+        written: Dict[str, Dict] = {}
+        try:
+            with ArchiveService(self.pool).history() as conn:
+                conn.execute("BEGIN")  # one snapshot for every table
+                try:
+                    for table in tables:
+                        after_id = cursors.get(table) if table in APPEND_ONLY else None
+                        path = _free_path(folder, f"{table}_{stamp}", suffix)
+                        written[table] = self._export_table(conn, table, path, fmt, compress,
+                                                            date_from, date_to, after_id, progress)
+                finally:
+                    conn.execute("COMMIT")
+
+            with self.pool.transaction() as conn:
+                conn.executemany("""
+                    INSERT INTO export_runs (table_name, mode, date_from, date_to, after_id, last_id, rows, file)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, [(table, mode, date_from, date_to, info["after_id"], info["last_id"], info["rows"],
+                       str(info["file"])) for table, info in written.items()])
+        except BaseException:
+            for info in written.values():
+                Path(info["file"]).unlink(missing_ok=True)
+            raise
+        return written
+
+    def _export_table(self, conn, table: str, path: Path, fmt: str, compress: bool,
+                      date_from: Optional[str], date_to: Optional[str], after_id: Optional[int],
+                      progress: Optional[Callable[[str, int], None]]) -> Dict:
+        source, date_col = EXPORT_TABLES[table]
+        columns = [row[1] for row in conn.execute(f"PRAGMA main.table_info({table})")]
+        id_index = columns.index("id")
+        where, params = [], []
+        if after_id is not None:
+            where.append("id > ?")
+            params.append(after_id)
+        if date_from:
+            where.append(f"{date_col} >= ?")
+            params.append(date_from)
+        if date_to:
+            where.append(f"{date_col} < ?")
+            params.append(next_day(date_to))
+        # ranges come in date order straight off the created_at indexes; ORDER BY id
+        # would sort the whole range in a temp b-tree first (in memory: temp_store)
+        order = date_col if (date_from or date_to) else "id"
+        cursor = conn.execute(f"""
+            SELECT {", ".join(columns)} FROM {source}
+            {"WHERE " + " AND ".join(where) if where else ""}
+            ORDER BY {order}
+        """, params)
+
+        part = path.with_name(path.name + ".part")
+        rows, last_id = 0, after_id
+        try:
+            if compress:
+                f = gzip.open(part, "wt", encoding="utf-8", newline="", compresslevel=6)
+            else:
+                f = open(part, "w", encoding="utf-8", newline="")
+            with f:
+                for batch in WRITERS[fmt](f, columns, batches(cursor)):
+                    rows += len(batch)
+                    top = max(row[id_index] for row in batch)
+                    if last_id is None or top > last_id:
+                        last_id = top
+                    if progress:
+                        progress(table, rows)
+            os.replace(part, path)
+        except BaseException:
+            part.unlink(missing_ok=True)
+            raise
+        return {"file": path, "rows": rows, "after_id": after_id, "last_id": last_id}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export products, sales and the stock ledger as CSV / JSON Lines.")
+    parser.add_argument("--tables", default=",".join(EXPORT_TABLES), help="comma separated (default: all)")
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--gzip", action="store_true", help="compress the files (.gz)")
+    parser.add_argument("--from", dest="date_from", help="first day (YYYY-MM-DD) of a date-range export")
+    parser.add_argument("--to", dest="date_to", help="last day (YYYY-MM-DD) of a date-range export")
+    parser.add_argument("--incremental", action="store_true", help="only rows added since the last export")
+    parser.add_argument("--out", help="output folder (default: exports/ next to the database)")
+    parser.add_argument("--db", help="database path (default: the app's shop.db)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    service = ExportService(get_pool(args.db))
+    written = service.export(args.out, [t.strip() for t in args.tables.split(",") if t.strip()],
+                             fmt=args.format, compress=args.gzip, date_from=args.date_from,
+                             date_to=args.date_to, incremental=args.incremental)
+    for table, info in written.items():
+        print(f"{table}: {info['rows']} rows -> {info['file']}")
+    print(f"Done in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# app/services/kpis.py
+import json, threading
+from datetime import date
+from app.services.db_sqlite3 import ConnectionPool, get_pool
+from app.services.events import ProductChange, SaleRecorded, STOCK, DELETED
+from app.utils.instrumentation import timed
+from typing import Optional, Dict, Iterable
+
+
+class KpiSnapshot:
+    """Today's dashboard numbers at one moment. Amounts in paisa, margin in %."""
+    __slots__ = ("day", "revenue", "sale_count", "avg_basket", "gross_margin", "low_stock_count")
+
+    def __init__(self, day, revenue, sale_count, avg_basket, gross_margin, low_stock_count):
+        self.day = day
+        self.revenue = revenue
+        self.sale_count = sale_count
+        self.avg_basket = avg_basket
+        self.gross_margin = gross_margin
+        self.low_stock_count = low_stock_count
+
+
+class KpiAccumulator:
+    """
+    Today's revenue, sale count, average basket, gross margin and low-stock count,
+    kept in memory for the dashboard.
+
+    load() seeds them once: today's row of the daily aggregates plus one pass over the
+    products that have a reorder threshold. After that SaleRecorded and stock change
+    events update them in O(1) per sale / per product touched, and snapshot() never
+    touches the DB. A product is low on stock when reorder_threshold_milli > 0 and
+    stock_milli <= reorder_threshold_milli (integer milli-units, so the comparison is exact).
+    """
+
+    def __init__(self, pool: Optional[ConnectionPool] = None):
+        self.pool = pool or get_pool()
+        self._lock = threading.Lock()
+        self._day = date.today().isoformat()
+        self._revenue = 0
+        self._sale_count = 0
+        self._sales_total = 0
+        self._cost_total = 0
+        self._thresholds: Dict[int, int] = {}    # product id -> reorder_threshold_milli (> 0 only)
+        self._low = set()                        # ids of products at or below threshold
+
+    @timed
+    def load(self):
+        today = date.today().isoformat()
+        with self.pool.read() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT sale_count, charged_total FROM daily_sales WHERE day = ?", (today,))
+            sale_count, revenue = cur.fetchone() or (0, 0)
+            cur.execute("""
+                SELECT COALESCE(SUM(sales_total), 0), COALESCE(SUM(cost_total), 0)
+                FROM daily_category_sales WHERE day = ?
+            """, (today,))
+            sales_total, cost_total = cur.fetchone()
+            cur.execute("SELECT id, stock_milli, reorder_threshold_milli FROM products WHERE reorder_threshold_milli > 0")
+            rows = cur.fetchall()
+        with self._lock:
+            self._day = today
+            self._revenue, self._sale_count = revenue, sale_count
+            self._sales_total, self._cost_total = sales_total, cost_total
+            self._thresholds = {}
+            self._low = set()
+            self._set_levels(rows)
+
+    # -----------------------
+    # Events
+    # -----------------------
+    def on_sale(self, sale: SaleRecorded):
+        with self._lock:
+            if sale.day < self._day:
+                return  # a late event for a day that is already over
+            if sale.day > self._day:
+                self._start_day(sale.day)
+            self._revenue += sale.charged_total
+            self._sale_count += 1
+            self._sales_total += sale.sales_total
+            self._cost_total += sale.cost_total
+
+    def on_product_change(self, change: ProductChange):
+        if change.kind == STOCK:
+            with self._lock:
+                for product_id, qty in change.stock.items():
+                    threshold = self._thresholds.get(product_id)
+                    if threshold is not None:
+                        self._mark(product_id, qty <= threshold)
+        elif change.kind == DELETED:
+            with self._lock:
+                for product_id in change.product_ids:
+                    self._thresholds.pop(product_id, None)
+                    self._low.discard(product_id)
+        else:
+            # created / edited: the threshold itself may have changed
+            with self.pool.read() as conn:
+                rows = conn.execute("""
+                    SELECT id, stock_milli, reorder_threshold_milli FROM products
+                    WHERE id IN (SELECT value FROM json_each(?))
+                """, (json.dumps(list(change.product_ids)),)).fetchall()
+            with self._lock:
+                self._set_levels(rows)
+
+    # -----------------------
+    # Reading
+    # -----------------------
+    def snapshot(self) -> KpiSnapshot:
+        today = date.today().isoformat()
+        with self._lock:
+            if today > self._day:
+                self._start_day(today)  # midnight passed without a sale yet
+            count = self._sale_count
+            return KpiSnapshot(
+                day=self._day,
+                revenue=self._revenue,
+                sale_count=count,
+                avg_basket=self._revenue // count if count else 0,
+                gross_margin=round((self._sales_total - self._cost_total) * 100.0 / self._sales_total, 1)
+                if self._sales_total else 0.0,
+                low_stock_count=len(self._low),
+            )
+
+    # -----------------------
+    # Helpers (caller holds the lock)
+    # -----------------------
+    def _start_day(self, day: str):
+        self._day = day
+        self._revenue = self._sale_count = self._sales_total = self._cost_total = 0
+
+    def _set_levels(self, rows: Iterable):
+        for product_id, stock_milli, threshold in rows:
+            if threshold and threshold > 0:
+                self._thresholds[product_id] = threshold
+                self._mark(product_id, (stock_milli or 0) <= threshold)
+            else:
+                self._thresholds.pop(product_id, None)
+                self._low.discard(product_id)
+
+    def _mark(self, product_id: int, low: bool):
+        if low:
+            self._low.add(product_id)
+        else:
+            self._low.discard(product_id)
+
+
+_kpis = None
+_kpis_lock = threading.Lock()
+
+
+def get_kpis() -> KpiAccumulator:
+    """Process-wide accumulator, seeded on first use."""
+    global _kpis
+    with _kpis_lock:
+        if _kpis is None:
+            kpis = KpiAccumulator()
+            # subscribe first so nothing committed while seeding is missed
+            kpis.pool.sale_events.subscribe(kpis.on_sale)
+            kpis.pool.events.subscribe(kpis.on_product_change)
+            kpis.load()
+            _kpis = kpis
+        return _kpis
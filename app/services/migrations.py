@@ -0,0 +1,406 @@
+# app/services/migrations.py
+"""
+Schema migrations on top of schema.sql.
+
+schema.sql is the baseline (version 0). Every later schema change is appended to
+MIGRATIONS with the next number and is never edited afterwards. The applied version
+is kept in PRAGMA user_version. Run by init_db.py for new databases and by main()
+on every start, so existing shop.db files are upgraded in place.
+"""
+import sqlite3
+from contextlib import contextmanager
+from app.utils import instrumentation
+from app.utils.quantity import sql_to_milli
+from app.utils.urdu import sql_normalize
+
+
+# -----------------------
+# 1: products full-text search
+# -----------------------
+# Regular (not external-content) FTS5 table: it stores the folded text, which differs
+# from products, and rowid = products.id. prefix='2 3' keeps short type-ahead prefixes fast.
+_FTS_COLUMNS = ("ur_name", "en_name", "company", "short_code", "barcode")
+_FTS_FOLDED = ("ur_name", "company")
+
+
+def _fts_values(alias: str) -> str:
+    parts = []
+    for col in _FTS_COLUMNS:
+        expr = f"{alias}.{col}"
+        parts.append(sql_normalize(expr) if col in _FTS_FOLDED else expr)
+    return ", ".join(parts)
+
+
+_FTS_SQL = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+  {", ".join(_FTS_COLUMNS)},
+  tokenize = "unicode61 remove_diacritics 2",
+  prefix = '2 3'
+);
+
+INSERT INTO products_fts (rowid, {", ".join(_FTS_COLUMNS)})
+SELECT p.id, {_fts_values("p")} FROM products p;
+
+CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+  INSERT INTO products_fts (rowid, {", ".join(_FTS_COLUMNS)}) VALUES (new.id, {_fts_values("new")});
+END;
+
+CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+  DELETE FROM products_fts WHERE rowid = old.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF {", ".join(_FTS_COLUMNS)} ON products
+WHEN {" OR ".join(f"old.{c} IS NOT new.{c}" for c in _FTS_COLUMNS)}
+BEGIN
+  DELETE FROM products_fts WHERE rowid = old.id;
+  INSERT INTO products_fts (rowid, {", ".join(_FTS_COLUMNS)}) VALUES (new.id, {_fts_values("new")});
+END;
+"""
+
+
+@contextmanager
+def fts_insert_trigger_suspended(conn: sqlite3.Connection):
+    """
+    Drop the products_fts insert trigger for a bulk insert and recreate it after, inside
+    the caller's transaction (a rollback brings it back too); the caller indexes the new
+    rows with reindex_products_fts(). FTS5 flushes its pending terms at every statement
+    savepoint, so indexing row by row through the trigger is several times slower than
+    one set-based insert. The update trigger stays: it only works when a searched
+    column changes.
+    """
+    sql = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'products_fts_ai'").fetchone()
+    conn.execute("DROP TRIGGER IF EXISTS products_fts_ai")
+    yield
+    if sql is not None:
+        conn.execute(sql[0])
+
+
+def reindex_products_fts(conn: sqlite3.Connection, where: str, params=()):
+    """Re-read the products matching `where` (alias p) into products_fts, set-based."""
+    conn.execute(f"DELETE FROM products_fts WHERE rowid IN (SELECT p.id FROM products p WHERE {where})", params)
+    conn.execute(f"""
+        INSERT INTO products_fts (rowid, {", ".join(_FTS_COLUMNS)})
+        SELECT p.id, {_fts_values("p")} FROM products p WHERE {where}
+    """, params)
+
+
+# -----------------------
+# 2: products list paging
+# -----------------------
+# Keyset paging walks products in (ur_name, id) order; the index makes each page an
+# index range read instead of a full sort (id rides along as the rowid).
+_LIST_ORDER_SQL = """
+CREATE INDEX IF NOT EXISTS product_ur_name_idx ON products(ur_name);
+"""
+
+
+# -----------------------
+# 3: daily sales aggregates
+# -----------------------
+# Kept current by SaleService.checkout (same transaction as the sale) and rebuilt from
+# sales / sale_items by app.services.sales_aggregates. day is the local date of the sale
+# (first 10 chars of created_at); category_id 0 = uncategorised.
+_DAILY_AGGREGATES_SQL = """
+CREATE TABLE IF NOT EXISTS daily_sales (
+  day TEXT PRIMARY KEY,
+  sale_count INTEGER NOT NULL DEFAULT 0,
+  total_before_discounts INTEGER NOT NULL DEFAULT 0,
+  discount INTEGER NOT NULL DEFAULT 0,
+  tax INTEGER NOT NULL DEFAULT 0,
+  charged_total INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS daily_product_sales (
+  day TEXT NOT NULL,
+  product_id INTEGER NOT NULL,
+  qty REAL NOT NULL DEFAULT 0,
+  sales_total INTEGER NOT NULL DEFAULT 0,  -- sum(line_charged), paisa
+  cost_total INTEGER NOT NULL DEFAULT 0,   -- sum(line_cost_total), paisa
+  line_count INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (day, product_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS daily_category_sales (
+  day TEXT NOT NULL,
+  category_id INTEGER NOT NULL,
+  qty REAL NOT NULL DEFAULT 0,
+  sales_total INTEGER NOT NULL DEFAULT 0,
+  cost_total INTEGER NOT NULL DEFAULT 0,
+  line_count INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (day, category_id)
+) WITHOUT ROWID;
+
+-- month ('YYYY-MM') x product rollup: long-range top-N reads ~30x fewer rows
+CREATE TABLE IF NOT EXISTS monthly_product_sales (
+  month TEXT NOT NULL,
+  product_id INTEGER NOT NULL,
+  qty REAL NOT NULL DEFAULT 0,
+  sales_total INTEGER NOT NULL DEFAULT 0,
+  cost_total INTEGER NOT NULL DEFAULT 0,
+  line_count INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (month, product_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS sale_items_created_at_idx ON sale_items(created_at);
+CREATE INDEX IF NOT EXISTS sales_created_at_idx ON sales(created_at);
+"""
+
+
+# Backfill from existing sales, as the schema stood at version 3 (REAL qty columns).
+# Kept here rather than calling sales_aggregates.rebuild(), which follows the current
+# schema; migration 8 rebuilds the aggregates again from the exact milli quantities.
+_BACKFILL_DAILY_AGGREGATES_SQL = """
+INSERT INTO daily_sales (day, sale_count, total_before_discounts, discount, tax, charged_total)
+SELECT substr(created_at, 1, 10), COUNT(*), SUM(total_before_discounts), SUM(discount),
+       SUM(tax), SUM(charged_total)
+FROM sales GROUP BY 1;
+
+INSERT INTO daily_product_sales (day, product_id, qty, sales_total, cost_total, line_count)
+SELECT substr(created_at, 1, 10), product_id, SUM(qty), SUM(line_charged),
+       SUM(line_cost_total), COUNT(*)
+FROM sale_items GROUP BY 1, 2;
+
+INSERT INTO daily_category_sales (day, category_id, qty, sales_total, cost_total, line_count)
+SELECT d.day, COALESCE(p.category_id, 0), SUM(d.qty), SUM(d.sales_total),
+       SUM(d.cost_total), SUM(d.line_count)
+FROM daily_product_sales d LEFT JOIN products p ON p.id = d.product_id
+GROUP BY 1, 2;
+
+INSERT INTO monthly_product_sales (month, product_id, qty, sales_total, cost_total, line_count)
+SELECT substr(day, 1, 7), product_id, SUM(qty), SUM(sales_total), SUM(cost_total), SUM(line_count)
+FROM daily_product_sales GROUP BY 1, 2;
+"""
+
+
+def _create_daily_aggregates(conn: sqlite3.Connection):
+    for statement in (_DAILY_AGGREGATES_SQL + _BACKFILL_DAILY_AGGREGATES_SQL).split(";"):
+        if statement.strip():
+            conn.execute(statement)
+
+
+# -----------------------
+# 4: low-stock set
+# -----------------------
+# Partial index holding only products at or below their reorder threshold. SQLite keeps
+# it current on every stock_qty / reorder_threshold write (StockService, product edits),
+# and queries using the same WHERE read just those rows. The movements index lets the
+# reorder engine read one product's recent sales without scanning the whole history.
+_LOW_STOCK_SQL = """
+CREATE INDEX IF NOT EXISTS product_low_stock_idx ON products(id)
+WHERE reorder_threshold > 0 AND stock_qty <= reorder_threshold;
+
+CREATE INDEX IF NOT EXISTS stock_movements_product_idx ON stock_movements(product_id, created_at);
+"""
+
+
+# -----------------------
+# 5: structured audit log
+# -----------------------
+# app.services.audit writes entity_id / field / JSON payload; the index serves
+# "history of product 42" style lookups.
+_AUDIT_SQL = """
+ALTER TABLE audit_logs ADD COLUMN entity_id INTEGER;
+ALTER TABLE audit_logs ADD COLUMN field TEXT;
+ALTER TABLE audit_logs ADD COLUMN payload TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_audit_logs_entity ON audit_logs(entity_type, entity_id);
+-- covered by the (entity_type, entity_id) prefix; one index less to maintain per row
+DROP INDEX IF EXISTS idx_audit_logs_entity_type;
+"""
+
+
+# -----------------------
+# 6: archival of closed months
+# -----------------------
+# app.services.archive moves old stock_movements / audit_logs rows into per-year
+# archive databases. archive_files records what each file holds;
+# stock_opening_balances keeps the net qty of the archived movements per product.
+_ARCHIVE_SQL = """
+CREATE TABLE IF NOT EXISTS archive_files (
+  year INTEGER PRIMARY KEY,
+  file TEXT NOT NULL,              -- relative to the folder of the main database
+  archived_through TEXT NOT NULL,  -- rows created before this date (YYYY-MM-01) are archived
+  stock_movements INTEGER NOT NULL DEFAULT 0,
+  audit_logs INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS stock_opening_balances (
+  product_id INTEGER PRIMARY KEY,
+  qty REAL NOT NULL DEFAULT 0,     -- sum of the product's archived movements, in base unit
+  FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE
+);
+
+-- month ranges are what archiving selects and deletes
+CREATE INDEX IF NOT EXISTS stock_movements_created_idx ON stock_movements(created_at);
+"""
+
+
+# -----------------------
+# 7: stock snapshots
+# -----------------------
+# app.services.stock_ledger closes each day: stock at the end of `day` for every
+# product that moved that day (a product's latest row on or before a day is its stock
+# then). stock_snapshot_runs lists the closed days.
+_STOCK_SNAPSHOTS_SQL = """
+CREATE TABLE IF NOT EXISTS stock_snapshots (
+  product_id INTEGER NOT NULL,
+  day TEXT NOT NULL,
+  qty REAL NOT NULL,
+  PRIMARY KEY (product_id, day),
+  FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS stock_snapshot_runs (
+  day TEXT PRIMARY KEY,
+  products INTEGER NOT NULL,       -- snapshot rows written for the day
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+) WITHOUT ROWID;
+"""
+
+
+# -----------------------
+# 8: integer milli-unit quantities
+# -----------------------
+# Every REAL quantity becomes an INTEGER count of milli base units (app.utils.quantity):
+# exact sums, integer comparisons. (table, REAL column, milli column, declaration);
+# the low-stock index is rebuilt on the new columns and the sales aggregates are
+# recomputed from the converted sale_items rather than converted themselves.
+_MILLI_COLUMNS = (
+    ("products", "stock_qty", "stock_milli", "INTEGER NOT NULL DEFAULT 0"),
+    ("products", "reorder_threshold", "reorder_threshold_milli", "INTEGER NOT NULL DEFAULT 0"),
+    ("products", "packing_size", "packing_size_milli", "INTEGER"),
+    ("products", "supply_pack_qty", "supply_pack_milli", "INTEGER NOT NULL DEFAULT 1000"),
+    ("stock_movements", "qty", "qty_milli", "INTEGER NOT NULL DEFAULT 0"),
+    ("sale_items", "qty", "qty_milli", "INTEGER NOT NULL DEFAULT 0"),
+    ("stock_opening_balances", "qty", "qty_milli", "INTEGER NOT NULL DEFAULT 0"),
+    ("stock_snapshots", "qty", "qty_milli", "INTEGER NOT NULL DEFAULT 0"),
+    ("daily_product_sales", "qty", "qty_milli", "INTEGER NOT NULL DEFAULT 0"),
+    ("daily_category_sales", "qty", "qty_milli", "INTEGER NOT NULL DEFAULT 0"),
+    ("monthly_product_sales", "qty", "qty_milli", "INTEGER NOT NULL DEFAULT 0"),
+)
+
+_AGGREGATE_TABLES = ("daily_product_sales", "daily_category_sales", "monthly_product_sales")
+
+# The aggregates recomputed as the schema stands at version 8 (a frozen copy of what
+# sales_aggregates.rebuild() did then; that one follows the current schema).
+_REBUILD_MILLI_AGGREGATES_SQL = """
+DELETE FROM daily_sales;
+DELETE FROM daily_product_sales;
+DELETE FROM daily_category_sales;
+DELETE FROM monthly_product_sales;
+
+INSERT INTO daily_sales (day, sale_count, total_before_discounts, discount, tax, charged_total)
+SELECT substr(created_at, 1, 10), COUNT(*), SUM(total_before_discounts), SUM(discount),
+       SUM(tax), SUM(charged_total)
+FROM sales GROUP BY 1;
+
+INSERT INTO daily_product_sales (day, product_id, qty_milli, sales_total, cost_total, line_count)
+SELECT substr(created_at, 1, 10), product_id, SUM(qty_milli), SUM(line_charged),
+       SUM(line_cost_total), COUNT(*)
+FROM sale_items GROUP BY 1, 2;
+
+INSERT INTO daily_category_sales (day, category_id, qty_milli, sales_total, cost_total, line_count)
+SELECT d.day, COALESCE(p.category_id, 0), SUM(d.qty_milli), SUM(d.sales_total),
+       SUM(d.cost_total), SUM(d.line_count)
+FROM daily_product_sales d LEFT JOIN products p ON p.id = d.product_id
+GROUP BY 1, 2;
+
+INSERT INTO monthly_product_sales (month, product_id, qty_milli, sales_total, cost_total, line_count)
+SELECT substr(day, 1, 7), product_id, SUM(qty_milli), SUM(sales_total), SUM(cost_total), SUM(line_count)
+FROM daily_product_sales GROUP BY 1, 2;
+"""
+
+
+def _milli_quantities(conn: sqlite3.Connection):
+    conn.execute("DROP INDEX IF EXISTS product_low_stock_idx")
+    for table, old, new, decl in _MILLI_COLUMNS:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {new} {decl}")
+        if table not in _AGGREGATE_TABLES:
+            value = sql_to_milli(old)
+            if "NOT NULL" in decl:
+                value = f"COALESCE({value}, {decl.rsplit(' ', 1)[1]})"
+            conn.execute(f"UPDATE {table} SET {new} = {value}")
+        conn.execute(f"ALTER TABLE {table} DROP COLUMN {old}")
+    conn.execute("""
+        CREATE INDEX product_low_stock_idx ON products(id)
+        WHERE reorder_threshold_milli > 0 AND stock_milli <= reorder_threshold_milli
+    """)
+    for statement in _REBUILD_MILLI_AGGREGATES_SQL.split(";"):
+        if statement.strip():
+            conn.execute(statement)
+
+
+# -----------------------
+# 9: duplicate product indexes
+# -----------------------
+# barcode and short_code are UNIQUE, which already gives each an index; the plain
+# indexes from schema.sql only doubled the work of every product insert and edit.
+_DUPLICATE_INDEXES_SQL = """
+DROP INDEX IF EXISTS product_barcode_idx;
+DROP INDEX IF EXISTS product_short_idx;
+"""
+
+
+# -----------------------
+# 10: export runs
+# -----------------------
+# app.services.export writes one file per table and run. last_id is the highest id
+# in the file; incremental exports continue after the last full / incremental run.
+_EXPORT_RUNS_SQL = """
+CREATE TABLE IF NOT EXISTS export_runs (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  table_name TEXT NOT NULL,
+  mode TEXT NOT NULL,              -- 'full', 'range' or 'incremental'
+  date_from TEXT,
+  date_to TEXT,
+  after_id INTEGER,                -- incremental: rows with a larger id were exported
+  last_id INTEGER,
+  rows INTEGER NOT NULL,
+  file TEXT NOT NULL,
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS export_runs_table_idx ON export_runs(table_name, mode);
+"""
+
+
+# (version, description, SQL script or callable(conn))
+MIGRATIONS = [
+    (1, "products full-text search (FTS5)", _FTS_SQL),
+    (2, "products list ordering index", _LIST_ORDER_SQL),
+    (3, "daily sales aggregates", _create_daily_aggregates),
+    (4, "low-stock partial index", _LOW_STOCK_SQL),
+    (5, "structured audit log columns", _AUDIT_SQL),
+    (6, "archive registry and opening balances", _ARCHIVE_SQL),
+    (7, "stock snapshots", _STOCK_SNAPSHOTS_SQL),
+    (8, "integer milli-unit quantities", _milli_quantities),
+    (9, "drop duplicate product indexes", _DUPLICATE_INDEXES_SQL),
+    (10, "export runs", _EXPORT_RUNS_SQL),
+]
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Apply pending migrations, each in its own transaction. Returns the new version."""
+    version = schema_version(conn)
+    for number, description, step in MIGRATIONS:
+        if number <= version:
+            continue
+        try:
+            if callable(step):
+                conn.execute("BEGIN IMMEDIATE")
+                step(conn)
+                conn.execute(f"PRAGMA user_version = {number}")
+                conn.execute("COMMIT")
+            else:
+                conn.executescript(f"BEGIN IMMEDIATE;\n{step}\nPRAGMA user_version = {number};\nCOMMIT;")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        instrumentation.log.info("Applied migration %d: %s", number, description)
+        version = number
+    return version
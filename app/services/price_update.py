@@ -0,0 +1,216 @@
+# app/services/price_update.py
+"""
+Bulk price changes (a supplier's new price list, a round of inflation).
+
+A PriceChange selects products (by company, category and/or ids; no filter means all
+products) and says how their base and/or sell price move: a percentage, a fixed amount
+in paisa, or both, then rounded to a multiple of round_to paisa (nearest, up or down).
+
+The new price is one integer SQL expression, shared by preview() and apply(): preview()
+lists the rows that would change, apply() is a single UPDATE over the selection in one
+transaction. The audit gets one price event per changed field plus one summary event,
+all buffered and written with one executemany (AuditLog); subscribers get one
+ProductChange for every product touched.
+
+    python -m app.services.price_update [--company NAME] [--category ID] --percent 7.5
+                                        [--amount RUPEES] [--round-to PAISA] [--rounding up]
+                                        [--field sell_price|base_price|both] [--apply] [--db path/to/shop.db]
+"""
+import argparse, json, time
+from datetime import datetime
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from app.services.db_sqlite3 import ConnectionPool, get_pool
+from app.services.events import ProductChange, UPDATED
+from app.utils.instrumentation import timed
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+PRICE_FIELDS = ("base_price", "sell_price")
+ROUNDING = ("nearest", "up", "down")
+
+# percentages are applied in basis points (1% = 100): integer arithmetic in SQL
+_BP = 10_000
+
+
+class PriceChange:
+    """Which products to reprice and how. Amounts are in paisa."""
+    __slots__ = ("company", "category_id", "product_ids", "fields", "basis_points", "amount",
+                 "round_to", "rounding")
+
+    def __init__(self, company: Optional[str] = None, category_id: Optional[int] = None,
+                 product_ids: Optional[Iterable[int]] = None, fields: Sequence[str] = ("sell_price",),
+                 percent=0, amount: int = 0, round_to: int = 1, rounding: str = "nearest"):
+        fields = tuple(fields)
+        if not fields or any(f not in PRICE_FIELDS for f in fields):
+            raise ValueError(f"fields must be some of {', '.join(PRICE_FIELDS)} (got {fields!r})")
+        try:
+            basis_points = int((Decimal(str(percent)) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+        except InvalidOperation:
+            raise ValueError(f"invalid percentage {percent!r}") from None
+        if basis_points <= -_BP:
+            raise ValueError("a price cannot go down by 100% or more")
+        if int(round_to) < 1:
+            raise ValueError("round_to must be at least 1 paisa")
+        if rounding not in ROUNDING:
+            raise ValueError(f"rounding must be one of {', '.join(ROUNDING)} (got {rounding!r})")
+        if basis_points == 0 and not amount and int(round_to) == 1:
+            raise ValueError("the price change changes nothing (give a percentage, amount or rounding)")
+
+        self.company = company or None
+        self.category_id = category_id
+        self.product_ids = None if product_ids is None else [int(pid) for pid in product_ids]
+        self.fields = fields
+        self.basis_points = basis_points
+        self.amount = int(amount)
+        self.round_to = int(round_to)
+        self.rounding = rounding
+
+    def new_price_sql(self, column: str) -> str:
+        """
+        SQL for the new value of `column`: (old * (1 + pct) + amount), never below 0,
+        rounded to round_to paisa. Every number in it is a validated int.
+        """
+        if column not in self.fields:
+            return column
+        raw = f"MAX({column} * {_BP + self.basis_points} + {self.amount * _BP}, 0)"
+        div = _BP * self.round_to
+        if self.rounding == "nearest":
+            raw = f"({raw} + {div // 2})"
+        elif self.rounding == "up":
+            raw = f"({raw} + {div - 1})"
+        return f"({raw} / {div} * {self.round_to})"
+
+    def where_sql(self) -> Tuple[str, list]:
+        where, params = [], []
+        if self.company is not None:
+            where.append("company = ?")
+            params.append(self.company)
+        if self.category_id is not None:
+            where.append("category_id = ?")
+            params.append(self.category_id)
+        if self.product_ids is not None:
+            where.append("id IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(self.product_ids))
+        return " AND ".join(where) or "1", params
+
+    def describe(self) -> dict:
+        """The rule as audit payload."""
+        return {"company": self.company, "category_id": self.category_id,
+                "product_ids": len(self.product_ids) if self.product_ids is not None else None,
+                "fields": list(self.fields), "percent": self.basis_points / 100, "amount": self.amount,
+                "round_to": self.round_to, "rounding": self.rounding}
+
+
+class PriceUpdateService:
+    def __init__(self, pool: Optional[ConnectionPool] = None):
+        self.pool = pool or get_pool()
+
+    # -----------------------
+    # Choices
+    # -----------------------
+    def companies(self) -> List[str]:
+        with self.pool.read() as conn:
+            return [row[0] for row in conn.execute(
+                "SELECT DISTINCT company FROM products WHERE company IS NOT NULL AND company <> '' ORDER BY company")]
+
+    def categories(self) -> List[tuple]:
+        """(id, name) of every category."""
+        with self.pool.read() as conn:
+            return conn.execute("SELECT id, name FROM categories ORDER BY name").fetchall()
+
+    # -----------------------
+    # Preview / apply
+    # -----------------------
+    @staticmethod
+    def _changed_rows_sql(change: PriceChange) -> Tuple[str, list]:
+        where, params = change.where_sql()
+        new_base, new_sell = change.new_price_sql("base_price"), change.new_price_sql("sell_price")
+        return f"""
+            SELECT id, ur_name, en_name, company, base_price, new_base, sell_price, new_sell FROM (
+                SELECT id, ur_name, en_name, company, base_price, {new_base} AS new_base,
+                       sell_price, {new_sell} AS new_sell
+                FROM products WHERE {where}
+            )
+            WHERE new_base IS NOT base_price OR new_sell IS NOT sell_price
+            ORDER BY ur_name, id
+        """, params
+
+    @timed
+    def preview(self, change: PriceChange) -> List[tuple]:
+        """
+        (id, ur_name, en_name, company, base_price, new_base, sell_price, new_sell) of
+        every product the change would alter, in list order. Nothing is written.
+        """
+        sql, params = self._changed_rows_sql(change)
+        with self.pool.read() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    @timed
+    def apply(self, change: PriceChange, created_by: Optional[str] = None) -> int:
+        """Apply the change in one transaction. Returns the number of products repriced."""
+        sql, params = self._changed_rows_sql(change)
+        where, where_params = change.where_sql()
+        sets = ", ".join(f"{f} = {change.new_price_sql(f)}" for f in change.fields)
+        now = datetime.now().isoformat()
+        with self.pool.transaction() as conn:
+            # old / new prices for the audit, read under the write lock: exactly what the UPDATE does
+            rows = conn.execute(sql, params).fetchall()
+            if not rows:
+                return 0
+            changed = " OR ".join(f"{change.new_price_sql(f)} IS NOT {f}" for f in change.fields)
+            conn.execute(f"UPDATE products SET {sets}, updated_at = ? WHERE ({where}) AND ({changed})",
+                         [now, *where_params])
+
+            audit = self.pool.audit
+            for pid, _, _, _, base, new_base, sell, new_sell in rows:
+                if new_base != base:
+                    audit.record("product", "price_change", pid, "base_price", base, new_base)
+                if new_sell != sell:
+                    audit.record("product", "price_change", pid, "sell_price", sell, new_sell)
+            audit.record("product", "bulk_price_change", None, products=len(rows), by=created_by,
+                         **change.describe())
+
+            change_event = ProductChange(UPDATED, [row[0] for row in rows])
+            self.pool.after_commit(lambda: self.pool.events.publish(change_event))
+        return len(rows)
+
+
+def _rupees_to_paisa(text: str) -> int:
+    try:
+        return int((Decimal(text) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    except InvalidOperation:
+        raise ValueError(f"invalid amount {text!r}") from None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Preview or apply a bulk price change.")
+    parser.add_argument("--company", help="only products of this company")
+    parser.add_argument("--category", type=int, help="only products of this category id")
+    parser.add_argument("--field", choices=("sell_price", "base_price", "both"), default="sell_price")
+    parser.add_argument("--percent", default="0", help="change in percent, e.g. 7.5 or -3")
+    parser.add_argument("--amount", default="0", help="fixed change in rupees, e.g. 5 or -2.50")
+    parser.add_argument("--round-to", type=int, default=1, help="round to a multiple of this many paisa (100 = 1 rupee)")
+    parser.add_argument("--rounding", choices=ROUNDING, default="nearest")
+    parser.add_argument("--apply", action="store_true", help="write the change (default: preview only)")
+    parser.add_argument("--db", help="database path (default: the app's shop.db)")
+    args = parser.parse_args(argv)
+
+    fields = PRICE_FIELDS if args.field == "both" else (args.field,)
+    change = PriceChange(args.company, args.category, fields=fields, percent=args.percent,
+                         amount=_rupees_to_paisa(args.amount), round_to=args.round_to, rounding=args.rounding)
+    service = PriceUpdateService(get_pool(args.db))
+    start = time.perf_counter()
+    rows = service.preview(change)
+    for pid, ur_name, en_name, company, base, new_base, sell, new_sell in rows[:20]:
+        print(f"{pid:>6} {ur_name or en_name}: cost {base / 100:.2f} -> {new_base / 100:.2f}, "
+              f"price {sell / 100:.2f} -> {new_sell / 100:.2f}")
+    if len(rows) > 20:
+        print(f"... and {len(rows) - 20} more")
+    if args.apply:
+        print(f"Repriced {service.apply(change, created_by='price_update')} product(s)")
+    else:
+        print(f"{len(rows)} product(s) would change (use --apply to write)")
+    print(f"Done in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
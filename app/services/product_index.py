@@ -0,0 +1,126 @@
+# app/services/product_index.py
+import threading
+from app.services.db_sqlite3 import ConnectionPool, get_pool
+from app.services import product_queries as q
+from app.services.product_queries import ProductRecord
+from app.services.catalog_cache import CatalogCache, get_catalog_cache
+from app.services.events import ProductChange, STOCK, DELETED, BULK_CHANGE
+from app.utils.instrumentation import timed
+from typing import Optional, Dict
+
+
+class ProductIndex:
+    """
+    Resident barcode / short_code -> product index for the scanner.
+
+    Holds only code -> id dicts; the records come from the CatalogCache (its columns
+    hold the names, price and stock), so a product is in memory once. Loaded once (one
+    SELECT of the codes) and then kept current from the pool's product change events
+    (published by the services after commit); stock changes only concern the cache.
+    Lookups are dict hits plus a read of the cache's columns, no DB round trip.
+
+    Without a `catalog` it loads and maintains a CatalogCache of its own (benchmarks,
+    the profiling CLI).
+    """
+
+    def __init__(self, pool: Optional[ConnectionPool] = None, catalog: Optional[CatalogCache] = None):
+        self.pool = pool or get_pool()
+        self._own_catalog = catalog is None
+        self.catalog = CatalogCache(self.pool) if catalog is None else catalog
+        self._lock = threading.Lock()
+        self._codes: Dict[int, tuple] = {}  # id -> (barcode, short_code), to drop stale keys
+        self._by_barcode: Dict[str, int] = {}
+        self._by_short_code: Dict[str, int] = {}
+
+    @timed
+    def load(self):
+        if self._own_catalog:
+            self.catalog.load()
+        self._load_codes()
+
+    def _load_codes(self):
+        with self.pool.read() as conn:
+            rows = q.INDEX_CODES.rows(conn)
+        codes, by_barcode, by_short_code = {}, {}, {}
+        for product_id, barcode, short_code in rows:
+            codes[product_id] = (barcode, short_code)
+            if barcode:
+                by_barcode[barcode] = product_id
+            if short_code:
+                by_short_code[short_code] = product_id
+        with self._lock:
+            self._codes, self._by_barcode, self._by_short_code = codes, by_barcode, by_short_code
+
+    # -----------------------
+    # Lookups
+    # -----------------------
+    def lookup(self, code: str) -> Optional[ProductRecord]:
+        """Exact barcode match first, then short_code."""
+        product_id = self._by_barcode.get(code) or self._by_short_code.get(code)
+        return None if product_id is None else self.catalog.get(product_id)
+
+    def get(self, product_id: int) -> Optional[ProductRecord]:
+        return self.catalog.get(product_id)
+
+    def __len__(self):
+        return len(self._codes)
+
+    # -----------------------
+    # Maintenance
+    # -----------------------
+    def refresh(self, product_id: int):
+        """Re-read one product's codes (after create/update)."""
+        with self.pool.read() as conn:
+            row = q.INDEX_CODES_ONE.one(conn, (product_id,))
+        if row is None:
+            self.remove(product_id)
+            return
+        _, barcode, short_code = row
+        with self._lock:
+            self._drop_keys(product_id)
+            self._codes[product_id] = (barcode, short_code)
+            if barcode:
+                self._by_barcode[barcode] = product_id
+            if short_code:
+                self._by_short_code[short_code] = product_id
+
+    def remove(self, product_id: int):
+        with self._lock:
+            self._drop_keys(product_id)
+
+    def on_change(self, change: ProductChange):
+        if self._own_catalog:
+            self.catalog.on_change(change)
+        if change.kind == STOCK:
+            return
+        if change.kind == DELETED:
+            for product_id in change.product_ids:
+                self.remove(product_id)
+        elif len(change.product_ids) > BULK_CHANGE:
+            self._load_codes()
+        else:
+            for product_id in change.product_ids:
+                self.refresh(product_id)
+
+    def _drop_keys(self, product_id: int):
+        barcode, short_code = self._codes.pop(product_id, (None, None))
+        if barcode and self._by_barcode.get(barcode) == product_id:
+            del self._by_barcode[barcode]
+        if short_code and self._by_short_code.get(short_code) == product_id:
+            del self._by_short_code[short_code]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_product_index() -> ProductIndex:
+    """Process-wide index over the process-wide catalog cache, loaded on first use (main() loads it at startup)."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            index = ProductIndex(catalog=get_catalog_cache())
+            index.pool.events.subscribe(index.on_change)
+            index.load()
+            _index = index
+        return _index
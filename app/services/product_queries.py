@@ -0,0 +1,244 @@
+# app/services/product_queries.py
+"""
+The product statements, built once, and the record types their rows come back as.
+
+Each statement is a module-level Query: its text is fixed at import, so every call
+sends sqlite3 the identical string and hits the connection's statement cache (sized by
+STATEMENT_CACHE in app.services.db_sqlite3) instead of being parsed again. There are
+two projections of a product:
+
+    ProductRow     the products list / incremental refresh (12 columns)
+    ProductDetail  the edit form and update()'s snapshot (every column)
+
+plus SearchHit for search results and ProductRecord for a catalog cache lookup.
+Rows come back as these __slots__ records (built by a per-cursor row factory, not
+through sqlite3.Row), so callers read prod.sell_price instead of prod[7]; they are
+mutable, so e.g. a loaded list row can take a new stock value in place.
+
+    from app.services import product_queries as q
+    with pool.read() as conn:
+        prod = q.PRODUCT_DETAIL.one(conn, (product_id,))
+"""
+from typing import Dict
+
+
+class _Record:
+    """Base of the record types: __slots__ in SELECT order, compared by value."""
+    __slots__ = ()
+
+    def astuple(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        return type(other) is type(self) and other.astuple() == self.astuple()
+
+    __hash__ = None  # mutable
+
+    def __repr__(self):
+        return f"{type(self).__name__}(id={self.id}, ur_name={getattr(self, 'ur_name', None)!r})"
+
+
+class ProductRow(_Record):
+    """Products list projection (ProductService.fetch_page / fetch_rows / all_products)."""
+    __slots__ = ("id", "short_code", "ur_name", "en_name", "company", "base_price", "sell_price",
+                 "stock_milli", "unit", "custom_packing", "packing_size_milli", "reorder_threshold_milli")
+
+    def __init__(self, id, short_code, ur_name, en_name, company, base_price, sell_price,
+                 stock_milli, unit, custom_packing, packing_size_milli, reorder_threshold_milli):
+        self.id = id
+        self.short_code = short_code
+        self.ur_name = ur_name
+        self.en_name = en_name
+        self.company = company
+        self.base_price = base_price
+        self.sell_price = sell_price
+        self.stock_milli = stock_milli
+        self.unit = unit
+        self.custom_packing = custom_packing
+        self.packing_size_milli = packing_size_milli
+        self.reorder_threshold_milli = reorder_threshold_milli
+
+
+class ProductDetail(_Record):
+    """Every column of a product (ProductService.get, the edit form)."""
+    __slots__ = ("id", "short_code", "ur_name", "en_name", "company", "barcode",
+                 "base_price", "sell_price", "stock_milli", "reorder_threshold_milli",
+                 "category_id", "unit", "custom_packing", "packing_size_milli", "supply_pack_milli",
+                 "created_at", "updated_at")
+
+    def __init__(self, id, short_code, ur_name, en_name, company, barcode,
+                 base_price, sell_price, stock_milli, reorder_threshold_milli,
+                 category_id, unit, custom_packing, packing_size_milli, supply_pack_milli,
+                 created_at, updated_at):
+        self.id = id
+        self.short_code = short_code
+        self.ur_name = ur_name
+        self.en_name = en_name
+        self.company = company
+        self.barcode = barcode
+        self.base_price = base_price
+        self.sell_price = sell_price
+        self.stock_milli = stock_milli
+        self.reorder_threshold_milli = reorder_threshold_milli
+        self.category_id = category_id
+        self.unit = unit
+        self.custom_packing = custom_packing
+        self.packing_size_milli = packing_size_milli
+        self.supply_pack_milli = supply_pack_milli
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+
+class SearchHit(_Record):
+    """One ProductService.search() result."""
+    __slots__ = ("id", "short_code", "ur_name", "en_name", "company", "barcode", "sell_price", "stock_milli")
+
+    def __init__(self, id, short_code, ur_name, en_name, company, barcode, sell_price, stock_milli):
+        self.id = id
+        self.short_code = short_code
+        self.ur_name = ur_name
+        self.en_name = en_name
+        self.company = company
+        self.barcode = barcode
+        self.sell_price = sell_price
+        self.stock_milli = stock_milli
+
+
+class ProductRecord(_Record):
+    """What a scanner lookup needs (CatalogCache.get / ProductIndex.lookup)."""
+    __slots__ = ("id", "short_code", "barcode", "ur_name", "en_name", "unit", "sell_price", "stock_milli")
+
+    def __init__(self, id, short_code, barcode, ur_name, en_name, unit, sell_price, stock_milli):
+        self.id = id
+        self.short_code = short_code
+        self.barcode = barcode
+        self.ur_name = ur_name
+        self.en_name = en_name
+        self.unit = unit
+        self.sell_price = sell_price
+        self.stock_milli = stock_milli
+
+    def __repr__(self):
+        return f"ProductRecord(id={self.id}, barcode={self.barcode!r}, short_code={self.short_code!r})"
+
+
+# -----------------------
+# Statements
+# -----------------------
+class Query:
+    """A named statement whose rows are built as `record` (or left as plain tuples)."""
+    __slots__ = ("name", "sql", "record", "_factory")
+
+    def __init__(self, name: str, sql: str, record=None):
+        self.name = name
+        self.sql = " ".join(sql.split())
+        self.record = record
+        self._factory = None if record is None else (lambda cursor, row: record(*row))
+
+    def execute(self, conn, parameters=()):
+        """Cursor over the statement's records."""
+        cur = conn.cursor()
+        cur.row_factory = self._factory
+        return cur.execute(self.sql, parameters)
+
+    def rows(self, conn, parameters=()) -> list:
+        return self.execute(conn, parameters).fetchall()
+
+    def one(self, conn, parameters=()):
+        return self.execute(conn, parameters).fetchone()
+
+    def __repr__(self):
+        return f"Query({self.name!r})"
+
+
+REGISTRY: Dict[str, Query] = {}
+
+
+def _register(name: str, sql: str, record=None) -> Query:
+    if name in REGISTRY:
+        raise ValueError(f"duplicate query name: {name}")
+    query = REGISTRY[name] = Query(name, sql, record)
+    return query
+
+
+def _columns(record, prefix: str = "") -> str:
+    return ", ".join(prefix + name for name in record.__slots__)
+
+
+LIST_COLUMNS = _columns(ProductRow)
+DETAIL_COLUMNS = _columns(ProductDetail)
+
+PRODUCT_LIST = _register("products.list", f"""
+    SELECT {LIST_COLUMNS} FROM products ORDER BY ur_name, id
+""", ProductRow)
+PRODUCT_PAGE_FIRST = _register("products.page_first", f"""
+    SELECT {LIST_COLUMNS} FROM products ORDER BY ur_name, id LIMIT ?
+""", ProductRow)
+PRODUCT_PAGE_AFTER = _register("products.page_after", f"""
+    SELECT {LIST_COLUMNS} FROM products
+    WHERE (ur_name, id) > (?, ?)
+    ORDER BY ur_name, id LIMIT ?
+""", ProductRow)
+PRODUCT_PAGE_IDS_FIRST = _register("products.page_ids_first", """
+    SELECT id FROM products ORDER BY ur_name, id LIMIT ?
+""")
+PRODUCT_PAGE_IDS_AFTER = _register("products.page_ids_after", """
+    SELECT id FROM products
+    WHERE (ur_name, id) > (?, ?)
+    ORDER BY ur_name, id LIMIT ?
+""")
+PRODUCT_ROWS = _register("products.rows", f"""
+    SELECT {LIST_COLUMNS} FROM products WHERE id IN (SELECT value FROM json_each(?))
+""", ProductRow)
+PRODUCT_DETAIL = _register("products.detail", f"""
+    SELECT {DETAIL_COLUMNS} FROM products WHERE id = ?
+""", ProductDetail)
+PRODUCT_ID_BY_BARCODE = _register("products.id_by_barcode", """
+    SELECT id FROM products WHERE barcode = ?
+""")
+
+# FTS5 search: ranked by bm25, or in id order for all-digit terms (see ProductService.search)
+_SEARCH = """
+    SELECT {columns}
+    FROM (SELECT rowid, bm25(products_fts, 10.0, 10.0, 2.0, 5.0, 5.0) AS score
+          FROM products_fts WHERE products_fts MATCH ?
+          ORDER BY {order} LIMIT ?) AS hits
+    JOIN products p ON p.id = hits.rowid
+    ORDER BY hits.{order}
+"""
+SEARCH_RANKED = _register("products.search_ranked", _SEARCH.format(
+    columns=_columns(SearchHit, "p."), order="score"), SearchHit)
+SEARCH_BY_ID = _register("products.search_by_id", _SEARCH.format(
+    columns=_columns(SearchHit, "p."), order="rowid"), SearchHit)
+SEARCH_LIKE = _register("products.search_like", f"""
+    SELECT {_columns(SearchHit)} FROM products
+    WHERE ur_name LIKE ? OR en_name LIKE ? OR barcode LIKE ? OR short_code LIKE ?
+    ORDER BY ur_name LIMIT ?
+""", SearchHit)
+
+# app.services.product_index: the scanner codes only, the rest is in the catalog cache
+INDEX_CODES = _register("products.index_codes", """
+    SELECT id, barcode, short_code FROM products
+""")
+INDEX_CODES_ONE = _register("products.index_codes_one", """
+    SELECT id, barcode, short_code FROM products WHERE id = ?
+""")
+
+
+# app.services.catalog_cache: plain tuples, unpacked straight into its arrays
+CATALOG_COLUMNS = ("id", "short_code", "barcode", "ur_name", "en_name", "company", "unit",
+                   "base_price", "sell_price", "stock_milli", "reorder_threshold_milli",
+                   "custom_packing", "packing_size_milli")
+CATALOG_ALL = _register("products.catalog", f"""
+    SELECT {", ".join(CATALOG_COLUMNS)} FROM products ORDER BY id
+""")
+CATALOG_ROWS = _register("products.catalog_rows", f"""
+    SELECT {", ".join(CATALOG_COLUMNS)} FROM products WHERE id IN (SELECT value FROM json_each(?))
+""")
+
+
+def get_query(name: str) -> Query:
+    query = REGISTRY.get(name)
+    if query is None:
+        raise ValueError(f"unknown query: {name}")
+    return query
@@ -1,7 +1,15 @@
 # app/services/product_service.py
-from app.services.db_sqlite3 import get_connection
+import json, re, sqlite3
+from app.services.db_sqlite3 import ConnectionPool, get_pool
+from app.services import product_queries as q
+from app.services.product_queries import ProductDetail, ProductRow, SearchHit
+from app.services.query_trace import hot_path
+from app.services.events import ProductChange, CREATED, UPDATED, DELETED
+from app.utils.quantity import to_milli
+from app.utils.urdu import normalize
+from app.utils.instrumentation import timed
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 
 
 def _to_paisa(value) -> int:
@@ -20,64 +28,139 @@ def _to_paisa(value) -> int:
     return int(round(v * 100))
 
 
+# quantity fields: key in base units accepted from callers -> milli-unit column (also accepted)
+_QTY_FIELDS = {
+    "stock_qty": "stock_milli",
+    "reorder_threshold": "reorder_threshold_milli",
+    "packing_size": "packing_size_milli",
+    "supply_pack_qty": "supply_pack_milli",
+}
+
+
+# columns update() may change (and audits, one event per changed field)
+_UPDATE_FIELDS = ("short_code", "ur_name", "en_name", "company", "barcode",
+                  "base_price", "sell_price", "stock_milli", "reorder_threshold_milli",
+                  "category_id", "unit", "custom_packing", "packing_size_milli", "supply_pack_milli")
+
+
+# quantities that may be NULL (no fixed packing); the others store an empty value as 0
+_NULLABLE_QTY = {"packing_size"}
+
+
+def _qty_milli(data: Dict[str, Any], key: str, default: Optional[int]) -> Optional[int]:
+    """data["<column>"] (exact milli-units) if present, else data[key] in base units, else default."""
+    column = _QTY_FIELDS[key]
+    empty = None if key in _NULLABLE_QTY else 0
+    if column in data:
+        return empty if data[column] is None else int(data[column])
+    if key in data:
+        return to_milli(data[key], default=empty)
+    return default
+
+
+def _fts_query(term: str) -> str:
+    """
+    Build an FTS5 MATCH expression: every word becomes a quoted prefix term, ANDed.
+    Words are folded like the indexed text (see app.utils.urdu) and split on anything
+    the tokenizer would split on, so user input can never be FTS5 syntax.
+    """
+    words = re.findall(r"\w+", normalize(term or ""))
+    return " ".join(f'"{w}"*' for w in words)
+
+
 class ProductService:
-    def __init__(self):
-        self.conn = get_connection()
+    def __init__(self, pool: Optional[ConnectionPool] = None):
+        # reads use the pool's read-only connections so they never queue behind a commit
+        self.pool = pool or get_pool()
 
     # -----------------------
     # Read ops
     # -----------------------
-    def all_products(self) -> List[tuple]:
-        cur = self.conn.cursor()
-        cur.execute("""
-            SELECT id, short_code, ur_name, en_name, company, barcode,
-                   base_price, sell_price, stock_qty, reorder_threshold,
-                   category_id, unit, custom_packing, packing_size, supply_pack_qty,
-                   created_at, updated_at
-            FROM products
-            ORDER BY ur_name
-        """)
-        return cur.fetchall()
-
-    def get(self, product_id: int) -> Optional[tuple]:
-        cur = self.conn.cursor()
-        cur.execute("""
-            SELECT id, short_code, ur_name, en_name, company, barcode,
-                   base_price, sell_price, stock_qty, reorder_threshold,
-                   category_id, unit, custom_packing, packing_size, supply_pack_qty,
-                   created_at, updated_at
-            FROM products WHERE id = ?
-        """, (product_id,))
-        return cur.fetchone()
+    @timed
+    def all_products(self) -> List[ProductRow]:
+        """The whole catalog in list order (ur_name, id), list projection."""
+        with self.pool.read() as conn:
+            return q.PRODUCT_LIST.rows(conn)
+
+    @timed
+    @hot_path
+    def fetch_page(self, after: Optional[tuple] = None, limit: int = 200) -> List[ProductRow]:
+        """
+        One window of the products list in (ur_name, id) order.
+        `after` is the (ur_name, id) of the last row already shown (None for the first page).
+        Keyset paging: each page is an index range read, however deep the user scrolls.
+        """
+        with self.pool.read() as conn:
+            if after is None:
+                return q.PRODUCT_PAGE_FIRST.rows(conn, (limit,))
+            return q.PRODUCT_PAGE_AFTER.rows(conn, (after[0], after[1], limit))
 
+    @timed
+    @hot_path
+    def fetch_rows(self, product_ids: List[int]) -> List[ProductRow]:
+        """The fetch_page() projection for specific products (incremental list refresh)."""
+        with self.pool.read() as conn:
+            return q.PRODUCT_ROWS.rows(conn, (json.dumps(list(product_ids)),))
+
+    @timed
+    @hot_path
+    def get(self, product_id: int) -> Optional[ProductDetail]:
+        with self.pool.read() as conn:
+            return q.PRODUCT_DETAIL.one(conn, (product_id,))
+
+    @timed
+    @hot_path
     def find_by_barcode(self, barcode: str) -> Optional[tuple]:
-        cur = self.conn.cursor()
-        cur.execute("SELECT id FROM products WHERE barcode = ?", (barcode,))
-        return cur.fetchone()
-
-    def search(self, term: str, limit: int = 50) -> List[tuple]:
-        cur = self.conn.cursor()
-        q = f"%{term}%"
-        cur.execute("""
-            SELECT id, short_code, ur_name, en_name, company, barcode, sell_price, stock_qty
-            FROM products
-            WHERE ur_name LIKE ? OR en_name LIKE ? OR barcode LIKE ? OR short_code LIKE ?
-            ORDER BY ur_name LIMIT ?
-        """, (q, q, q, q, limit))
-        return cur.fetchall()
+        with self.pool.read() as conn:
+            return q.PRODUCT_ID_BY_BARCODE.one(conn, (barcode,))
+
+    @timed
+    @hot_path
+    def search(self, term: str, limit: int = 50) -> List[SearchHit]:
+        """
+        Ranked product search over ur_name, en_name, company, short_code and barcode.
+        Every word of `term` is a prefix match ("چی مر" finds "چینی", "مرچ"); results are
+        ordered by bm25 with names weighted above company. Falls back to the old LIKE scan
+        when the term has no searchable words or the FTS table is missing (unmigrated DB).
+
+        All-digit terms (barcode / short code prefixes while typing or scanning) can match
+        most of the catalog and bm25 can't tell those hits apart, so they come back in id
+        order, which lets FTS5 stop at `limit` instead of scoring every match.
+        """
+        return self.search_hits(term, limit)[0]
+
+    @hot_path
+    def search_hits(self, term: str, limit: int = 50) -> Tuple[List[SearchHit], bool]:
+        """
+        search() plus whether the rows are the FTS word-prefix matches (True) or came
+        from the LIKE fallback, a substring match that a longer term's prefix matches
+        are not a subset of (PrefixSearchCache must not narrow them in memory).
+        """
+        query = _fts_query(term)
+        words = query.replace('"', "").replace("*", "").split()
+        ranked = q.SEARCH_BY_ID if words and all(w.isdigit() for w in words) else q.SEARCH_RANKED
+        with self.pool.read() as conn:
+            if query:
+                try:
+                    return ranked.rows(conn, (query, limit)), True
+                except sqlite3.OperationalError:
+                    pass
+            like = f"%{term}%"
+            return q.SEARCH_LIKE.rows(conn, (like, like, like, like, limit)), False
 
     # -----------------------
     # Create / Update / Delete
     # -----------------------
+    @timed
     def create(self, data: Dict[str, Any]) -> int:
         """
         Create product. Accepts:
           - base_price (in rupees) or base_price_paisa
           - sell_price (in rupees) or sell_price_paisa
+          - stock_qty, reorder_threshold, packing_size, supply_pack_qty in base units,
+            or exact milli-units as stock_milli, reorder_threshold_milli, ...
         Returns inserted product id.
         """
-        cur = self.conn.cursor()
-
         # price conversion: prefer explicit paisa keys if provided
         base_price_paisa = data.get("base_price_paisa")
         if base_price_paisa is None:
@@ -87,13 +170,15 @@ class ProductService:
         if sell_price_paisa is None:
             sell_price_paisa = _to_paisa(data.get("sell_price"))
 
+        stock_milli = _qty_milli(data, "stock_qty", 0)
         now = datetime.now().isoformat()
-        try:
+        with self.pool.transaction() as conn:
+            cur = conn.cursor()
             cur.execute("""
                 INSERT INTO products
                 (short_code, ur_name, en_name, company, barcode,
-                 base_price, sell_price, stock_qty, reorder_threshold,
-                 category_id, unit, custom_packing, packing_size, supply_pack_qty,
+                 base_price, sell_price, stock_milli, reorder_threshold_milli,
+                 category_id, unit, custom_packing, packing_size_milli, supply_pack_milli,
                  created_at, updated_at)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (
@@ -104,83 +189,62 @@ class ProductService:
                 data.get("barcode"),
                 int(base_price_paisa),
                 int(sell_price_paisa),
-                float(data.get("stock_qty", 0)),
-                float(data.get("reorder_threshold", 0)),
+                stock_milli,
+                _qty_milli(data, "reorder_threshold", 0),
                 data.get("category_id"),
                 data.get("unit", "kg"),
                 1 if data.get("custom_packing") else 0,
-                data.get("packing_size"),
-                float(data.get("supply_pack_qty", 1.0)),
+                _qty_milli(data, "packing_size", None),
+                _qty_milli(data, "supply_pack_qty", to_milli(1)),
                 now,
                 now
             ))
             product_id = cur.lastrowid
+            self._ledger_entry(cur, product_id, stock_milli, data.get("unit", "kg"), now)
 
-            # audit
-            details = f'product created with id{product_id} name="{data.get("ur_name") or data.get("en_name")}"'
-            cur.execute("INSERT INTO audit_logs (entity_type, action, details) VALUES (?, ?, ?)",
-                        ("product", "create", details))
-
-            self.conn.commit()
-            return product_id
-        except Exception:
-            self.conn.rollback()
-            raise
+            # audit (buffered, written with the commit)
+            self.pool.audit.record("product", "create", product_id, name=data.get("ur_name") or data.get("en_name"))
+            self._publish(CREATED, product_id)
+        return product_id
 
+    @timed
+    @hot_path
     def update(self, product_id: int, data: Dict[str, Any]) -> bool:
         """
         Update product and write audit log entries for changed fields.
-        Data may contain rupee prices or explicit *_paisa fields.
+        Data may contain rupee prices or explicit *_paisa fields, and quantities in base
+        units or explicit *_milli fields (see create()).
         """
-        cur = self.conn.cursor()
-        # snapshot
-        cur.execute("""
-            SELECT id, short_code, ur_name, en_name, company, barcode,
-                   base_price, sell_price, stock_qty, reorder_threshold,
-                   category_id, unit, custom_packing, packing_size, supply_pack_qty
-            FROM products WHERE id = ?
-        """, (product_id,))
-        old = cur.fetchone()
-        if old is None:
-            raise ValueError(f"product id {product_id} not found")
-
-        old_map = {
-            "short_code": old[1],
-            "ur_name": old[2],
-            "en_name": old[3],
-            "company": old[4],
-            "barcode": old[5],
-            "base_price": old[6],
-            "sell_price": old[7],
-            "stock_qty": old[8],
-            "reorder_threshold": old[9],
-            "category_id": old[10],
-            "unit": old[11],
-            "custom_packing": old[12],
-            "packing_size": old[13],
-            "supply_pack_qty": old[14],
-        }
-
-        # prepare prices
-        base_price_paisa = data.get("base_price_paisa")
-        if base_price_paisa is None and "base_price" in data:
-            base_price_paisa = _to_paisa(data.get("base_price"))
-        elif base_price_paisa is None:
-            base_price_paisa = old_map["base_price"]
+        with self.pool.transaction() as conn:
+            cur = conn.cursor()
+            # snapshot (inside the transaction so nobody changes the row under us)
+            old = q.PRODUCT_DETAIL.one(conn, (product_id,))
+            if old is None:
+                raise ValueError(f"product id {product_id} not found")
+            old_map = {f: getattr(old, f) for f in _UPDATE_FIELDS}
 
-        sell_price_paisa = data.get("sell_price_paisa")
-        if sell_price_paisa is None and "sell_price" in data:
-            sell_price_paisa = _to_paisa(data.get("sell_price"))
-        elif sell_price_paisa is None:
-            sell_price_paisa = old_map["sell_price"]
+            # prepare prices
+            base_price_paisa = data.get("base_price_paisa")
+            if base_price_paisa is None and "base_price" in data:
+                base_price_paisa = _to_paisa(data.get("base_price"))
+            elif base_price_paisa is None:
+                base_price_paisa = old_map["base_price"]
 
-        now = datetime.now().isoformat()
-        try:
+            sell_price_paisa = data.get("sell_price_paisa")
+            if sell_price_paisa is None and "sell_price" in data:
+                sell_price_paisa = _to_paisa(data.get("sell_price"))
+            elif sell_price_paisa is None:
+                sell_price_paisa = old_map["sell_price"]
+
+            # quantities, in milli-units
+            quantities = {column: _qty_milli(data, key, old_map[column]) for key, column in _QTY_FIELDS.items()}
+
+            now = datetime.now().isoformat()
             cur.execute("""
                 UPDATE products SET
                   short_code = ?, ur_name = ?, en_name = ?, company = ?, barcode = ?,
-                  base_price = ?, sell_price = ?, stock_qty = ?, reorder_threshold = ?,
-                  category_id = ?, unit = ?, custom_packing = ?, packing_size = ?, supply_pack_qty = ?,
+                  base_price = ?, sell_price = ?, stock_milli = ?, reorder_threshold_milli = ?,
+                  category_id = ?, unit = ?, custom_packing = ?, packing_size_milli = ?, supply_pack_milli = ?,
                   updated_at = ?
                 WHERE id = ?
             """, (
@@ -191,67 +255,72 @@ class ProductService:
                 data.get("barcode", old_map["barcode"]),
                 int(base_price_paisa),
                 int(sell_price_paisa),
-                float(data.get("stock_qty", old_map["stock_qty"])),
-                float(data.get("reorder_threshold", old_map["reorder_threshold"])),
+                quantities["stock_milli"],
+                quantities["reorder_threshold_milli"],
                 data.get("category_id", old_map["category_id"]),
                 data.get("unit", old_map["unit"]),
                 1 if data.get("custom_packing", old_map["custom_packing"]) else 0,
-                data.get("packing_size", old_map["packing_size"]),
-                float(data.get("supply_pack_qty", old_map["supply_pack_qty"])),
+                quantities["packing_size_milli"],
+                quantities["supply_pack_milli"],
                 now,
                 product_id
             ))
+            # a stock edited on the form is booked in the ledger like any other movement
+            self._ledger_entry(cur, product_id, quantities["stock_milli"] - (old_map["stock_milli"] or 0),
+                               data.get("unit", old_map["unit"]), now)
 
-            # generate audit messages (single combined or per-field)
-            changed = []
-            check_fields = ["short_code","ur_name","en_name","company","barcode",
-                            "base_price","sell_price","stock_qty","reorder_threshold",
-                            "category_id","unit","custom_packing","packing_size","supply_pack_qty"]
-            for f in check_fields:
+            # one audit event per changed field (buffered, written with the commit)
+            for f in _UPDATE_FIELDS:
                 new_val = None
                 if f in ("base_price","sell_price"):
                     new_val = int(base_price_paisa) if f == "base_price" else int(sell_price_paisa)
+                elif f in quantities:
+                    new_val = quantities[f]
                 else:
                     new_val = data.get(f, old_map.get(f))
                 old_val = old_map.get(f)
                 # compare as strings for simplicity
                 if str(old_val) != str(new_val):
-                    details = f'product {f} with id{product_id} changed from "{old_val}" to "{new_val}"'
-                    changed.append(details)
-                    cur.execute("INSERT INTO audit_logs (entity_type, action, details) VALUES (?, ?, ?)",
-                                ("product", "update", details))
-
-            self.conn.commit()
-            return True
-        except Exception:
-            self.conn.rollback()
-            raise
+                    self.pool.audit.record("product", "update", product_id, f, old_val, new_val)
+            self._publish(UPDATED, product_id)
+        return True
 
+    @timed
     def delete(self, product_id: int) -> bool:
-        cur = self.conn.cursor()
-        try:
+        with self.pool.transaction() as conn:
+            cur = conn.cursor()
             # attempt delete; will fail if FK restrict exists (sale_items)
             cur.execute("DELETE FROM products WHERE id = ?", (product_id,))
             if cur.rowcount == 0:
-                self.conn.rollback()
                 return False
-            details = f'product deleted with id{product_id}'
-            cur.execute("INSERT INTO audit_logs (entity_type, action, details) VALUES (?, ?, ?)",
-                        ("product", "delete", details))
-            self.conn.commit()
-            return True
-        except Exception:
-            self.conn.rollback()
-            raise
+            self.pool.audit.record("product", "delete", product_id)
+            self._publish(DELETED, product_id)
+        return True
 
     # -----------------------
     # Utility
     # -----------------------
-    def adjust_stock(self, product_id: int, delta_qty: float, reason: str = "manual_adjust", created_by: Optional[str] = None) -> float:
+    def _publish(self, kind: str, product_id: int):
+        """Notify subscribers (index, list screen, ...) once this write commits."""
+        change = ProductChange(kind, (product_id,))
+        self.pool.after_commit(lambda: self.pool.events.publish(change))
+
+    @staticmethod
+    def _ledger_entry(cur, product_id: int, qty_milli: int, unit: Optional[str], now: str):
+        """Stock set directly (create / edit form): inventory_correction movement for the change."""
+        if qty_milli:
+            cur.execute("""
+                INSERT INTO stock_movements (product_id, qty_milli, reason, related_doc, unit, created_at)
+                VALUES (?, ?, 'inventory_correction', 'product form', ?, ?)
+            """, (product_id, qty_milli, unit, now))
+
+    @timed
+    @hot_path
+    def adjust_stock(self, product_id: int, delta_qty, reason: str = "manual_adjust", created_by: Optional[str] = None) -> int:
         """
-        Adjust product.stock_qty by delta_qty (positive or negative).
-        Also inserts a stock_movements row. Returns new stock_qty.
+        Adjust the product's stock by delta_qty base units (positive or negative).
+        Also inserts a stock_movements row. Returns the new stock in milli-units.
         """
         from app.services.stock_service import StockService
-        ss = StockService()
+        ss = StockService(self.pool)
         return ss.record_movement(product_id=product_id, qty=delta_qty, reason=reason, created_by=created_by)
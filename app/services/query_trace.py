@@ -0,0 +1,320 @@
+# app/services/query_trace.py
+"""
+Statement tracing for the app's SQLite connections: the duration and row count of
+every statement, a slow-query log with the query plan, and a strict mode in which a
+hot-path query planned as a full scan of a large table fails.
+
+Off by default: connect() then hands out plain sqlite3 connections and nothing here
+costs anything. Switched on from the environment, read once at start:
+
+    MYSHOP_SQL_TIMING=1       trace every statement: one histogram per statement text
+                              in the diagnostics (count, rows, p50 / p95 / p99) and the
+                              slow ones written to the slow-query log
+    MYSHOP_SLOW_QUERY_MS=50   slow-query threshold (default 50 ms)
+    MYSHOP_STRICT_PLANS=1     (implies tracing) raise FullScanError before running a
+                              statement inside a @hot_path service method whose plan
+                              scans a large table; for development and test runs
+
+A statement's time is what SQLite spends on it: execute() plus fetching its rows (the
+caller's work between fetches is not counted), recorded when the last row is fetched
+or the cursor is reused, closed or dropped. Its rows are the rows fetched for a
+query, the rows changed for INSERT / UPDATE / DELETE.
+
+Slow statements are appended to slow_queries.log next to the database: the time,
+duration, rows, the service line that ran it, the statement and its parameters, and
+its EXPLAIN QUERY PLAN.
+
+A scan that walks an index under a LIMIT (keyset paging, "top N by name") stops early
+and is allowed, and so is a scan of a partial index (it only holds the rows asked for,
+e.g. the low-stock index); a scan of a large table without an index, or of a whole
+index without a LIMIT, is not. Tables are "large" by what they hold in a real shop,
+not by their size in the test database, which is also how the planner sees them
+before ANALYZE.
+"""
+import functools, itertools, os, re, sqlite3, sys, threading, time
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List, Optional
+from app.utils import instrumentation
+
+TRACING = os.getenv("MYSHOP_SQL_TIMING") == "1" or os.getenv("MYSHOP_STRICT_PLANS") == "1"
+STRICT_PLANS = os.getenv("MYSHOP_STRICT_PLANS") == "1"
+SLOW_QUERY_MS = float(os.getenv("MYSHOP_SLOW_QUERY_MS") or 50)
+SLOW_LOG = "slow_queries.log"
+
+# tables that grow with the catalog or with every sale / movement
+LARGE_TABLES = frozenset({
+    "products", "sales", "sale_items", "stock_movements", "audit_logs",
+    "daily_product_sales", "monthly_product_sales", "stock_snapshots",
+})
+
+_perf = time.perf_counter
+_local = threading.local()
+_log_lock = threading.Lock()
+_plans = {}  # statement text -> full scans found in its plan (strict mode)
+
+
+class FullScanError(RuntimeError):
+    """Strict mode: a hot-path statement would scan a large table."""
+
+
+def hot_path(fn):
+    """
+    Mark a latency-critical service method (scanner lookup, search, sale): in strict
+    mode the statements it runs, directly or through other services, are checked for
+    full scans. Without strict mode the method is returned unchanged.
+    """
+    if not STRICT_PLANS:
+        return fn
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        _local.hot = getattr(_local, "hot", 0) + 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _local.hot -= 1
+    return wrapper
+
+
+# -----------------------
+# Plans
+# -----------------------
+_TABLE_REFS = re.compile(r"\b(?:FROM|JOIN|UPDATE|INTO)\s+(?:main\.)?(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.I)
+_NOT_ALIAS = frozenset({
+    "where", "join", "on", "left", "inner", "cross", "natural", "order", "group", "limit",
+    "using", "set", "values", "select", "default", "union", "except", "intersect", "having",
+    "window", "indexed", "not", "as",
+})
+_SCAN = re.compile(r"SCAN (\w+)")
+_USING_INDEX = re.compile(r"USING (?:COVERING )?INDEX (\w+)")
+_LIMIT = re.compile(r"\bLIMIT\b", re.I)
+
+
+def query_plan(conn, sql: str, parameters=()) -> List[str]:
+    """EXPLAIN QUERY PLAN details, indented by depth (run on an untraced cursor)."""
+    rows = sqlite3.Cursor(conn).execute("EXPLAIN QUERY PLAN " + sql, parameters).fetchall()
+    depth = {0: -1}
+    plan = []
+    for node, parent, _, detail in rows:
+        depth[node] = depth.get(parent, -1) + 1
+        plan.append("  " * depth[node] + detail)
+    return plan
+
+
+def partial_indexes(conn) -> set:
+    return {row[0] for row in sqlite3.Cursor(conn).execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND sql LIKE '% WHERE %'")}
+
+
+def full_scans(sql: str, plan: List[str], partial: Iterable[str] = ()) -> List[str]:
+    """The plan lines that scan a LARGE_TABLES table (see the module docstring)."""
+    tables = {}
+    for table, alias in _TABLE_REFS.findall(sql):
+        tables[table.lower()] = table.lower()
+        if alias and alias.lower() not in _NOT_ALIAS:
+            tables[alias.lower()] = table.lower()
+    scans = []
+    for line in plan:
+        detail = line.strip()
+        match = _SCAN.match(detail)
+        if match is None or "VIRTUAL TABLE" in detail:
+            continue
+        name = match.group(1).lower()
+        if tables.get(name, name) not in LARGE_TABLES:
+            continue
+        index = _USING_INDEX.search(detail)
+        if index is not None and (_LIMIT.search(sql) or index.group(1) in partial):
+            continue  # ordered index walk that stops at the LIMIT, or only the wanted rows
+        scans.append(detail)
+    return scans
+
+
+def check_plan(conn, sql: str, parameters):
+    """Strict mode, inside a @hot_path call: raise FullScanError if sql would scan a large table."""
+    if not getattr(_local, "hot", 0):
+        return
+    scans = _plans.get(sql)
+    if scans is None:
+        try:
+            scans = full_scans(sql, query_plan(conn, sql, parameters), partial_indexes(conn))
+        except sqlite3.Error:
+            scans = []  # not explainable (PRAGMA, BEGIN, ...): nothing to scan
+        _plans[sql] = scans
+    if scans:
+        instrumentation.count("full scans")
+        raise FullScanError(f"{'; '.join(scans)} in hot-path statement: {' '.join(sql.split())}")
+
+
+# -----------------------
+# Slow-query log
+# -----------------------
+def _caller() -> str:
+    """file:line function of the service code that ran the statement."""
+    frame = sys._getframe(1)
+    skip = (__file__, "db_sqlite3.py", "contextlib.py")
+    while frame is not None and frame.f_code.co_filename.endswith(skip):
+        frame = frame.f_back
+    if frame is None:
+        return "?"
+    return f"{Path(frame.f_code.co_filename).name}:{frame.f_lineno} {frame.f_code.co_name}"
+
+
+def log_slow(conn, sql: str, parameters, seconds: float, rows: int):
+    instrumentation.count("slow queries")
+    try:
+        plan = query_plan(conn, sql, parameters)
+    except sqlite3.Error as e:
+        plan = [f"(no plan: {e})"]
+    params = repr(parameters)
+    lines = [f"{datetime.now():%Y-%m-%d %H:%M:%S}  {seconds * 1000:.1f} ms  {rows} rows  {_caller()}",
+             "  " + " ".join(sql.split())]
+    if parameters:
+        lines.append("  params: " + (params if len(params) <= 300 else params[:300] + "…"))
+    lines += ["  plan: " + line for line in plan]
+    path = conn.slow_log_path()
+    if path is None:
+        return
+    with _log_lock, open(path, "a", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n\n")
+
+
+# -----------------------
+# Connection / cursor
+# -----------------------
+class TracedCursor(sqlite3.Cursor):
+    """
+    Cursor that times its statement: the time spent in execute() and in fetching its
+    rows, recorded once the last row is fetched or the cursor is reused or dropped.
+    """
+
+    _sql = None  # statement being timed
+
+    def _start(self, sql, parameters):
+        self._done()
+        if STRICT_PLANS:
+            check_plan(self.connection, sql, parameters)
+        self._sql, self._params, self._rows, self._elapsed = sql, parameters, 0, 0.0
+
+    def _done(self, changed: Optional[int] = None):
+        sql = self._sql
+        if sql is None:
+            return
+        self._sql = None
+        rows = self._rows if changed is None else changed
+        instrumentation.observe_sql(sql, self._elapsed, rows)
+        if self._elapsed * 1000 >= SLOW_QUERY_MS:
+            log_slow(self.connection, sql, self._params, self._elapsed, rows)
+
+    def execute(self, sql, parameters=()):
+        self._start(sql, parameters)
+        start = _perf()
+        try:
+            super().execute(sql, parameters)
+        except BaseException:
+            self._sql = None
+            raise
+        self._elapsed += _perf() - start
+        if self.description is None:  # no result rows: INSERT / UPDATE / DDL / BEGIN ...
+            self._done(max(self.rowcount, 0))
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        params = iter(seq_of_parameters)
+        first = next(params, None)
+        if first is None:
+            return super().executemany(sql, ())
+        self._start(sql, first)
+        start = _perf()
+        try:
+            super().executemany(sql, itertools.chain((first,), params))
+        except BaseException:
+            self._sql = None
+            raise
+        self._elapsed += _perf() - start
+        self._done(max(self.rowcount, 0))
+        return self
+
+    def fetchone(self):
+        start = _perf()
+        row = super().fetchone()
+        if self._sql is not None:
+            self._elapsed += _perf() - start
+            if row is None:
+                self._done()
+            else:
+                self._rows += 1
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        start = _perf()
+        rows = super().fetchmany(size)
+        if self._sql is not None:
+            self._elapsed += _perf() - start
+            self._rows += len(rows)
+            if len(rows) < size:
+                self._done()
+        return rows
+
+    def fetchall(self):
+        start = _perf()
+        rows = super().fetchall()
+        if self._sql is not None:
+            self._elapsed += _perf() - start
+            self._rows += len(rows)
+            self._done()
+        return rows
+
+    def __next__(self):
+        start = _perf()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            if self._sql is not None:
+                self._elapsed += _perf() - start
+            self._done()
+            raise
+        if self._sql is not None:
+            self._elapsed += _perf() - start
+            self._rows += 1
+        return row
+
+    def close(self):
+        self._done()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._done()
+        except Exception:
+            pass  # interpreter shutdown, connection already closed
+
+
+class TracedConnection(sqlite3.Connection):
+    """sqlite3 connection whose cursors, including the execute() shortcuts, are TracedCursors."""
+
+    _slow_log = None
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    # sqlite3.Connection.execute() makes a plain cursor in C, not through cursor()
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def slow_log_path(self) -> Optional[Path]:
+        """SLOW_LOG next to the main database file (None for an in-memory database)."""
+        if self._slow_log is None:
+            main_file = next((row[2] for row in sqlite3.Cursor(self).execute("PRAGMA database_list")
+                              if row[1] == "main"), "")
+            self._slow_log = Path(main_file).parent / SLOW_LOG if main_file else False
+        return self._slow_log or None
+
+
+def connection_factory():
+    """The sqlite3.connect() factory for the app's connections."""
+    return TracedConnection if TRACING else sqlite3.Connection
@@ -0,0 +1,99 @@
+# app/services/reorder_service.py
+from datetime import datetime, timedelta
+from app.services.db_sqlite3 import ConnectionPool, get_pool
+from app.services.query_trace import hot_path
+from app.utils.quantity import MILLI
+from app.utils.instrumentation import timed
+from typing import Optional, List
+
+# must match the WHERE of product_low_stock_idx (migration 4) for SQLite to use it
+LOW_STOCK_WHERE = "p.reorder_threshold_milli > 0 AND p.stock_milli <= p.reorder_threshold_milli"
+
+
+class ReorderSuggestion:
+    """How many supply packs to order for one low-stock product."""
+    __slots__ = ("product_id", "ur_name", "en_name", "unit", "stock_milli", "reorder_threshold_milli",
+                 "supply_pack_milli", "daily_sales_milli", "days_left", "packs", "order_milli")
+
+    def __init__(self, product_id, ur_name, en_name, unit, stock_milli, reorder_threshold_milli,
+                 supply_pack_milli, daily_sales_milli, days_left, packs, order_milli):
+        self.product_id = product_id
+        self.ur_name = ur_name
+        self.en_name = en_name
+        self.unit = unit
+        self.stock_milli = stock_milli
+        self.reorder_threshold_milli = reorder_threshold_milli
+        self.supply_pack_milli = supply_pack_milli
+        self.daily_sales_milli = daily_sales_milli  # milli-units per day over the window
+        self.days_left = days_left                  # None when nothing sold in the window
+        self.packs = packs
+        self.order_milli = order_milli              # packs * supply_pack_milli
+
+    def __repr__(self):
+        return f"ReorderSuggestion(product_id={self.product_id}, packs={self.packs}, days_left={self.days_left})"
+
+
+class ReorderService:
+    """
+    Low-stock list and reorder suggestions.
+
+    Both read only the low-stock products through product_low_stock_idx; the sales
+    velocity for all of them comes from one grouped join on stock_movements (sales in
+    the last `window_days`, via stock_movements_product_idx), not a query per product.
+    """
+
+    def __init__(self, pool: Optional[ConnectionPool] = None):
+        self.pool = pool or get_pool()
+
+    def low_stock_count(self) -> int:
+        with self.pool.read() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM products p WHERE {LOW_STOCK_WHERE}").fetchone()[0]
+
+    @timed
+    @hot_path
+    def low_stock(self) -> List[tuple]:
+        """(id, short_code, ur_name, en_name, unit, stock_milli, reorder_threshold_milli) of low-stock products."""
+        with self.pool.read() as conn:
+            return conn.execute(f"""
+                SELECT p.id, p.short_code, p.ur_name, p.en_name, p.unit, p.stock_milli, p.reorder_threshold_milli
+                FROM products p WHERE {LOW_STOCK_WHERE}
+                ORDER BY p.stock_milli * 1.0 / p.reorder_threshold_milli, p.id
+            """).fetchall()
+
+    @timed
+    def suggestions(self, window_days: int = 30, cover_days: int = 14) -> List[ReorderSuggestion]:
+        """
+        Packs to order so stock lasts `cover_days` at the recent sales rate and is back
+        above the reorder threshold: need = daily_sales * cover_days + threshold - stock,
+        rounded up to whole supply packs (at least one). Most urgent (fewest days of
+        stock left) first.
+        """
+        if window_days <= 0:
+            raise ValueError("window_days must be positive")
+        since = (datetime.now() - timedelta(days=window_days)).isoformat()
+        with self.pool.read() as conn:
+            rows = conn.execute(f"""
+                SELECT p.id, p.ur_name, p.en_name, p.unit, p.stock_milli, p.reorder_threshold_milli,
+                       p.supply_pack_milli, COALESCE(-SUM(m.qty_milli), 0) AS sold
+                FROM products p
+                LEFT JOIN stock_movements m
+                       ON m.product_id = p.id AND m.reason = 'sale' AND m.created_at >= ?
+                WHERE {LOW_STOCK_WHERE}
+                GROUP BY p.id
+            """, (since,)).fetchall()
+
+        result = []
+        for product_id, ur_name, en_name, unit, stock_milli, threshold, pack_milli, sold in rows:
+            stock_milli = max(stock_milli or 0, 0)
+            pack_milli = pack_milli if (pack_milli or 0) > 0 else MILLI
+            sold = max(sold, 0)
+            # need * window_days, all integers: sold * cover_days + (threshold - stock) * window_days
+            need_scaled = sold * cover_days + (threshold - stock_milli) * window_days
+            packs = max(1, -(-need_scaled // (pack_milli * window_days)))  # ceil
+            result.append(ReorderSuggestion(
+                product_id, ur_name, en_name, unit, stock_milli, threshold, pack_milli,
+                sold // window_days, round(stock_milli * window_days / sold, 1) if sold else None,
+                packs, packs * pack_milli,
+            ))
+        result.sort(key=lambda s: (s.days_left is None, s.days_left or 0, s.product_id))
+        return result
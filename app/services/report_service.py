@@ -0,0 +1,146 @@
+# app/services/report_service.py
+from app.services.db_sqlite3 import ConnectionPool, get_pool
+from app.services.query_trace import hot_path
+from app.utils.instrumentation import timed
+from datetime import date, timedelta
+from typing import Optional, List, Dict, Any, Tuple
+
+# top_products() orderings: (expression inside the grouped subquery, result column number)
+_TOP_ORDER = {
+    "sales": ("sales_total", 5),
+    "profit": ("sales_total - cost_total", 7),
+    "qty": ("qty_milli", 4),
+}
+
+
+_NO_RANGE = ("9999", "0000")  # BETWEEN bounds that match nothing
+
+
+def _split_months(start: str, end: str) -> Tuple[Tuple[str, str], List[Tuple[str, str]]]:
+    """
+    Split an inclusive day range into whole months ('YYYY-MM' bounds, or _NO_RANGE) and
+    the leftover day ranges at either end (at most two).
+    """
+    first, last = date.fromisoformat(start), date.fromisoformat(end)
+    month_start = first if first.day == 1 else (first.replace(day=28) + timedelta(days=4)).replace(day=1)
+    month_end = last if (last + timedelta(days=1)).day == 1 else last.replace(day=1) - timedelta(days=1)
+    if month_start > month_end:
+        return _NO_RANGE, [(start, end)]
+    edges = []
+    if first < month_start:
+        edges.append((start, (month_start - timedelta(days=1)).isoformat()))
+    if month_end < last:
+        edges.append(((month_end + timedelta(days=1)).isoformat(), end))
+    return (month_start.isoformat()[:7], month_end.isoformat()[:7]), edges
+
+
+class ReportService:
+    """
+    Sales / profit reports answered from the daily aggregates (app.services.sales_aggregates),
+    never from sale_items. Days are 'YYYY-MM-DD' strings, ranges are inclusive, amounts paisa.
+    """
+
+    def __init__(self, pool: Optional[ConnectionPool] = None):
+        self.pool = pool or get_pool()
+
+    @timed
+    @hot_path
+    def summary(self, start: str, end: str) -> Dict[str, Any]:
+        """Totals for the range: receipts, item sales, cost, profit and margin (%)."""
+        with self.pool.read() as conn:
+            cur = conn.cursor()
+            cur.execute("""
+                SELECT COALESCE(SUM(sale_count), 0), COALESCE(SUM(total_before_discounts), 0),
+                       COALESCE(SUM(discount), 0), COALESCE(SUM(tax), 0), COALESCE(SUM(charged_total), 0)
+                FROM daily_sales WHERE day BETWEEN ? AND ?
+            """, (start, end))
+            sale_count, gross, discount, tax, charged_total = cur.fetchone()
+            cur.execute("""
+                SELECT COALESCE(SUM(sales_total), 0), COALESCE(SUM(cost_total), 0)
+                FROM daily_category_sales WHERE day BETWEEN ? AND ?
+            """, (start, end))
+            sales_total, cost_total = cur.fetchone()
+        profit = sales_total - cost_total
+        return {
+            "sale_count": sale_count,
+            "total_before_discounts": gross,
+            "discount": discount,
+            "tax": tax,
+            "charged_total": charged_total,
+            "sales_total": sales_total,
+            "cost_total": cost_total,
+            "profit": profit,
+            "margin": round(profit * 100.0 / sales_total, 2) if sales_total else 0.0,
+        }
+
+    @timed
+    @hot_path
+    def sales_by_day(self, start: str, end: str) -> List[tuple]:
+        """(day, sale_count, charged_total, sales_total, cost_total, profit) per day with sales."""
+        with self.pool.read() as conn:
+            cur = conn.cursor()
+            cur.execute("""
+                SELECT s.day, s.sale_count, s.charged_total,
+                       COALESCE(c.sales_total, 0), COALESCE(c.cost_total, 0),
+                       COALESCE(c.sales_total - c.cost_total, 0)
+                FROM daily_sales s
+                LEFT JOIN (SELECT day, SUM(sales_total) AS sales_total, SUM(cost_total) AS cost_total
+                           FROM daily_category_sales WHERE day BETWEEN ? AND ?
+                           GROUP BY day) c ON c.day = s.day
+                WHERE s.day BETWEEN ? AND ?
+                ORDER BY s.day
+            """, (start, end, start, end))
+            return cur.fetchall()
+
+    @timed
+    @hot_path
+    def top_products(self, start: str, end: str, n: int = 10, by: str = "sales") -> List[tuple]:
+        """
+        Best n products in the range, by "sales", "profit" or "qty".
+        Rows: (product_id, ur_name, en_name, qty_milli, sales_total, cost_total, profit)
+        Whole months are read from monthly_product_sales, only the days at the edges
+        from daily_product_sales.
+        """
+        if by not in _TOP_ORDER:
+            raise ValueError(f"unknown ordering {by!r}, expected one of {', '.join(_TOP_ORDER)}")
+        months, edges = _split_months(start, end)
+        edges = (edges + [_NO_RANGE, _NO_RANGE])[:2]
+        with self.pool.read() as conn:
+            cur = conn.cursor()
+            expr, column = _TOP_ORDER[by]
+            cur.execute(f"""
+                SELECT t.product_id, p.ur_name, p.en_name, t.qty_milli, t.sales_total, t.cost_total,
+                       t.sales_total - t.cost_total
+                FROM (SELECT product_id, SUM(qty_milli) AS qty_milli, SUM(sales_total) AS sales_total,
+                             SUM(cost_total) AS cost_total
+                      FROM (SELECT product_id, qty_milli, sales_total, cost_total
+                            FROM monthly_product_sales WHERE month BETWEEN ? AND ?
+                            UNION ALL
+                            SELECT product_id, qty_milli, sales_total, cost_total
+                            FROM daily_product_sales WHERE day BETWEEN ? AND ?
+                            UNION ALL
+                            SELECT product_id, qty_milli, sales_total, cost_total
+                            FROM daily_product_sales WHERE day BETWEEN ? AND ?)
+                      GROUP BY product_id
+                      ORDER BY {expr} DESC LIMIT ?) AS t
+                LEFT JOIN products p ON p.id = t.product_id
+                ORDER BY {column} DESC
+            """, (*months, *edges[0], *edges[1], int(n)))
+            return cur.fetchall()
+
+    @timed
+    @hot_path
+    def sales_by_category(self, start: str, end: str) -> List[tuple]:
+        """(category_id, name, qty_milli, sales_total, cost_total, profit); category 0 = uncategorised."""
+        with self.pool.read() as conn:
+            cur = conn.cursor()
+            cur.execute("""
+                SELECT d.category_id, c.name, SUM(d.qty_milli), SUM(d.sales_total), SUM(d.cost_total),
+                       SUM(d.sales_total) - SUM(d.cost_total)
+                FROM daily_category_sales d
+                LEFT JOIN categories c ON c.id = d.category_id
+                WHERE d.day BETWEEN ? AND ?
+                GROUP BY d.category_id
+                ORDER BY 4 DESC
+            """, (start, end))
+            return cur.fetchall()
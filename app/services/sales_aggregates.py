@@ -0,0 +1,145 @@
+# app/services/sales_aggregates.py
+"""
+Daily sales aggregates (migration 3): daily_sales, daily_product_sales,
+daily_category_sales and the monthly_product_sales rollup, so reports never scan
+sale_items.
+
+SaleService.checkout adds every sale to them inside its own transaction (apply_sale).
+rebuild() recomputes them from sales / sale_items, e.g. after editing past sales by
+hand or restoring an old backup:
+
+    python -m app.services.sales_aggregates [--from YYYY-MM-DD] [--db path/to/shop.db]
+
+Categories are the product's category at the time the row was aggregated.
+"""
+import argparse, sqlite3, time
+from app.services.db_sqlite3 import get_pool
+from typing import Dict, List, Optional, Tuple
+
+
+def day_of(created_at: str) -> str:
+    """'YYYY-MM-DD' of an ISO created_at (datetime.now().isoformat() or CURRENT_TIMESTAMP)."""
+    return created_at[:10]
+
+
+# -----------------------
+# Incremental (checkout)
+# -----------------------
+_UPSERT_DAY = """
+    INSERT INTO daily_sales (day, sale_count, total_before_discounts, discount, tax, charged_total)
+    VALUES (?, 1, ?, ?, ?, ?)
+    ON CONFLICT(day) DO UPDATE SET
+        sale_count = sale_count + 1,
+        total_before_discounts = total_before_discounts + excluded.total_before_discounts,
+        discount = discount + excluded.discount,
+        tax = tax + excluded.tax,
+        charged_total = charged_total + excluded.charged_total
+"""
+
+_UPSERT_LINES = """
+    INSERT INTO {table} ({period}, {key}, qty_milli, sales_total, cost_total, line_count)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT({period}, {key}) DO UPDATE SET
+        qty_milli = qty_milli + excluded.qty_milli,
+        sales_total = sales_total + excluded.sales_total,
+        cost_total = cost_total + excluded.cost_total,
+        line_count = line_count + excluded.line_count
+"""
+
+
+def _sum_by(lines, key_index) -> Dict[int, List]:
+    totals: Dict[int, List] = {}
+    for line in lines:
+        acc = totals.setdefault(line[key_index], [0, 0, 0, 0])
+        acc[0] += line[2]
+        acc[1] += line[3]
+        acc[2] += line[4]
+        acc[3] += 1
+    return totals
+
+
+def apply_sale(cur: sqlite3.Cursor, day: str, header: Tuple[int, int, int, int],
+               lines: List[Tuple[int, Optional[int], int, int, int]]):
+    """
+    Add one sale to the aggregates (call inside the sale's transaction).
+    header: (total_before_discounts, discount, tax, charged_total)
+    lines: (product_id, category_id, qty_milli, line_charged, line_cost_total)
+    """
+    cur.execute(_UPSERT_DAY, (day, *header))
+    lines = [(pid, cat or 0, qty_milli, charged, cost) for pid, cat, qty_milli, charged, cost in lines]
+    by_product = _sum_by(lines, 0).items()
+    for table, period, value, key, totals in (
+        ("daily_product_sales", "day", day, "product_id", by_product),
+        ("monthly_product_sales", "month", day[:7], "product_id", by_product),
+        ("daily_category_sales", "day", day, "category_id", _sum_by(lines, 1).items()),
+    ):
+        cur.executemany(_UPSERT_LINES.format(table=table, period=period, key=key),
+                        [(value, k, *acc) for k, acc in totals])
+
+
+# -----------------------
+# Rebuild
+# -----------------------
+def rebuild(conn: sqlite3.Connection, from_day: Optional[str] = None) -> int:
+    """
+    Recompute the aggregates for days >= from_day (all days when None) with grouped
+    INSERT ... SELECTs; the monthly rollup is redone for from_day's whole month. Call
+    inside a write transaction. Returns the number of (day, product) rows written.
+    """
+    where, params = "", ()
+    if from_day:
+        where, params = "WHERE {col} >= ?", (from_day,)
+    for table in ("daily_sales", "daily_product_sales", "daily_category_sales"):
+        conn.execute(f"DELETE FROM {table} {where.format(col='day')}", params)
+    month_params = (from_day[:7],) if from_day else ()
+    conn.execute(f"DELETE FROM monthly_product_sales {where.format(col='month')}", month_params)
+
+    conn.execute(f"""
+        INSERT INTO daily_sales (day, sale_count, total_before_discounts, discount, tax, charged_total)
+        SELECT substr(created_at, 1, 10), COUNT(*), SUM(total_before_discounts), SUM(discount),
+               SUM(tax), SUM(charged_total)
+        FROM sales {where.format(col='created_at')}
+        GROUP BY 1
+    """, params)
+    cur = conn.execute(f"""
+        INSERT INTO daily_product_sales (day, product_id, qty_milli, sales_total, cost_total, line_count)
+        SELECT substr(created_at, 1, 10), product_id, SUM(qty_milli), SUM(line_charged),
+               SUM(line_cost_total), COUNT(*)
+        FROM sale_items {where.format(col='created_at')}
+        GROUP BY 1, 2
+    """, params)
+    written = cur.rowcount
+    # categories from the (much smaller) product aggregate, not sale_items again
+    conn.execute(f"""
+        INSERT INTO daily_category_sales (day, category_id, qty_milli, sales_total, cost_total, line_count)
+        SELECT d.day, COALESCE(p.category_id, 0), SUM(d.qty_milli), SUM(d.sales_total),
+               SUM(d.cost_total), SUM(d.line_count)
+        FROM daily_product_sales d
+        LEFT JOIN products p ON p.id = d.product_id
+        {where.format(col='d.day')}
+        GROUP BY 1, 2
+    """, params)
+    conn.execute(f"""
+        INSERT INTO monthly_product_sales (month, product_id, qty_milli, sales_total, cost_total, line_count)
+        SELECT substr(day, 1, 7), product_id, SUM(qty_milli), SUM(sales_total), SUM(cost_total), SUM(line_count)
+        FROM daily_product_sales {where.format(col='day')}
+        GROUP BY 1, 2
+    """, (month_params[0] + "-01",) if from_day else ())
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild the daily sales aggregates used by reports.")
+    parser.add_argument("--from", dest="from_day", help="only rebuild days >= YYYY-MM-DD")
+    parser.add_argument("--db", help="database path (default: the app's shop.db)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    pool = get_pool(args.db)
+    with pool.transaction() as conn:
+        written = rebuild(conn, args.from_day)
+    print(f"Rebuilt {written} day x product rows in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# app/services/search_cache.py
+import re, threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from app.services.events import ProductChange, STOCK
+from app.services.product_queries import SearchHit
+from app.services.product_service import ProductService
+from app.utils.urdu import normalize
+from app.utils.instrumentation import count, timed
+
+# searchable fields of a ProductService.search() hit (app.services.product_queries.SearchHit)
+_TEXT_FIELDS = ("short_code", "ur_name", "en_name", "company", "barcode")
+
+
+def _words(text: str) -> List[str]:
+    """Fold and split like the FTS tokenizer does (see ProductService._fts_query)."""
+    return re.findall(r"\w+", normalize(text or "").casefold())
+
+
+def _matches(row, words: List[str]) -> bool:
+    """Every query word is a prefix of some word of the row's searchable text."""
+    tokens = []
+    for field in _TEXT_FIELDS:
+        tokens.extend(_words(getattr(row, field)))
+    return all(any(tok.startswith(w) for tok in tokens) for w in words)
+
+
+class PrefixSearchCache:
+    """
+    LRU cache of ProductService.search() results for type-ahead.
+
+    Keys are the folded query words. Each entry remembers whether the DB returned
+    fewer than `fetch_limit` rows, i.e. the complete match set. While typing "چی" ->
+    "چین" -> "چینی" every longer query matches a subset of the shorter one, so once
+    a prefix is complete the following keystrokes are filtered in memory from it and
+    never reach SQLite. Narrowed results keep the shorter query's bm25 order.
+
+    Results of the LIKE fallback (unmigrated DB without the FTS table) are substring
+    matches, not prefix matches, so they are stored as incomplete and never narrowed.
+
+    Product create/update/delete events clear the cache; stock changes don't (the
+    suggestions only show names, and the picked product is read from the index).
+    clear() bumps a generation, and results read from the DB (or narrowed from an
+    entry) before a clear are not stored after it.
+    """
+
+    def __init__(self, product_service: Optional[ProductService] = None,
+                 capacity: int = 64, limit: int = 10, fetch_limit: int = 100):
+        self.product_service = product_service or ProductService()
+        self.capacity = capacity
+        self.limit = limit
+        self.fetch_limit = fetch_limit
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[List[SearchHit], bool]]" = OrderedDict()
+        self._generation = 0  # bumped by clear()
+        self.product_service.pool.events.subscribe(self.on_change)
+
+    # -----------------------
+    # Lookups
+    # -----------------------
+    def peek(self, term: str) -> Optional[List[SearchHit]]:
+        """Top `limit` rows if the cache can answer without the DB, else None."""
+        key = " ".join(_words(term))
+        if not key:
+            return None
+        with self._lock:
+            generation = self._generation
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry[0][:self.limit]
+            # longest complete shorter prefix: its rows are a superset of ours
+            for end in range(len(key) - 1, 0, -1):
+                shorter = self._entries.get(key[:end])
+                if shorter is not None and shorter[1]:
+                    break
+            else:
+                return None
+        words = key.split(" ")
+        rows = [row for row in shorter[0] if _matches(row, words)]
+        self._store(key, rows, True, generation)
+        return rows[:self.limit]
+
+    @timed
+    def search(self, term: str) -> List[SearchHit]:
+        """Top `limit` matches, from the cache when possible (may hit the DB)."""
+        rows = self.peek(term)
+        if rows is not None:
+            count("SearchCache hits")
+            return rows
+        key = " ".join(_words(term))
+        if not key:
+            return []
+        count("SearchCache misses")
+        generation = self._generation
+        rows, prefix_matches = self.product_service.search_hits(term, limit=self.fetch_limit)
+        self._store(key, rows, prefix_matches and len(rows) < self.fetch_limit, generation)
+        return rows[:self.limit]
+
+    # -----------------------
+    # Maintenance
+    # -----------------------
+    def _store(self, key: str, rows: List[SearchHit], complete: bool, generation: int):
+        with self._lock:
+            if generation != self._generation:
+                return  # read before a clear(): may predate the product change
+            self._entries[key] = (rows, complete)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def on_change(self, change: ProductChange):
+        if change.kind != STOCK:
+            self.clear()
+
+    def __len__(self):
+        return len(self._entries)
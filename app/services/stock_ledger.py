@@ -0,0 +1,214 @@
+# app/services/stock_ledger.py
+"""
+Stock ledger: daily stock snapshots, stock as of a date and reconciliation.
+
+The ledger of a product is its opening balance (archived movements, see
+app.services.archive) plus its stock_movements. close_day() writes the end-of-day
+balance of every product that moved that day into stock_snapshots, computed from the
+previous snapshot and only that day's movements. Stock on any date is then the
+product's latest snapshot on or before it plus the few movements after it.
+
+reconcile() compares products.stock_milli with the ledger for all products in one
+grouped query (last snapshot + movements since the last closed day) and reports the
+drift; correct() books inventory_correction movements so the ledger matches again.
+Quantities are integer milli-units, so any difference at all is real drift.
+
+    python -m app.services.stock_ledger close|reconcile [--fix] [--db path/to/shop.db]
+"""
+import argparse, time
+from datetime import date, datetime, timedelta
+from app.services.db_sqlite3 import ConnectionPool, get_pool
+from app.utils.quantity import format_qty
+from app.utils.instrumentation import timed
+from typing import Dict, List, Optional
+
+
+def next_day(day: str) -> str:
+    return (date.fromisoformat(day) + timedelta(days=1)).isoformat()
+
+
+class StockLedgerService:
+    def __init__(self, pool: Optional[ConnectionPool] = None):
+        self.pool = pool or get_pool()
+
+    # -----------------------
+    # Day close
+    # -----------------------
+    def last_closed_day(self) -> Optional[str]:
+        with self.pool.read() as conn:
+            return conn.execute("SELECT MAX(day) FROM stock_snapshot_runs").fetchone()[0]
+
+    def close_day(self, day: str) -> int:
+        """
+        Snapshot stock at the end of `day` (YYYY-MM-DD, before today). Days must be
+        closed in order; closing a day that is already closed does nothing.
+        Returns the number of snapshot rows written.
+        """
+        if day >= date.today().isoformat():
+            raise ValueError(f"only past days can be closed (got {day!r})")
+        end = next_day(day)
+        with self.pool.transaction() as conn:
+            last = conn.execute("SELECT MAX(day) FROM stock_snapshot_runs").fetchone()[0]
+            if last is not None and day <= last:
+                return 0
+            archived = conn.execute("SELECT MAX(archived_through) FROM archive_files").fetchone()[0]
+            if last is None or (archived and next_day(last) < archived):
+                # first close (or movements since the last one were archived since):
+                # baseline for every product from opening balances + the hot ledger
+                written = conn.execute("""
+                    INSERT INTO stock_snapshots (product_id, day, qty_milli)
+                    SELECT product_id, ?, SUM(qty_milli) FROM (
+                        SELECT product_id, qty_milli FROM stock_opening_balances
+                        UNION ALL
+                        SELECT product_id, qty_milli FROM stock_movements WHERE created_at < ?
+                    ) GROUP BY product_id
+                """, (day, end)).rowcount
+            else:
+                written = conn.execute("""
+                    INSERT INTO stock_snapshots (product_id, day, qty_milli)
+                    SELECT m.product_id, ?, SUM(m.qty_milli) + COALESCE((
+                        SELECT s.qty_milli FROM stock_snapshots s
+                        WHERE s.product_id = m.product_id ORDER BY s.day DESC LIMIT 1), 0)
+                    FROM stock_movements m
+                    WHERE m.created_at >= ? AND m.created_at < ?
+                    GROUP BY m.product_id
+                """, (day, next_day(last), end)).rowcount
+            conn.execute("INSERT INTO stock_snapshot_runs (day, products) VALUES (?, ?)", (day, written))
+        return written
+
+    @timed
+    def close_pending(self) -> int:
+        """Close every day up to yesterday that is not closed yet (app start). Returns days closed."""
+        yesterday = (date.today() - timedelta(days=1)).isoformat()
+        last = self.last_closed_day()
+        if last is None:
+            self.close_day(yesterday)  # no history to step through: one baseline
+            return 1
+        closed = 0
+        day = next_day(last)
+        while day <= yesterday:
+            self.close_day(day)
+            closed += 1
+            day = next_day(day)
+        return closed
+
+    # -----------------------
+    # Point in time
+    # -----------------------
+    @timed
+    def stock_as_of(self, product_id: int, day: str) -> int:
+        """Stock of one product at the end of `day`: nearest snapshot + movements after it."""
+        end = next_day(day)
+        with self.pool.read() as conn:
+            snap = conn.execute("""
+                SELECT day, qty_milli FROM stock_snapshots
+                WHERE product_id = ? AND day <= ? ORDER BY day DESC LIMIT 1
+            """, (product_id, day)).fetchone()
+            closed = conn.execute("SELECT MIN(day) FROM stock_snapshot_runs").fetchone()[0]
+            archived = conn.execute("SELECT MAX(archived_through) FROM archive_files").fetchone()[0] or ""
+
+            if snap is not None:
+                base, start = snap[1], next_day(snap[0])
+            elif closed is not None and closed <= day:
+                base, start = 0, next_day(closed)  # closed since, never moved before then
+            else:
+                base, start = None, ""                 # before any snapshot: whole ledger
+
+            if start >= archived:
+                if base is None:
+                    row = conn.execute("SELECT qty_milli FROM stock_opening_balances WHERE product_id = ?",
+                                       (product_id,)).fetchone()
+                    base, start = (row[0] if row else 0), archived
+                delta = conn.execute("""
+                    SELECT COALESCE(SUM(qty_milli), 0) FROM stock_movements
+                    WHERE product_id = ? AND created_at >= ? AND created_at < ?
+                """, (product_id, start, end)).fetchone()[0]
+                return base + delta
+
+        # the range reaches into archived months
+        from app.services.archive import ArchiveService
+        with ArchiveService(self.pool).history() as conn:
+            delta = conn.execute("""
+                SELECT COALESCE(SUM(qty_milli), 0) FROM all_stock_movements
+                WHERE product_id = ? AND created_at >= ? AND created_at < ?
+            """, (product_id, start, end)).fetchone()[0]
+        return (base or 0) + delta
+
+    # -----------------------
+    # Reconciliation
+    # -----------------------
+    @timed
+    def reconcile(self) -> List[tuple]:
+        """
+        (product_id, ur_name, stock_milli, ledger_milli) for every product whose stock_milli
+        differs from its ledger, largest drift first.
+        """
+        with self.pool.read() as conn:
+            last = conn.execute("SELECT MAX(day) FROM stock_snapshot_runs").fetchone()[0]
+            archived = conn.execute("SELECT MAX(archived_through) FROM archive_files").fetchone()[0]
+            if last is not None and not (archived and next_day(last) < archived):
+                # latest snapshot of each product: one seek on the (product_id, day) key
+                base_sql = """(SELECT s.qty_milli FROM stock_snapshots s
+                               WHERE s.product_id = p.id ORDER BY s.day DESC LIMIT 1)"""
+                since = next_day(last)
+                # only the movements since then, by date: otherwise SQLite walks the
+                # (product_id, created_at) index to skip the GROUP BY sort, i.e. the whole table
+                hint = "INDEXED BY stock_movements_created_idx"
+            else:
+                # no usable snapshot: opening balances + the whole hot ledger
+                base_sql = "(SELECT b.qty_milli FROM stock_opening_balances b WHERE b.product_id = p.id)"
+                since, hint = "", ""
+            return conn.execute(f"""
+                SELECT id, ur_name, stock_milli, ledger FROM (
+                    SELECT p.id, p.ur_name, p.stock_milli,
+                           COALESCE({base_sql}, 0) + COALESCE(m.qty_milli, 0) AS ledger
+                    FROM products p
+                    LEFT JOIN (SELECT product_id, SUM(qty_milli) AS qty_milli FROM stock_movements {hint}
+                               WHERE created_at >= ? GROUP BY product_id) m ON m.product_id = p.id
+                )
+                WHERE COALESCE(stock_milli, 0) <> ledger
+                ORDER BY ABS(COALESCE(stock_milli, 0) - ledger) DESC, id
+            """, (since,)).fetchall()
+
+    def correct(self, drifts: List[tuple], created_by: Optional[str] = None) -> int:
+        """
+        Book an inventory_correction movement of (stock_milli - ledger) for each drift
+        from reconcile(). stock_milli is kept: it is the counted stock the shop works with.
+        """
+        if not drifts:
+            return 0
+        now = datetime.now().isoformat()
+        with self.pool.transaction() as conn:
+            conn.executemany("""
+                INSERT INTO stock_movements (product_id, qty_milli, reason, related_doc, created_at, created_by)
+                VALUES (?, ?, 'inventory_correction', 'reconciliation', ?, ?)
+            """, [(pid, (stock or 0) - ledger, now, created_by) for pid, _, stock, ledger in drifts])
+            for pid, _, stock, ledger in drifts:
+                self.pool.audit.record("product", "reconcile", pid, "stock_milli", ledger, stock)
+        return len(drifts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Close stock days and reconcile stock_milli with the movement ledger.")
+    parser.add_argument("command", choices=("close", "reconcile"))
+    parser.add_argument("--fix", action="store_true", help="reconcile: book correction movements for the drift")
+    parser.add_argument("--db", help="database path (default: the app's shop.db)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    ledger = StockLedgerService(get_pool(args.db))
+    if args.command == "close":
+        print(f"Closed {ledger.close_pending()} day(s), last closed {ledger.last_closed_day()}")
+    else:
+        drifts = ledger.reconcile()
+        for pid, name, stock, ledger_milli in drifts:
+            print(f"product {pid} {name}: stock {format_qty(stock)}, ledger {format_qty(ledger_milli)}, "
+                  f"drift {format_qty((stock or 0) - ledger_milli)}")
+        print(f"{len(drifts)} product(s) drifted")
+        if args.fix and drifts:
+            print(f"Booked {ledger.correct(drifts)} correction movement(s)")
+    print(f"Done in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,105 +1,218 @@
 # app/services/stock_service.py
-from app.services.db_sqlite3 import get_connection
+import json
+from app.services.db_sqlite3 import ConnectionPool, get_pool
+from app.services.query_trace import hot_path
+from app.services.events import ProductChange, STOCK
+from app.utils.quantity import line_milli, to_milli
+from app.utils.instrumentation import timed
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List, Dict, Any, Iterable
+
+
+class MovementBatchError(ValueError):
+    """
+    Raised by StockService.record_movements when one or more lines are invalid.
+    Nothing from the batch is written. `errors` is a list of (line_index, message).
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__("; ".join(f"line {i + 1}: {msg}" for i, msg in errors))
 
 
 class StockService:
-    def __init__(self):
-        self.conn = get_connection()
+    def __init__(self, pool: Optional[ConnectionPool] = None):
+        self.pool = pool or get_pool()
 
+    @timed
     def record_movement(self,
                         product_id: int,
-                        qty: float,
+                        qty,
                         reason: str,
                         reference_id: Optional[int] = None,
                         related_doc: Optional[str] = None,
                         unit: Optional[str] = None,
                         cost_total: Optional[float] = None,
-                        created_by: Optional[str] = None) -> float:
+                        created_by: Optional[str] = None,
+                        qty_milli: Optional[int] = None) -> int:
         """
-        Record a stock movement and update products.stock_qty atomically.
+        Record a stock movement and update products.stock_milli atomically.
 
-        - qty: quantity in the product's base unit (positive for incoming, negative for outgoing).
+        - qty: quantity in the product's base unit (positive for incoming, negative for outgoing),
+          as int / float / str / Decimal; or pass exact milli-units as qty_milli instead.
         - reason: 'purchase_receipt', 'sale', 'manual_adjust', 'return', ...
         - cost_total: money amount in rupees (float) OR paisa int. If float, multiplied by 100.
-        - Returns the new stock_qty (float).
+        - Returns the new stock in milli-units.
         """
-
-        cur = self.conn.cursor()
+        line = {
+            "product_id": product_id,
+            "qty": qty,
+            "qty_milli": qty_milli,
+            "reason": reason,
+            "reference_id": reference_id,
+            "related_doc": related_doc,
+            "unit": unit,
+            "cost_total": cost_total,
+            "created_by": created_by,
+        }
         try:
-            # fetch product to determine default unit and current stock
-            cur.execute("SELECT unit, stock_qty FROM products WHERE id = ?", (product_id,))
-            p = cur.fetchone()
-            if p is None:
-                raise ValueError(f"product id {product_id} not found")
-            product_unit, current_stock = p[0], float(p[1] or 0.0)
-            action_unit = unit if unit is not None else product_unit
-
-            cost_total_paisa = None
-            if cost_total is not None:
-                try:
-                    cost_total_paisa = int(cost_total)
-                except Exception:
-                    cost_total_paisa = None
+            return self.record_movements([line])[0]
+        except MovementBatchError as e:
+            raise ValueError(e.errors[0][1]) from None
 
-            now = datetime.now().isoformat()
+    @timed
+    @hot_path
+    def record_movements(self,
+                         batch: Iterable[Dict[str, Any]],
+                         reason: Optional[str] = None,
+                         created_by: Optional[str] = None) -> List[int]:
+        """
+        Record many stock movements in one transaction (e.g. a 200-line supplier invoice).
 
-            # Insert movement
+        Each line is a dict with the record_movement() keywords (product_id, qty or qty_milli,
+        reason, reference_id, related_doc, unit, cost_total, created_by). `reason` and
+        `created_by` passed here are used for lines that don't set their own.
+
+        Every line is validated before anything is written. If any line is invalid,
+        MovementBatchError lists the per-line errors and the batch is rolled back as a whole.
+        Otherwise returns the new stock (milli-units) after each line, in order (a product
+        that appears on several lines shows its running total). All arithmetic is on integer
+        milli-units, so running totals are exact.
+        """
+        lines = list(batch)
+        if not lines:
+            return []
+
+        with self.pool.transaction() as conn:
+            cur = conn.cursor()
+
+            # one round trip for every product on the batch
+            product_ids = sorted({ln.get("product_id") for ln in lines if isinstance(ln.get("product_id"), int)})
             cur.execute("""
-                INSERT INTO stock_movements (product_id, qty, reason, reference_id, related_doc, unit, cost_total, created_at, created_by)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                product_id,
-                float(qty),
-                reason,
-                reference_id,
-                related_doc,
-                action_unit,
-                cost_total_paisa,
-                now,
-                created_by
-            ))
-
-            # update product stock_qty
-            new_stock = current_stock + float(qty)
-            cur.execute("UPDATE products SET stock_qty = ?, updated_at = ? WHERE id = ?", (new_stock, now, product_id))
-
-            # insert audit log for stock change
-            details = f'stock movement for product id{product_id}: reason="{reason}", qty={qty}, new_stock={new_stock}'
-            cur.execute("INSERT INTO audit_logs (entity_type, action, details) VALUES (?, ?, ?)",
-                        ("product", "stock_movement", details))
-
-            self.conn.commit()
-            return new_stock
-        except Exception:
-            self.conn.rollback()
-            raise
-
-    # convenience: receive by number of packs (supply_pack_qty * num_packs)
+                SELECT id, unit, stock_milli FROM products
+                WHERE id IN (SELECT value FROM json_each(?))
+            """, (json.dumps(product_ids),))
+            product_units = {}
+            stock = {}
+            for pid, product_unit, current_stock in cur.fetchall():
+                product_units[pid] = product_unit
+                stock[pid] = int(current_stock or 0)
+
+            now = datetime.now().isoformat()
+            errors = []
+            results = []
+            movement_rows = []
+            for i, line in enumerate(lines):
+                product_id = line.get("product_id")
+                if product_id not in stock:
+                    errors.append((i, f"product id {product_id} not found"))
+                    continue
+                try:
+                    qty = line_milli(line)
+                except (TypeError, ValueError):
+                    errors.append((i, f"invalid qty {line.get('qty')!r}"))
+                    continue
+                line_reason = line.get("reason") or reason
+                if not line_reason:
+                    errors.append((i, "reason is required"))
+                    continue
+
+                cost_total_paisa = None
+                if line.get("cost_total") is not None:
+                    try:
+                        cost_total_paisa = int(line["cost_total"])
+                    except Exception:
+                        cost_total_paisa = None
+
+                unit = line.get("unit")
+                action_unit = unit if unit is not None else product_units[product_id]
+
+                new_stock = stock[product_id] + qty
+                stock[product_id] = new_stock
+                results.append(new_stock)
+
+                movement_rows.append((
+                    product_id,
+                    qty,
+                    line_reason,
+                    line.get("reference_id"),
+                    line.get("related_doc"),
+                    action_unit,
+                    cost_total_paisa,
+                    now,
+                    line.get("created_by") or created_by,
+                ))
+
+            if errors:
+                raise MovementBatchError(errors)
+            self.apply_movements(cur, movement_rows, stock, now)
+        return results
+
+    def apply_movements(self, cur, movement_rows: List[tuple], stock: Dict[int, int], now: str):
+        """
+        Write already-validated movements inside the caller's transaction: the
+        stock_movements rows (product_id, qty_milli, reason, reference_id, related_doc,
+        unit, cost_total, created_at, created_by) and `stock`, the new stock_milli of every
+        product they touch. Queues one audit event per movement and publishes the stock
+        change after commit. record_movements() and SaleService.checkout() (which validated
+        its lines already) end here.
+        """
+        # audit events carry the running stock after each movement; buffered, so they are
+        # one executemany right before COMMIT (pool.audit), with the movements
+        running = dict(stock)
+        for row in movement_rows:
+            running[row[0]] -= row[1]
+        for product_id, qty, reason, reference_id, *_ in movement_rows:
+            running[product_id] += qty
+            extra = {} if reference_id is None else {"reference_id": reference_id}
+            self.pool.audit.record("product", "stock_movement", product_id, reason=reason,
+                                   qty_milli=qty, new_stock_milli=running[product_id], **extra)
+
+        cur.executemany("""
+            INSERT INTO stock_movements (product_id, qty_milli, reason, reference_id, related_doc, unit, cost_total, created_at, created_by)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, movement_rows)
+
+        # one set-based UPDATE for all touched products, with the final running totals
+        cur.execute("""
+            UPDATE products
+            SET stock_milli = d.new_stock, updated_at = ?
+            FROM (SELECT json_extract(value, '$[0]') AS product_id,
+                         json_extract(value, '$[1]') AS new_stock
+                  FROM json_each(?)) AS d
+            WHERE products.id = d.product_id
+        """, (now, json.dumps(list(stock.items()))))
+
+        change = ProductChange(STOCK, set(stock), stock=dict(stock))
+        self.pool.after_commit(lambda: self.pool.events.publish(change))
+
+    # convenience: receive by number of packs (supply_pack_milli * num_packs)
+    @timed
     def receive_packs(self, product_id: int, num_packs: int, reason: str = "purchase_receipt",
-                      cost_total: Optional[float] = None, created_by: Optional[str] = None, reference_id: Optional[int] = None) -> float:
+                      cost_total: Optional[float] = None, created_by: Optional[str] = None, reference_id: Optional[int] = None) -> int:
         """
-        Add stock using the product.supply_pack_qty. E.g. sugar supply_pack_qty=50 (kg per bag);
-        receive_packs(product_id, 5) will add 5 * 50 = 250 (base unit) to stock.
+        Add stock using the product's supply pack size. E.g. sugar supply pack = 50 kg per bag
+        (supply_pack_milli 50000); receive_packs(product_id, 5) adds 5 * 50 = 250 kg, a
+        250000 milli-unit movement.
         cost_total (optional): total cost in rupees (or paisa int); it's stored on movement.cost_total column.
+        Returns the new stock in milli-units (format_qty() to show it).
         """
-        cur = self.conn.cursor()
-        cur.execute("SELECT supply_pack_qty FROM products WHERE id = ?", (product_id,))
-        row = cur.fetchone()
+        with self.pool.read() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT supply_pack_milli FROM products WHERE id = ?", (product_id,))
+            row = cur.fetchone()
         if row is None:
             raise ValueError("product not found")
-        pack_size = float(row[0] or 1.0)
-        added_qty = pack_size * int(num_packs)
-        print(f"productId: {id}, size: {pack_size}, Added: {added_qty}")
-        return self.record_movement(product_id=product_id, qty=added_qty, reason=reason,
+        pack_milli = int(row[0] or to_milli(1))
+        return self.record_movement(product_id=product_id, qty=None, qty_milli=pack_milli * int(num_packs), reason=reason,
                                     reference_id=reference_id, cost_total=cost_total, created_by=created_by)
 
     # convenience: consume stock for a sale (negative qty)
-    def consume_for_sale(self, product_id: int, qty: float, sale_id: Optional[int] = None, created_by: Optional[str] = None) -> float:
+    def consume_for_sale(self, product_id: int, qty, sale_id: Optional[int] = None, created_by: Optional[str] = None) -> int:
         """
         Record negative movement for sale and update product stock.
         qty should be in base unit (e.g., 0.5 for 500g if unit is kg).
+        Returns the new stock in milli-units (format_qty() to show it).
         """
-        return self.record_movement(product_id=product_id, qty=-abs(float(qty)), reason="sale",
+        return self.record_movement(product_id=product_id, qty=None, qty_milli=-abs(to_milli(qty)), reason="sale",
                                     reference_id=sale_id, created_by=created_by)
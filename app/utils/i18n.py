@@ -16,6 +16,71 @@ TRANSLATIONS = {
         "save_product": "Save",
         "add_product": "New Product",
         "stock_reorder": "Stock Reorder",
+        "stock_movement": "Stock In / Out",
+        "reports_title": "Sales & Profit",
+        "from_date": "From",
+        "to_date": "To",
+        "refresh": "Refresh",
+        "top_by_sales": "Top by sales",
+        "top_by_profit": "Top by profit",
+        "top_by_qty": "Top by quantity",
+        "product": "Product",
+        "quantity": "Quantity",
+        "sales": "Sales",
+        "profit": "Profit",
+        "sale_count": "Receipts",
+        "margin": "Margin",
+        "dashboard_title": "Today",
+        "today_revenue": "Today's sales",
+        "avg_basket": "Average basket",
+        "gross_margin": "Gross margin",
+        "low_stock": "Low stock items",
+        "export": "Export…",
+        "export_range": "Export dates",
+        "export_incremental": "Export new since last",
+        "export_full": "Export everything",
+        "export_done": "Exported rows",
+        "export_failed": "Export failed",
+        "reports_failed": "Reports could not be loaded",
+        "bulk_prices": "Bulk Price Change",
+        "all": "All",
+        "company": "Company",
+        "category": "Category",
+        "price_field": "Price",
+        "base_price": "Cost price",
+        "sell_price": "Sale price",
+        "both": "Both",
+        "percent": "Change %",
+        "amount_rs": "Change (Rs)",
+        "round_to": "Round to",
+        "rounding_nearest": "Nearest",
+        "rounding_up": "Up",
+        "rounding_down": "Down",
+        "new_price": "New sale price",
+        "preview": "Preview",
+        "apply": "Apply",
+        "cancel": "Cancel",
+        "rows_to_change": "Products to change",
+        "below_cost": "Below cost",
+        "diagnostics": "Diagnostics",
+        "reset": "Reset",
+        "profile_start": "Start profiling",
+        "profile_stop": "Stop profiling",
+        "profile_saved": "Profile saved",
+        "sql_timing_off": "SQL timing is off (start the app with MYSHOP_SQL_TIMING=1)",
+        "error": "Error",
+        "login_db_error": "The password could not be checked: the database is not available.",
+        "search_failed": "Product search failed",
+        "in_stock": "Stock",
+        "reorder_level": "Reorder level",
+        "sold_per_day": "Sold / day",
+        "days_left": "Days left",
+        "packs": "Packs",
+        "order_qty": "Order qty",
+        "receive_stock": "Receive stock",
+        "close": "Close",
+        "nothing_to_reorder": "No product is below its reorder level",
+        "reorder_failed": "Reorder suggestions could not be loaded",
     },
     "ur":{
         "app_title":"معین کریانہ اسٹور",
@@ -33,6 +98,71 @@ TRANSLATIONS = {
         "save_product": "محفوظ کریں",
         "add_product": "نیا پروڈکٹ",
         "stock_reorder": "اسٹاک ری آرڈر",
+        "stock_movement": "اسٹاک آمد / اخراج",
+        "reports_title": "فروخت اور منافع",
+        "from_date": "سے",
+        "to_date": "تک",
+        "refresh": "تازہ کریں",
+        "top_by_sales": "زیادہ فروخت",
+        "top_by_profit": "زیادہ منافع",
+        "top_by_qty": "زیادہ مقدار",
+        "product": "پروڈکٹ",
+        "quantity": "مقدار",
+        "sales": "فروخت",
+        "profit": "منافع",
+        "sale_count": "رسیدیں",
+        "margin": "مارجن",
+        "dashboard_title": "آج",
+        "today_revenue": "آج کی فروخت",
+        "avg_basket": "اوسط بل",
+        "gross_margin": "مجموعی منافع",
+        "low_stock": "کم اسٹاک اشیاء",
+        "export": "ایکسپورٹ…",
+        "export_range": "منتخب تاریخیں",
+        "export_incremental": "پچھلی ایکسپورٹ کے بعد",
+        "export_full": "سب کچھ",
+        "export_done": "ایکسپورٹ شدہ قطاریں",
+        "export_failed": "ایکسپورٹ ناکام",
+        "reports_failed": "رپورٹس لوڈ نہیں ہو سکیں",
+        "bulk_prices": "قیمتیں یکمشت تبدیل کریں",
+        "all": "سب",
+        "company": "کمپنی",
+        "category": "زمرہ",
+        "price_field": "قیمت",
+        "base_price": "قیمت خرید",
+        "sell_price": "قیمت فروخت",
+        "both": "دونوں",
+        "percent": "تبدیلی %",
+        "amount_rs": "تبدیلی (روپے)",
+        "round_to": "راؤنڈ کریں",
+        "rounding_nearest": "قریب ترین",
+        "rounding_up": "اوپر",
+        "rounding_down": "نیچے",
+        "new_price": "نئی قیمت فروخت",
+        "preview": "پیش نظارہ",
+        "apply": "لاگو کریں",
+        "cancel": "منسوخ",
+        "rows_to_change": "تبدیل ہونے والی اشیاء",
+        "below_cost": "لاگت سے کم",
+        "diagnostics": "تشخیص",
+        "reset": "صفر کریں",
+        "profile_start": "پروفائلنگ شروع کریں",
+        "profile_stop": "پروفائلنگ بند کریں",
+        "profile_saved": "پروفائل محفوظ ہو گئی",
+        "sql_timing_off": "SQL ٹائمنگ بند ہے (ایپ کو MYSHOP_SQL_TIMING=1 کے ساتھ چلائیں)",
+        "error": "خرابی",
+        "login_db_error": "پاس ورڈ چیک نہیں ہو سکا: ڈیٹا بیس دستیاب نہیں ہے۔",
+        "search_failed": "پروڈکٹ تلاش ناکام رہی",
+        "in_stock": "اسٹاک",
+        "reorder_level": "ری آرڈر حد",
+        "sold_per_day": "فروخت / دن",
+        "days_left": "باقی دن",
+        "packs": "پیک",
+        "order_qty": "آرڈر مقدار",
+        "receive_stock": "اسٹاک وصول کریں",
+        "close": "بند کریں",
+        "nothing_to_reorder": "کوئی پروڈکٹ ری آرڈر حد سے کم نہیں",
+        "reorder_failed": "ری آرڈر تجاویز لوڈ نہیں ہو سکیں",
     }
 }
 
@@ -0,0 +1,371 @@
+# app/utils/instrumentation.py
+"""
+In-process timings and counters: where the time of a service call, a statement or a
+UI action goes, on the shop PC itself.
+
+    @timed                                   # histogram "StockService.record_movement"
+    def record_movement(self, ...): ...
+
+    with timed("import.parse"):              # any block
+        ...
+
+    count("search_cache.hit")
+
+    except Exception as e:
+        error("product search", e)           # counter "errors: product search" + log
+
+Durations go into histograms (count, total, max and the last SAMPLES values, from
+which p50 / p95 / p99 are read); counters are plain ints. Both are kept in memory
+only, cost a microsecond or two per call, and are shown by the diagnostics panel
+(Ctrl+Shift+D in the main window) or printed by the CLI below.
+
+SQL statements are timed too when the connections are traced (MYSHOP_SQL_TIMING=1,
+see app.services.query_trace): one "sql ..." histogram per statement text with its
+literals folded to ?, which also adds up the rows each statement returned or changed.
+
+cProfile is opt-in per capture: start_profile() ... stop_profile() profiles the GUI
+thread plus every executor job that runs in between, i.e. any UI action with the
+background work it starts; the stats are written to a .prof file for snakeviz /
+pstats and the slowest functions are returned as text.
+
+The CLI runs the read hot paths (and, with --writes, record_movement inside a rolled
+back transaction, so without the commit) against a database and prints the table:
+
+    python -m app.utils.instrumentation [--rounds 50] [--sql] [--strict] [--writes] [--db path/to/shop.db]
+
+--strict runs them with the query plan checks of app.services.query_trace and fails
+on the first hot-path statement that scans a large table.
+"""
+import functools, logging, math, re, threading, time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+SAMPLES = 2048        # recent durations kept per histogram for the percentiles
+MAX_SQL_SERIES = 500  # distinct statements timed; later ones are lumped together
+PROFILE_TOP = 30      # functions listed by stop_profile()
+NAME_WIDTH = 64       # name column of format_report()
+
+_perf = time.perf_counter
+
+
+class Histogram:
+    """
+    Durations in seconds: exact count / total / max, percentiles over the last SAMPLES.
+    `rows` adds up the rows of SQL statements (0 for everything else).
+    """
+    __slots__ = ("count", "rows", "total", "max", "_samples", "_next")
+
+    def __init__(self):
+        self.count = 0
+        self.rows = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._samples: List[float] = []
+        self._next = 0
+
+    def add(self, seconds: float, rows: int = 0):
+        self.count += 1
+        self.rows += rows
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        if len(self._samples) < SAMPLES:
+            self._samples.append(seconds)
+        else:
+            self._samples[self._next] = seconds
+            self._next = (self._next + 1) % SAMPLES
+
+    def percentiles(self, *ps: float) -> List[float]:
+        """Nearest-rank percentiles (0-100) of the kept samples."""
+        ordered = sorted(self._samples)
+        if not ordered:
+            return [0.0 for _ in ps]
+        return [ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)] for p in ps]
+
+
+_lock = threading.Lock()
+_histograms: Dict[str, Histogram] = {}
+_counters: Dict[str, int] = {}
+
+
+def observe(name: str, seconds: float):
+    """Add one duration to histogram `name`."""
+    with _lock:
+        hist = _histograms.get(name)
+        if hist is None:
+            hist = _histograms[name] = Histogram()
+        hist.add(seconds)
+
+
+def count(name: str, n: int = 1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+log = logging.getLogger("myshop")
+
+
+def error(where: str, exc: BaseException):
+    """
+    An exception that is handled rather than raised (a failed background job, a
+    subscriber, a UI callback): counted as "errors: <where>", so it shows in the
+    diagnostics panel, and logged with its traceback.
+    """
+    count(f"errors: {where}")
+    log.error("%s failed: %s", where, exc, exc_info=exc)
+
+
+class _Timer:
+    __slots__ = ("name", "_start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self._start = _perf()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.name, _perf() - self._start)
+        if exc_type is not None:
+            count(f"{self.name} errors")
+
+    def __call__(self, fn):
+        name = self.name
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = _perf()
+            try:
+                return fn(*args, **kwargs)
+            except BaseException:
+                count(f"{name} errors")
+                raise
+            finally:
+                observe(name, _perf() - start)
+        return wrapper
+
+
+def timed(name_or_fn):
+    """
+    Time a function (bare decorator: named after its qualified name, e.g.
+    "ProductService.search") or a block (context manager / decorator given a name).
+    Failures are timed too and also counted as "<name> errors".
+    """
+    if callable(name_or_fn):
+        return _Timer(name_or_fn.__qualname__)(name_or_fn)
+    return _Timer(name_or_fn)
+
+
+# -----------------------
+# Reading / resetting
+# -----------------------
+def snapshot() -> Tuple[List[tuple], Dict[str, int]]:
+    """
+    ([(name, count, rows, total_ms, mean_ms, p50_ms, p95_ms, p99_ms, max_ms), ...] by
+    total time, {counter: value}).
+    """
+    with _lock:
+        hists = [(name, h.count, h.rows, h.total, h.max, h.percentiles(50, 95, 99))
+                 for name, h in _histograms.items()]
+        counters = dict(_counters)
+    rows = [(name, n, n_rows, total * 1000, total / n * 1000, p50 * 1000, p95 * 1000, p99 * 1000, peak * 1000)
+            for name, n, n_rows, total, peak, (p50, p95, p99) in hists]
+    rows.sort(key=lambda row: row[3], reverse=True)
+    return rows, counters
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+def format_report(limit: Optional[int] = None) -> str:
+    rows, counters = snapshot()
+    width = min(NAME_WIDTH, max([len(row[0]) for row in rows[:limit]] + [10]))
+    lines = [f"{'':<{width}} {'count':>7} {'rows':>8} {'total ms':>10} {'mean':>8} {'p50':>8} {'p95':>8} "
+             f"{'p99':>8} {'max':>8}"]
+    for name, n, n_rows, total, mean, p50, p95, p99, peak in rows[:limit]:
+        if len(name) > width:
+            name = name[:width - 1] + "…"
+        lines.append(f"{name:<{width}} {n:>7} {n_rows or '':>8} {total:>10.1f} {mean:>8.2f} {p50:>8.2f} "
+                     f"{p95:>8.2f} {p99:>8.2f} {peak:>8.2f}")
+    for name in sorted(counters):
+        lines.append(f"{name}: {counters[name]}")
+    return "\n".join(lines)
+
+
+# -----------------------
+# SQL statements (fed by app.services.query_trace)
+# -----------------------
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACES = re.compile(r"\s+")
+_sql_names: Dict[str, str] = {}
+
+
+def sql_name(statement: str) -> str:
+    """Histogram name of a statement: "sql " + the text with literals folded to ?."""
+    name = _sql_names.get(statement)
+    if name is None:
+        name = "sql " + _SPACES.sub(" ", _LITERALS.sub("?", statement)).strip()
+        if len(_sql_names) < MAX_SQL_SERIES * 4:  # texts with inlined values differ per call
+            _sql_names[statement] = name
+    return name
+
+
+def observe_sql(statement: str, seconds: float, rows: int):
+    name = sql_name(statement)
+    with _lock:
+        hist = _histograms.get(name)
+        if hist is None:
+            if sum(1 for key in _histograms if key.startswith("sql ")) >= MAX_SQL_SERIES:
+                name = "sql (other statements)"
+                hist = _histograms.get(name)
+            if hist is None:
+                hist = _histograms[name] = Histogram()
+        hist.add(seconds, rows)
+
+
+# -----------------------
+# cProfile capture
+# -----------------------
+class _Capture:
+    def __init__(self, name: str):
+        import cProfile
+        self.name = name
+        self.started = datetime.now()
+        self.gui = cProfile.Profile()
+        self.jobs = []
+        self.lock = threading.Lock()
+
+    def run(self, fn, *args, **kwargs):
+        import cProfile
+        profile = cProfile.Profile()
+        try:
+            return profile.runcall(fn, *args, **kwargs)
+        finally:
+            with self.lock:
+                self.jobs.append(profile)
+
+
+_capture: Optional[_Capture] = None
+
+
+def start_profile(name: str = "ui"):
+    """Start profiling the calling (GUI) thread and every executor job until stop_profile()."""
+    global _capture
+    if _capture is not None:
+        raise ValueError("a profile capture is already running")
+    capture = _Capture(name)
+    capture.gui.enable()
+    _capture = capture
+
+
+def profiling() -> bool:
+    return _capture is not None
+
+
+def profiled_call(fn, *args, **kwargs):
+    """fn(*args, **kwargs), under the running capture if there is one (executor jobs)."""
+    capture = _capture
+    if capture is None:
+        return fn(*args, **kwargs)
+    return capture.run(fn, *args, **kwargs)
+
+
+def stop_profile(folder) -> Tuple[Path, str]:
+    """
+    Stop the capture started on this thread, write <folder>/<name>-<time>.prof and
+    return (path, the PROFILE_TOP functions by cumulative time as text).
+    """
+    global _capture
+    import io, pstats
+    capture = _capture
+    if capture is None:
+        raise ValueError("no profile capture is running")
+    capture.gui.disable()
+    _capture = None
+    with capture.lock:
+        jobs = list(capture.jobs)
+    stats = pstats.Stats(capture.gui)
+    for profile in jobs:
+        stats.add(profile)
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    path = folder / f"{capture.name}-{capture.started:%Y%m%d-%H%M%S}.prof"
+    stats.dump_stats(str(path))
+    out = io.StringIO()
+    stats.stream = out
+    stats.sort_stats("cumulative").print_stats(PROFILE_TOP)
+    return path, out.getvalue()
+
+
+# -----------------------
+# CLI: time the hot paths against a database
+# -----------------------
+class _Rollback(Exception):
+    pass
+
+
+def main(argv=None):
+    import argparse
+    from datetime import date, timedelta
+    parser = argparse.ArgumentParser(description="Time the hot service calls and print p50/p95/p99.")
+    parser.add_argument("--rounds", type=int, default=50, help="calls per measured operation")
+    parser.add_argument("--sql", action="store_true", help="also time every SQL statement")
+    parser.add_argument("--strict", action="store_true",
+                        help="fail on a hot-path statement that scans a large table")
+    parser.add_argument("--writes", action="store_true",
+                        help="also time record_movement (in a transaction that is rolled back)")
+    parser.add_argument("--db", help="database path (default: the app's shop.db)")
+    args = parser.parse_args(argv)
+
+    # under `python -m` this file is __main__: the services record into the imported module
+    from app.utils import instrumentation
+    from app.services import query_trace
+    # before the services are imported (@hot_path) and the pool connects
+    query_trace.STRICT_PLANS = query_trace.STRICT_PLANS or args.strict
+    query_trace.TRACING = query_trace.TRACING or args.sql or args.strict
+    from app.services.db_sqlite3 import get_pool
+    from app.services.product_index import ProductIndex
+    from app.services.product_service import ProductService
+    from app.services.reorder_service import ReorderService
+    from app.services.report_service import ReportService
+    from app.services.stock_service import StockService
+
+    pool = get_pool(args.db)
+    products = ProductService(pool)
+    with pool.read() as conn:
+        sample = conn.execute("SELECT id, ur_name, en_name, barcode FROM products ORDER BY random() LIMIT ?",
+                              (args.rounds,)).fetchall()
+    if not sample:
+        raise ValueError("the database has no products to time")
+    # what a cashier types: the first letters of names, and barcode prefixes
+    terms = [(name or "")[:n] for _, ur, en, _ in sample for name, n in ((ur, 2), (en, 3)) if name]
+    terms += [barcode[:4] for *_, barcode in sample if barcode]
+
+    today = date.today()
+    for i in range(args.rounds):
+        products.all_products()
+        products.fetch_page()
+        products.get(sample[i % len(sample)][0])
+        products.search(terms[i % len(terms)] if terms else "a")
+        ReportService(pool).summary((today - timedelta(days=30)).isoformat(), today.isoformat())
+        ReorderService(pool).low_stock()
+    ProductIndex(pool).load()
+    if args.writes:
+        stock = StockService(pool)
+        try:
+            with pool.transaction():
+                for i in range(args.rounds):
+                    stock.record_movement(sample[i % len(sample)][0], 1, "diagnostics")
+                raise _Rollback
+        except _Rollback:
+            pass
+    print(instrumentation.format_report())
+
+
+if __name__ == "__main__":
+    main()
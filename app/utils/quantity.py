@@ -0,0 +1,107 @@
+# app/utils/quantity.py
+"""
+Fixed-point quantities.
+
+Stock and sold quantities are stored as integer milli-units of the product's base
+unit (1 kg = 1000, 0.25 kg = 250, 3 pcs = 3000), the same way money is stored in
+paisa. Sums and comparisons are then exact integer arithmetic: a thousand 0.25 kg
+sales add up to exactly 250 kg, which float qty did not.
+
+Everything crossing the service boundary goes through here: to_milli() for user /
+caller input (float, str, int, Decimal in base units), format_qty() / from_milli() for
+display, amount() for qty * per-unit price.
+"""
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from typing import Optional
+
+MILLI = 1000
+
+
+def scaled_int(text: str, places: int) -> Optional[int]:
+    """
+    Exact int(text * 10**places) for plain "123" / "123.45" strings with at most
+    `places` decimals, without going through Decimal; None for anything else
+    (signs, exponents, more decimals), which callers hand to Decimal.
+    """
+    whole, dot, frac = text.partition(".")
+    if not whole.isdigit() or (dot and not frac.isdigit()) or len(frac) > places:
+        return None
+    return int(whole) * 10 ** places + (int(frac) * 10 ** (places - len(frac)) if frac else 0)
+
+
+def to_milli(value, default: Optional[int] = 0) -> Optional[int]:
+    """
+    Quantity in base units -> integer milli-units, rounded half-up to the nearest
+    milli. None / "" give `default`; anything else unparsable raises ValueError.
+    Floats go through their shortest repr, so 0.1 becomes exactly 100.
+    """
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        raise ValueError(f"invalid quantity {value!r}")
+    if isinstance(value, int):
+        return value * MILLI
+    text = str(value).strip().replace(",", "")
+    if text == "":
+        return default
+    milli = scaled_int(text, 3)
+    if milli is not None:
+        return milli
+    try:
+        number = Decimal(text)
+    except InvalidOperation:
+        raise ValueError(f"invalid quantity {value!r}") from None
+    if not number.is_finite():
+        raise ValueError(f"invalid quantity {value!r}")
+    return int((number * MILLI).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def line_milli(line: dict, key: str = "qty") -> int:
+    """
+    Quantity of a cart / movement line: line["<key>_milli"] (exact) if set, else
+    line[key] in base units. ValueError when missing or invalid.
+    """
+    milli = line.get(f"{key}_milli")
+    if milli is not None:
+        return int(milli)
+    milli = to_milli(line.get(key), default=None)
+    if milli is None:
+        raise ValueError(f"{key} is required")
+    return milli
+
+
+def from_milli(milli: Optional[int]) -> float:
+    """Milli-units -> float base units, for display math and charts only."""
+    return (milli or 0) / MILLI
+
+
+def to_decimal(milli: Optional[int]) -> Decimal:
+    """Milli-units -> exact Decimal base units."""
+    return Decimal(milli or 0) / MILLI
+
+
+def format_qty(milli: Optional[int], unit: Optional[str] = None) -> str:
+    """2500 -> "2.5", 3000 -> "3", -250 -> "-0.25"; with unit: "2.5 kg"."""
+    if milli is None:
+        return "—"
+    sign = "-" if milli < 0 else ""
+    whole, frac = divmod(abs(int(milli)), MILLI)
+    text = f"{sign}{whole}" + (f".{frac:03d}".rstrip("0") if frac else "")
+    return f"{text} {unit}" if unit else text
+
+
+def amount(milli: int, per_unit: int) -> int:
+    """
+    qty (milli-units) * price per base unit (paisa) -> paisa, rounded half-up,
+    in integer arithmetic.
+    """
+    product = milli * per_unit
+    whole, rest = divmod(abs(product), MILLI)
+    if rest * 2 >= MILLI:
+        whole += 1
+    return whole if product >= 0 else -whole
+
+
+def sql_to_milli(expr: str) -> str:
+    """SQL expression converting a REAL base-unit column to milli-units (migration, legacy archives)."""
+    return f"CAST(ROUND(({expr}) * {MILLI}) AS INTEGER)"
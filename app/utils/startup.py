@@ -0,0 +1,56 @@
+# app/utils/startup.py
+"""
+Cold-start timing.
+
+main.py imports this module first, so the clock starts before PyQt and the services are
+imported, then marks each phase (imports, database, first window shown, ...). report()
+prints the phases marked since the previous report and warns when they add up to more
+than the budget, so a slower start shows up on the shop PC itself:
+
+    startup: imports 412 ms, database 35 ms, login window shown 120 ms = 567 ms (budget 2000 ms)
+
+For a per-module breakdown of the imports: python -X importtime main.py
+"""
+import time
+from typing import List, Optional, Tuple
+from app.utils import instrumentation
+
+# cold start up to the login window, and login -> main window, on a low-end shop PC
+STARTUP_BUDGET_S = 2.0
+MAIN_WINDOW_BUDGET_S = 0.5
+
+_last = time.perf_counter()
+_marks: List[Tuple[str, float]] = []
+
+
+def mark(phase: str):
+    """End of `phase`: the time since the previous mark (or report) is its duration."""
+    global _last
+    now = time.perf_counter()
+    _marks.append((phase, now - _last))
+    _last = now
+
+
+def report(title: str = "startup", budget: Optional[float] = None) -> float:
+    """Print the phases marked since the last report. Returns their total in seconds."""
+    global _last
+    total = sum(seconds for _, seconds in _marks)
+    phases = ", ".join(f"{phase} {seconds * 1000:.0f} ms" for phase, seconds in _marks)
+    line = f"{title}: {phases} = {total * 1000:.0f} ms"
+    if budget is not None:
+        line += f" (budget {budget * 1000:.0f} ms)"
+    print(line)
+    instrumentation.observe(title, total)  # diagnostics panel
+    if budget is not None and total > budget:
+        slowest = max(_marks, key=lambda m: m[1])[0] if _marks else "?"
+        print(f"{title} over budget by {(total - budget) * 1000:.0f} ms, slowest phase: {slowest}")
+    _marks.clear()
+    _last = time.perf_counter()
+    return total
+
+
+def reset():
+    """Start timing a new sequence from now (e.g. at login) without reporting."""
+    global _last
+    _marks.clear()
+    _last = time.perf_counter()
@@ -0,0 +1,50 @@
+# app/utils/urdu.py
+"""
+Urdu text folding for search.
+
+Product names typed on different keyboards mix Arabic and Urdu code points for the
+same letter (ي/ی, ك/ک, ه/ہ) and sometimes carry harakat (zer, zabar, ...). FTS5's
+unicode61 tokenizer treats harakat as separators, so "چِینی" would index as "چ" + "ینی".
+Both the indexed text (in SQL triggers) and the query (in Python) are folded the same way.
+"""
+
+# letter variants -> Urdu form
+LETTER_MAP = {
+    "ي": "ی",  # Arabic yeh -> Farsi/Urdu yeh
+    "ى": "ی",  # alef maksura -> Urdu yeh
+    "ك": "ک",  # Arabic kaf -> keheh
+    "ه": "ہ",  # Arabic heh -> heh goal
+}
+
+# harakat / marks that are dropped
+DROP_CHARS = (
+    "\u064b\u064c\u064d"  # tanween
+    "\u064e\u064f\u0650"  # zabar, pesh, zer
+    "\u0651\u0652"        # tashdid, sukun
+    "\u0670"              # khari zabar
+    "\u0640"              # tatweel
+)
+
+# Arabic-Indic and Urdu digits -> ASCII (barcodes typed with an Urdu keyboard layout)
+DIGIT_MAP = {chr(0x0660 + i): str(i) for i in range(10)}
+DIGIT_MAP.update({chr(0x06F0 + i): str(i) for i in range(10)})
+
+_TABLE = str.maketrans({**LETTER_MAP, **DIGIT_MAP, **{c: None for c in DROP_CHARS}})
+
+
+def normalize(text: str) -> str:
+    """Fold a search string (used on the query side)."""
+    return (text or "").translate(_TABLE)
+
+
+def sql_normalize(expr: str) -> str:
+    """
+    SQL expression that folds `expr` the same way normalize() does for letters and
+    harakat (used on the index side, inside triggers). Digits are only folded in
+    queries; stored barcodes are ASCII already.
+    """
+    for src, dst in LETTER_MAP.items():
+        expr = f"replace({expr}, char({ord(src)}), char({ord(dst)}))"
+    for ch in DROP_CHARS:
+        expr = f"replace({expr}, char({ord(ch)}), '')"
+    return expr
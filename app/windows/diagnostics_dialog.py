@@ -0,0 +1,135 @@
+# app/windows/diagnostics_dialog.py
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableWidget, QTableWidgetItem,
+    QHeaderView, QAbstractItemView, QPlainTextEdit
+)
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QFontDatabase
+from pathlib import Path
+from app.services import query_trace
+from app.services.catalog_cache import loaded_catalog_cache
+from app.services.db_sqlite3 import get_pool
+from app.utils import instrumentation
+from app.utils.i18n import t
+
+
+class DiagnosticsDialog(QDialog):
+    """
+    Hidden panel (Ctrl+Shift+D): the in-memory timings and counters of this session,
+    the connection pool's wait counters, and a cProfile capture around any UI action.
+    """
+
+    REFRESH_MS = 2000
+    COLUMNS = ("", "count", "rows", "total ms", "mean", "p50", "p95", "p99", "max")
+
+    def __init__(self, get_lang=lambda: "ur", parent=None):
+        super().__init__(parent)
+        self.get_lang = get_lang
+        self.pool = get_pool()
+        self.profile_folder = Path(self.pool.db_path).resolve().parent / "profiles"
+        self._build_ui()
+        self.update_texts()
+        self.timer = QTimer(self)  # runs while the panel is shown
+        self.timer.timeout.connect(self.refresh)
+
+    def _build_ui(self):
+        self.resize(900, 600)
+        layout = QVBoxLayout(self)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        layout.addWidget(self.table, 3)
+
+        self.lbl_pool = QLabel()
+        layout.addWidget(self.lbl_pool)
+
+        self.profile_text = QPlainTextEdit()
+        self.profile_text.setReadOnly(True)
+        self.profile_text.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+        self.profile_text.setLayoutDirection(Qt.LayoutDirection.LeftToRight)
+        layout.addWidget(self.profile_text, 2)
+
+        row = QHBoxLayout()
+        self.btn_refresh = QPushButton()
+        self.btn_reset = QPushButton()
+        self.btn_profile = QPushButton()
+        row.addWidget(self.btn_refresh)
+        row.addWidget(self.btn_reset)
+        row.addStretch()
+        row.addWidget(self.btn_profile)
+        layout.addLayout(row)
+
+        self.btn_refresh.clicked.connect(self.refresh)
+        self.btn_reset.clicked.connect(self.reset)
+        self.btn_profile.clicked.connect(self.toggle_profile)
+
+    def update_texts(self):
+        lang = self.get_lang() or "ur"
+        self.setWindowTitle(t(lang, "diagnostics"))
+        self.btn_refresh.setText(t(lang, "refresh"))
+        self.btn_reset.setText(t(lang, "reset"))
+        self.btn_profile.setText(t(lang, "profile_stop" if instrumentation.profiling() else "profile_start"))
+
+    # -----------------------
+    # Timings
+    # -----------------------
+    def refresh(self):
+        rows, counters = instrumentation.snapshot()
+        self.table.setRowCount(len(rows) + len(counters))
+        for r, row in enumerate(rows):
+            self._set_row(r, [row[0], str(row[1]), str(row[2] or "")] + [f"{ms:.2f}" for ms in row[3:]])
+        for r, name in enumerate(sorted(counters), start=len(rows)):
+            self._set_row(r, [name, str(counters[name])] + [""] * (len(self.COLUMNS) - 2))
+
+        stats = self.pool.stats()
+        text = (f"pool: {stats['checkouts']} checkouts, {stats['waits']} waited "
+                f"(avg {stats['avg_wait_ms']:.1f} ms, max {stats['max_wait_ms']:.1f} ms), "
+                f"readers {stats['readers_open']} open / {stats['readers_idle']} idle")
+        catalog = loaded_catalog_cache()
+        if catalog is not None:
+            text += "\n" + catalog.format_memory()
+        if not query_trace.TRACING:
+            text += "\n" + t(self.get_lang() or "ur", "sql_timing_off")
+        self.lbl_pool.setText(text)
+
+    def _set_row(self, r, cells):
+        for c, text in enumerate(cells):
+            item = QTableWidgetItem(text)
+            if c:
+                item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            else:
+                item.setToolTip(text)
+            self.table.setItem(r, c, item)
+
+    def reset(self):
+        instrumentation.reset()
+        self.refresh()
+
+    # -----------------------
+    # Profiling
+    # -----------------------
+    def toggle_profile(self):
+        lang = self.get_lang() or "ur"
+        if not instrumentation.profiling():
+            instrumentation.start_profile()
+            self.profile_text.setPlainText("…")
+        else:
+            path, text = instrumentation.stop_profile(self.profile_folder)
+            self.profile_text.setPlainText(f"{t(lang, 'profile_saved')}: {path}\n{text}")
+        self.update_texts()
+
+    def showEvent(self, event):
+        self.timer.start(self.REFRESH_MS)
+        self.refresh()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        # closed (not minimized with the main window): a capture left running would slow
+        # every later action down
+        if not event.spontaneous() and instrumentation.profiling():
+            self.toggle_profile()
+        self.timer.stop()
+        super().hideEvent(event)
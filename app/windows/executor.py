@@ -0,0 +1,162 @@
+# app/windows/executor.py
+"""
+Runs service calls (DB, password hashing, ...) off the GUI thread.
+
+    executor = get_executor()
+    executor.submit(service.search, term, on_done=self.show_results, key="product_search")
+
+fn runs on a QThreadPool worker; on_done(result) / on_error(exception) are delivered
+back on the GUI thread through a queued signal, so they may touch widgets. A job that
+fails without an on_error, and a callback that raises, are reported through
+instrumentation.error() (counted in the diagnostics panel and logged with the
+traceback) instead of being lost.
+
+Requests sharing a `key` supersede each other: submitting a new one cancels the
+previous one (dropped from the queue if it has not started, its result ignored if it
+has), so only the latest search / page load reaches the screen.
+"""
+import threading, time
+from typing import Any, Callable, Dict, Optional
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from app.utils import instrumentation
+
+
+class _Signals(QObject):
+    finished = pyqtSignal(int, object)  # token, result
+    failed = pyqtSignal(int, object)    # token, exception
+
+
+class _Task(QRunnable):
+    def __init__(self, token: int, fn: Callable, args, kwargs, signals: _Signals):
+        super().__init__()
+        self.token = token
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = signals
+        self.cancelled = threading.Event()
+        self.queued = time.perf_counter()
+
+    def run(self):
+        if self.cancelled.is_set():
+            return
+        instrumentation.observe("executor queue wait", time.perf_counter() - self.queued)
+        try:
+            # under a running profile capture (diagnostics panel) the job is profiled too
+            result = instrumentation.profiled_call(self.fn, *self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.failed.emit(self.token, e)
+            return
+        self.signals.finished.emit(self.token, result)
+
+
+class _Pending:
+    __slots__ = ("task", "key", "on_done", "on_error")
+
+    def __init__(self, task, key, on_done, on_error):
+        self.task = task
+        self.key = key
+        self.on_done = on_done
+        self.on_error = on_error
+
+
+class ServiceExecutor(QObject):
+    """
+    QThreadPool wrapper with GUI-thread callbacks and keyed cancellation.
+    Create and use it from the GUI thread only.
+    """
+
+    def __init__(self, max_threads: int = 4, parent=None):
+        super().__init__(parent)
+        self._threads = QThreadPool(self)
+        # match ConnectionPool's reader count; one of them may hold the writer
+        self._threads.setMaxThreadCount(max_threads)
+        self._signals = _Signals(self)
+        self._signals.finished.connect(self._on_finished)
+        self._signals.failed.connect(self._on_failed)
+        self._pending: Dict[int, _Pending] = {}
+        self._latest: Dict[Any, int] = {}  # key -> token of the newest request
+        self._next_token = 0
+
+    # -----------------------
+    # Submitting / cancelling
+    # -----------------------
+    def submit(self, fn: Callable, *args, on_done: Optional[Callable] = None,
+               on_error: Optional[Callable] = None, key: Any = None, **kwargs) -> int:
+        """Queue fn(*args, **kwargs). Returns a token usable with cancel()."""
+        if key is not None and key in self._latest:
+            self.cancel(self._latest[key])
+        self._next_token += 1
+        token = self._next_token
+        task = _Task(token, fn, args, kwargs, self._signals)
+        self._pending[token] = _Pending(task, key, on_done, on_error)
+        if key is not None:
+            self._latest[key] = token
+        self._threads.start(task)
+        return token
+
+    def cancel(self, token: int):
+        """Drop a request; its callbacks will not be called."""
+        pending = self._pending.pop(token, None)
+        if pending is None:
+            return
+        if pending.key is not None and self._latest.get(pending.key) == token:
+            del self._latest[pending.key]
+        pending.task.cancelled.set()
+        try:
+            self._threads.tryTake(pending.task)  # still queued: never runs
+        except RuntimeError:
+            pass  # already finished and deleted by the pool
+
+    def cancel_key(self, key: Any):
+        token = self._latest.get(key)
+        if token is not None:
+            self.cancel(token)
+
+    def is_pending(self, key: Any) -> bool:
+        return key in self._latest
+
+    def wait(self, msecs: int = -1) -> bool:
+        """Block until queued work is done (shutdown, scripts)."""
+        return self._threads.waitForDone(msecs)
+
+    # -----------------------
+    # Results (GUI thread)
+    # -----------------------
+    def _take(self, token: int) -> Optional[_Pending]:
+        pending = self._pending.pop(token, None)
+        if pending is not None and pending.key is not None and self._latest.get(pending.key) == token:
+            del self._latest[pending.key]
+        return pending
+
+    def _on_finished(self, token: int, result):
+        pending = self._take(token)
+        if pending is None or pending.on_done is None:
+            return
+        try:
+            pending.on_done(result)
+        except Exception as e:
+            instrumentation.error("executor on_done", e)
+
+    def _on_failed(self, token: int, error):
+        pending = self._take(token)
+        if pending is None:
+            return
+        if pending.on_error is None:
+            instrumentation.error("background task", error)
+            return
+        try:
+            pending.on_error(error)
+        except Exception as e:
+            instrumentation.error("executor on_error", e)
+
+
+_executor = None
+
+
+def get_executor() -> ServiceExecutor:
+    """Process-wide executor (needs a QApplication)."""
+    global _executor
+    if _executor is None:
+        _executor = ServiceExecutor()
+    return _executor
@@ -1,9 +1,14 @@
 # app/windows/login_screen.py
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton
-from PyQt6.QtCore import Qt
+import importlib
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton, QMessageBox
+from PyQt6.QtCore import Qt, QTimer
 from app.services.auth_service_sqlite3 import AuthServiceSQLite3
+from app.utils import instrumentation, startup
 from app.utils.i18n import t
-from app.windows.main_window import MainWindow
+from app.windows.executor import get_executor
+
+# imported on first login, not at startup: the login window only needs Qt and auth
+MAIN_WINDOW_MODULE = "app.windows.main_window"
 
 class LoginScreen(QWidget):
     def __init__(self, urdu_font_family=None):
@@ -47,10 +52,36 @@ class LoginScreen(QWidget):
 
     def attempt_login(self):
         pw = self.password.text() or ""
-        if self.auth.verify_password("Admin", pw):
+        # PBKDF2 takes ~100ms+; hash on a worker so the window keeps painting
+        self.btn.setEnabled(False)
+        self.password.setEnabled(False)
+        executor = get_executor()
+        executor.submit(self.auth.verify_password, "Admin", pw,
+                        on_done=self._on_login_checked, on_error=self._on_login_error,
+                        key="login")
+        # import the main window modules meanwhile (the hash releases the GIL)
+        executor.submit(importlib.import_module, MAIN_WINDOW_MODULE, key="login_import")
+
+    def _on_login_error(self, error):
+        # the password could not be checked at all (database locked / missing / corrupt):
+        # not a wrong password, so say so instead of asking to type it again
+        instrumentation.error("login check", error)
+        self.btn.setEnabled(True)
+        self.password.setEnabled(True)
+        QMessageBox.critical(self, t(self.lang, "error"), f"{t(self.lang, 'login_db_error')}\n\n{error}")
+
+    def _on_login_checked(self, ok):
+        self.btn.setEnabled(True)
+        self.password.setEnabled(True)
+        if ok:
+            startup.reset()
+            MainWindow = importlib.import_module(MAIN_WINDOW_MODULE).MainWindow
+            startup.mark("imports")
             self.mainwin = MainWindow(urdu_font_family=self.urdu_font_family)
             self.mainwin.show()
             self.close()
+            QTimer.singleShot(0, lambda: (startup.mark("main window shown"),
+                                          startup.report("login -> main window", startup.MAIN_WINDOW_BUDGET_S)))
         else:
             self.msg.setText(t(self.lang, "login_failed"))
             self.password.clear()
@@ -3,14 +3,12 @@ from PyQt6.QtWidgets import (
     QPushButton, QComboBox, QStackedLayout
 )
 from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QIcon
+from PyQt6.QtGui import QIcon, QKeySequence, QShortcut
 from pathlib import Path
 
 from app.utils.i18n import t
-from app.windows.change_password_dialog import ChangePasswordDialog
-from app.windows.products_list_screen import ProductsListScreen
-from app.windows.product_form_screen import ProductFormScreen
-from app.windows.stock_movement_form import StockMovementForm
+# screens and dialogs are imported by their factories / open_* below, on first use:
+# a screen's module and services cost nothing until switch() first shows it
 
 
 class MainWindow(QMainWindow):
@@ -81,42 +79,82 @@ class MainWindow(QMainWindow):
         container.setLayout(self.stack)
         self.main_layout.addWidget(container)
 
-        # Screens
-        self.dashboard_screen = QWidget()
-        self.pos_screen = QWidget()
-        self.reports_screen = QWidget()
+        # Screens: key -> factory; built (and added to the stack) by screen(key)
+        self.screen_factories = {
+            "dashboard": self._build_dashboard,
+            "pos": QWidget,
+            "products_list": self._build_products_list,
+            "product_form": self._build_product_form,
+            "reports": self._build_reports,
+            "stock_movement_form": self._build_stock_movement_form,
+        }
+        self.screens = {}
+        self.diagnostics = None  # hidden panel, Ctrl+Shift+D
+
+        self.switch("dashboard")
+        self.apply_language()
+        self.apply_styles()
 
-        self.products_list_screen = ProductsListScreen(
+    # -----------------------
+    # Screens (lazy)
+    # -----------------------
+    def screen(self, key):
+        """The screen for `key`, built on first use; None for an unknown key."""
+        widget = self.screens.get(key)
+        if widget is None:
+            factory = self.screen_factories.get(key)
+            if factory is None:
+                return None
+            widget = self.screens[key] = factory()
+            self.stack.addWidget(widget)
+        return widget
+
+    def _build_dashboard(self):
+        from app.windows.screens.dashboard_screen import DashboardScreen
+        screen = DashboardScreen(get_lang=lambda: self.current_lang)
+        self.language_changed.connect(screen.update_texts)
+        return screen
+
+    def _build_reports(self):
+        from app.windows.screens.reports_screen import ReportsScreen
+        screen = ReportsScreen(get_lang=lambda: self.current_lang)
+        self.language_changed.connect(screen.update_texts)
+        return screen
+
+    def _build_products_list(self):
+        from app.windows.products_list_screen import ProductsListScreen
+        screen = ProductsListScreen(
             on_add=self.open_add_product,
             on_edit=self.open_edit_product,
-            on_stock_reorder=self.open_stock_movement,
+            on_stock_movement=self.open_stock_movement,
+            on_stock_reorder=self.open_reorder,
+            on_price_update=self.open_price_update,
             get_lang=lambda: self.current_lang,
         )
+        # the list follows product/stock changes itself (ProductsListScreen.products_changed)
+        self.language_changed.connect(screen.refresh_products)
+        return screen
 
-        self.product_form_screen = ProductFormScreen(
+    def _build_product_form(self):
+        from app.windows.product_form_screen import ProductFormScreen
+        screen = ProductFormScreen(
             on_back=lambda: self.switch("products_list"),
             on_saved=self.on_product_saved,
             get_lang=lambda: self.current_lang,
         )
-        self.stock_movement_form = StockMovementForm(
-            on_back=lambda: self.switch("products_list"),
-        )
-
-        self.screens = {
-            "dashboard": self.dashboard_screen,
-            "pos": self.pos_screen,
-            "products_list": self.products_list_screen,
-            "product_form": self.product_form_screen,
-            "reports": self.reports_screen,
-            'stock_movement_form': self.stock_movement_form,
-        }
-
-        for screen in self.screens.values():
-            self.stack.addWidget(screen)
-
-        self.switch("dashboard")
-        self.apply_language()
-        self.apply_styles()
+        self.language_changed.connect(screen.apply_language)
+        return screen
+
+    def _build_stock_movement_form(self):
+        from app.windows.stock_movement_form import StockMovementForm
+        return StockMovementForm(on_back=lambda: self.switch("products_list"))
+
+    dashboard_screen = property(lambda self: self.screen("dashboard"))
+    pos_screen = property(lambda self: self.screen("pos"))
+    products_list_screen = property(lambda self: self.screen("products_list"))
+    product_form_screen = property(lambda self: self.screen("product_form"))
+    reports_screen = property(lambda self: self.screen("reports"))
+    stock_movement_form = property(lambda self: self.screen("stock_movement_form"))
     
     def apply_styles(self):
         pass
@@ -128,21 +166,17 @@ class MainWindow(QMainWindow):
         self.btn_reports.clicked.connect(lambda: self.switch("reports"))
         self.btn_change_pw.clicked.connect(self.open_change_password)
         self.lang_combo.currentIndexChanged.connect(self.on_lang)
-        
-        # on Language Change inform children to upate
-        self.language_changed.connect(self.products_list_screen.refresh_products)
-        self.language_changed.connect(self.product_form_screen.apply_language)
-        self.stock_movement_form.movement_recorded.connect(lambda pid, new_stock: self.products_list_screen.refresh_products())
+        QShortcut(QKeySequence("Ctrl+Shift+D"), self, self.open_diagnostics)
+        # screens connect to language_changed when they are built (see the factories)
 
         # self.products_list_screen.edit_requested.connect(self.open_edit_product)
-        # self.products_list_screen.stock_movement_requested.connect(self.open_stock_movement)
         # self.stock_movement_form.movement_recorded.connect(self.on_stock_movement_recorded)
         # self.product_form_screen.product_saved.connect(self.on_product_saved)
         
         
         
     def switch(self, key):
-        widget = self.screens.get(key)
+        widget = self.screen(key)
         if widget:
             self.stack.setCurrentWidget(widget)
 
@@ -159,17 +193,36 @@ class MainWindow(QMainWindow):
         self.switch("product_form")
     
     def on_product_saved(self):
-        # refresh list and return to list view
-        try:
-            self.products_list_screen.refresh_products()
-        except Exception:
-            pass
+        # the list already picked up the change from the product events; just go back to it
         self.switch("products_list")
 
     def open_change_password(self):
+        from app.windows.change_password_dialog import ChangePasswordDialog
         dlg = ChangePasswordDialog(get_lang=lambda: self.current_lang, parent=self)
         dlg.exec()
 
+    def open_price_update(self):
+        from app.windows.price_update_dialog import PriceUpdateDialog
+        # the list picks the new prices up from the product events
+        dlg = PriceUpdateDialog(get_lang=lambda: self.current_lang, parent=self)
+        dlg.exec()
+
+    def open_reorder(self):
+        from app.windows.reorder_dialog import ReorderDialog
+        dlg = ReorderDialog(get_lang=lambda: self.current_lang, parent=self)
+        if dlg.exec() and dlg.chosen is not None:
+            self.stock_movement_form.load_receipt(dlg.chosen.product_id, dlg.chosen.packs)
+            self.switch("stock_movement_form")
+
+    def open_diagnostics(self):
+        if self.diagnostics is None:
+            from app.windows.diagnostics_dialog import DiagnosticsDialog
+            # not modal: keep it open next to the screen being timed / profiled
+            self.diagnostics = DiagnosticsDialog(get_lang=lambda: self.current_lang, parent=self)
+            self.language_changed.connect(self.diagnostics.update_texts)
+        self.diagnostics.show()
+        self.diagnostics.raise_()
+
     def on_lang(self):
         self.current_lang = self.lang_combo.currentData()
         self.apply_language()
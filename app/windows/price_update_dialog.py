@@ -0,0 +1,197 @@
+# app/windows/price_update_dialog.py
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel, QLineEdit, QComboBox,
+    QPushButton, QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView
+)
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QColor, QDoubleValidator
+from app.services.price_update import PriceChange, PriceUpdateService, PRICE_FIELDS, ROUNDING
+from app.utils import instrumentation
+from app.utils.i18n import t
+from app.windows.executor import get_executor
+
+
+def rs(paisa):
+    return f"{int(paisa or 0) / 100:,.2f}"
+
+
+class PriceUpdateDialog(QDialog):
+    """Bulk price change: pick products and a rule, preview the new prices, apply in one go."""
+
+    PREVIEW_ROWS = 500             # rows shown; the count and apply cover all of them
+    ROUND_TO = (1, 50, 100, 500, 1000)  # paisa
+
+    def __init__(self, get_lang=lambda: "ur", parent=None):
+        super().__init__(parent)
+        self.get_lang = get_lang
+        self.service = PriceUpdateService()
+        self.executor = get_executor()
+        self._preview_key = ("price_preview", id(self))
+        self._previewed = None  # the PriceChange the table shows
+        self._build_ui()
+        self.update_texts()
+        self.executor.submit(lambda: (self.service.companies(), self.service.categories()),
+                             on_done=self._fill_choices)
+
+    def _build_ui(self):
+        self.setModal(True)
+        self.resize(760, 560)
+        layout = QVBoxLayout(self)
+
+        form = QFormLayout()
+        self.company_cb = QComboBox()
+        self.category_cb = QComboBox()
+        self.field_cb = QComboBox()
+        self.percent_input = QLineEdit()
+        self.percent_input.setValidator(QDoubleValidator(-99.99, 1000.0, 2, self))
+        self.amount_input = QLineEdit()
+        self.amount_input.setValidator(QDoubleValidator(-100_000.0, 100_000.0, 2, self))
+        self.round_cb = QComboBox()
+        self.rounding_cb = QComboBox()
+        self.lbl_company, self.lbl_category, self.lbl_field = QLabel(), QLabel(), QLabel()
+        self.lbl_percent, self.lbl_amount, self.lbl_round = QLabel(), QLabel(), QLabel()
+        form.addRow(self.lbl_company, self.company_cb)
+        form.addRow(self.lbl_category, self.category_cb)
+        form.addRow(self.lbl_field, self.field_cb)
+        form.addRow(self.lbl_percent, self.percent_input)
+        form.addRow(self.lbl_amount, self.amount_input)
+        round_row = QHBoxLayout()
+        round_row.addWidget(self.round_cb)
+        round_row.addWidget(self.rounding_cb)
+        form.addRow(self.lbl_round, round_row)
+        layout.addLayout(form)
+
+        self.table = QTableWidget(0, 5)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table)
+
+        self.msg = QLabel()
+        layout.addWidget(self.msg)
+
+        row = QHBoxLayout()
+        row.addStretch()
+        self.btn_preview = QPushButton()
+        self.btn_apply = QPushButton()
+        self.btn_apply.setEnabled(False)
+        self.btn_cancel = QPushButton()
+        row.addWidget(self.btn_preview)
+        row.addWidget(self.btn_apply)
+        row.addWidget(self.btn_cancel)
+        layout.addLayout(row)
+
+        self.btn_preview.clicked.connect(self.preview)
+        self.btn_apply.clicked.connect(self.apply)
+        self.btn_cancel.clicked.connect(self.reject)
+        # any edit invalidates the preview: apply only what was looked at
+        for cb in (self.company_cb, self.category_cb, self.field_cb, self.round_cb, self.rounding_cb):
+            cb.currentIndexChanged.connect(self._invalidate)
+        for edit in (self.percent_input, self.amount_input):
+            edit.textChanged.connect(self._invalidate)
+
+    def update_texts(self):
+        lang = self.get_lang() or "ur"
+        self.setWindowTitle(t(lang, "bulk_prices"))
+        self.lbl_company.setText(t(lang, "company"))
+        self.lbl_category.setText(t(lang, "category"))
+        self.lbl_field.setText(t(lang, "price_field"))
+        self.lbl_percent.setText(t(lang, "percent"))
+        self.lbl_amount.setText(t(lang, "amount_rs"))
+        self.lbl_round.setText(t(lang, "round_to"))
+        self.btn_preview.setText(t(lang, "preview"))
+        self.btn_apply.setText(t(lang, "apply"))
+        self.btn_cancel.setText(t(lang, "cancel"))
+        self.field_cb.clear()
+        for key in (*PRICE_FIELDS, "both"):
+            self.field_cb.addItem(t(lang, key), key)
+        self.field_cb.setCurrentIndex(self.field_cb.findData("sell_price"))
+        self.round_cb.clear()
+        for paisa in self.ROUND_TO:
+            self.round_cb.addItem(f"Rs {rs(paisa)}", paisa)
+        self.rounding_cb.clear()
+        for key in ROUNDING:
+            self.rounding_cb.addItem(t(lang, f"rounding_{key}"), key)
+        self.table.setHorizontalHeaderLabels(
+            [t(lang, h) for h in ("product", "company", "base_price", "sell_price", "new_price")])
+
+    def _fill_choices(self, result):
+        companies, categories = result
+        lang = self.get_lang() or "ur"
+        self.company_cb.addItem(t(lang, "all"), None)
+        for company in companies:
+            self.company_cb.addItem(company, company)
+        self.category_cb.addItem(t(lang, "all"), None)
+        for cat_id, name in categories:
+            self.category_cb.addItem(name, cat_id)
+
+    # -----------------------
+    # Rule
+    # -----------------------
+    def _change(self) -> PriceChange:
+        field = self.field_cb.currentData()
+        percent = self.percent_input.text().strip() or "0"
+        amount = self.amount_input.text().strip() or "0"
+        try:
+            amount_paisa = round(float(amount) * 100)
+        except ValueError:
+            raise ValueError(f"invalid amount {amount!r}") from None
+        return PriceChange(company=self.company_cb.currentData(), category_id=self.category_cb.currentData(),
+                           fields=PRICE_FIELDS if field == "both" else (field,), percent=percent,
+                           amount=amount_paisa, round_to=self.round_cb.currentData() or 1,
+                           rounding=self.rounding_cb.currentData() or "nearest")
+
+    def _invalidate(self):
+        self._previewed = None
+        self.btn_apply.setEnabled(False)
+
+    # -----------------------
+    # Preview / apply
+    # -----------------------
+    def preview(self):
+        try:
+            change = self._change()
+        except ValueError as e:
+            self.msg.setText(str(e))
+            return
+        self.msg.setText("…")
+        self.executor.submit(self.service.preview, change, key=self._preview_key,
+                             on_done=lambda rows: self._show_preview(change, rows),
+                             on_error=lambda e: self.msg.setText(str(e)))
+
+    def _show_preview(self, change, rows):
+        lang = self.get_lang() or "ur"
+        shown = rows[:self.PREVIEW_ROWS]
+        self.table.setRowCount(len(shown))
+        for r, (pid, ur_name, en_name, company, base, new_base, sell, new_sell) in enumerate(shown):
+            name = (en_name if lang == "en" and en_name else ur_name) or en_name or f"#{pid}"
+            cells = (name, company or "", f"{rs(base)} → {rs(new_base)}" if new_base != base else rs(base),
+                     rs(sell), rs(new_sell))
+            for c, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                if c >= 2:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                if new_sell < new_base:
+                    item.setForeground(QColor("#c0392b"))
+                self.table.setItem(r, c, item)
+        below_cost = sum(1 for row in rows if row[7] < row[5])
+        text = f"{t(lang, 'rows_to_change')}: {len(rows)}"
+        if below_cost:
+            text += f"   {t(lang, 'below_cost')}: {below_cost}"
+        self.msg.setText(text)
+        self._previewed = change if rows else None
+        self.btn_apply.setEnabled(bool(rows))
+
+    def apply(self):
+        change = self._previewed
+        if change is None:
+            return
+        self.btn_apply.setEnabled(False)
+        self.btn_preview.setEnabled(False)
+        self.executor.submit(self.service.apply, change, created_by="Admin",
+                             on_done=lambda n: self.accept(), on_error=self._apply_failed)
+
+    def _apply_failed(self, error):
+        instrumentation.error("bulk price change", error)
+        self.msg.setText(str(error))
+        self.btn_preview.setEnabled(True)
@@ -6,6 +6,7 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtGui import QIntValidator, QDoubleValidator
 from PyQt6.QtCore import Qt
 from app.utils.i18n import t
+from app.utils.quantity import format_qty, to_milli
 from ..services.product_service import ProductService
 
 
@@ -299,47 +300,44 @@ class ProductFormScreen(QWidget):
         self.product_id = product_id
         prod = self.product_service.get(product_id)
         if prod:
-            # expected mapping:
-            # id, short_code, ur_name, en_name, company, barcode,
-            # base_price (paisa), sell_price (paisa), stock_qty, reorder_threshold,
-            # category_id, unit, custom_packing, packing_size, supply_pack_qty, created_at, updated_at
-            # Defensive indexing
-            self.short_code.setText(str(prod[1] or ""))
-            self.name_ur.setText(str(prod[2] or ""))
-            self.name_en.setText(str(prod[3] or ""))
-            self.company.setText(str(prod[4] or ""))
-            self.barcode.setText(str(prod[5] or ""))
+            # ProductDetail (app.services.product_queries); prices in paisa, quantities in milli-units
+            self.short_code.setText(str(prod.short_code or ""))
+            self.name_ur.setText(str(prod.ur_name or ""))
+            self.name_en.setText(str(prod.en_name or ""))
+            self.company.setText(str(prod.company or ""))
+            self.barcode.setText(str(prod.barcode or ""))
 
             # convert paisa -> rupees for display
             try:
-                base_paisa = int(prod[6]) if prod[6] is not None else 0
-                sell_paisa = int(prod[7]) if prod[7] is not None else 0
+                base_paisa = int(prod.base_price) if prod.base_price is not None else 0
+                sell_paisa = int(prod.sell_price) if prod.sell_price is not None else 0
                 self.base_price.setText(f"{base_paisa/100:.2f}")
                 self.sell_price.setText(f"{sell_paisa/100:.2f}")
             except Exception:
-                self.base_price.setText(str(prod[6] or ""))
-                self.sell_price.setText(str(prod[7] or ""))
+                self.base_price.setText(str(prod.base_price or ""))
+                self.sell_price.setText(str(prod.sell_price or ""))
 
-            self.stock_qty.setText(str(prod[8] or "0"))
-            self.reorder_threshold.setText(str(prod[9] or "0"))
+            # quantities are milli-units -> base units for display
+            self.stock_qty.setText(format_qty(prod.stock_milli or 0))
+            self.reorder_threshold.setText(format_qty(prod.reorder_threshold_milli or 0))
 
             # category: select if present
-            cat_id = prod[10]
+            cat_id = prod.category_id
             if cat_id is not None:
                 idx = self._find_combo_index_by_data(self.category_cb, cat_id)
                 if idx >= 0:
                     self.category_cb.setCurrentIndex(idx)
 
             # unit
-            unit = prod[11] or "kg"
+            unit = prod.unit or "kg"
             uidx = self.unit_cb.findData(unit)
             if uidx >= 0:
                 self.unit_cb.setCurrentIndex(uidx)
 
             # custom_packing, packing_size, supply_pack_qty
-            self.custom_packing.setChecked(bool(prod[12]))
-            self.packing_size.setText(str(prod[13] or ""))
-            self.supply_pack_qty.setText(str(prod[14] or ""))
+            self.custom_packing.setChecked(bool(prod.custom_packing))
+            self.packing_size.setText(format_qty(prod.packing_size_milli) if prod.packing_size_milli else "")
+            self.supply_pack_qty.setText(format_qty(prod.supply_pack_milli) if prod.supply_pack_milli else "")
 
         self.apply_language()
 
@@ -413,25 +411,25 @@ class ProductFormScreen(QWidget):
             # allow but warn; treat as valid
             pass
 
-        # stock and reorder (allow floats)
+        # stock and reorder (allow fractions; parsed exactly to milli-units)
         try:
-            stock_qty = float(self.stock_qty.text().strip() or 0.0)
+            stock_milli = to_milli(self.stock_qty.text().strip(), default=0)
         except Exception:
             return False, self.get_label_text("stock_qty", lang) + " " + ("درست نہیں" if lang == "ur" else "is invalid")
 
         try:
-            reorder_threshold = float(self.reorder_threshold.text().strip() or 0.0)
+            reorder_threshold_milli = to_milli(self.reorder_threshold.text().strip(), default=0)
         except Exception:
             return False, self.get_label_text("reorder_threshold", lang) + " " + ("درست نہیں" if lang == "ur" else "is invalid")
 
         # packing related
         try:
-            packing_size = float(self.packing_size.text().strip()) if self.packing_size.text().strip() != "" else None
+            packing_size_milli = to_milli(self.packing_size.text().strip(), default=None)
         except Exception:
             return False, self.get_label_text("packing_size", lang) + " " + ("درست نہیں" if lang == "ur" else "is invalid")
 
         try:
-            supply_pack_qty = float(self.supply_pack_qty.text().strip() or 1.0)
+            supply_pack_milli = to_milli(self.supply_pack_qty.text().strip() or 1)
         except Exception:
             return False, self.get_label_text("supply_pack_qty", lang) + " " + ("درست نہیں" if lang == "ur" else "is invalid")
 
@@ -463,13 +461,13 @@ class ProductFormScreen(QWidget):
             "barcode": barcode,
             "base_price": base_price,      # rupees float; ProductService will convert
             "sell_price": sell_price,
-            "stock_qty": stock_qty,
-            "reorder_threshold": reorder_threshold,
+            "stock_milli": stock_milli,    # milli-units (see app.utils.quantity)
+            "reorder_threshold_milli": reorder_threshold_milli,
             "category_id": category_id,
             "unit": unit,
             "custom_packing": custom_packing,
-            "packing_size": packing_size,
-            "supply_pack_qty": supply_pack_qty,
+            "packing_size_milli": packing_size_milli,
+            "supply_pack_milli": supply_pack_milli,
         }
         return True, payload
 
@@ -1,22 +1,28 @@
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QLabel, QTableWidget,
-    QTableWidgetItem, QAbstractItemView,
-    QHeaderView
+    QPushButton, QLabel, QTableView,
+    QAbstractItemView, QHeaderView
 )
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtCore import QTimer, pyqtSignal
 from app.utils.i18n import t
-from ..services.product_service import ProductService
+from ..services.catalog_cache import get_catalog_cache
+from .products_table_model import ProductsTableModel
+from .executor import get_executor
 
 
 class ProductsListScreen(QWidget):
-    def __init__(self, on_add, on_edit, on_stock_reorder, get_lang=lambda: "ur"):
+    # ProductChange from any thread -> applied to the model on the GUI thread
+    products_changed = pyqtSignal(object)
+
+    def __init__(self, on_add, on_edit, on_stock_movement, on_stock_reorder, on_price_update, get_lang=lambda: "ur"):
         super().__init__()
         self.on_add = on_add
         self.on_edit = on_edit
         self.get_lang = get_lang
+        self.on_stock_movement = on_stock_movement
         self.on_stock_reorder = on_stock_reorder
-        self.product_service = ProductService()
+        self.on_price_update = on_price_update
+        self.catalog = get_catalog_cache()
 
         # column width ratios (modern, readable)
         self._column_ratios = [3, 2, 2, 2, 2, 2, 1, 2, 2, 2]
@@ -25,10 +31,19 @@ class ProductsListScreen(QWidget):
         self.apply_styles()
         self.connect_actions()
 
+        # keep the loaded rows current from committed product/stock changes, once the
+        # catalog cache (where the rows are read from) has applied them
+        self.products_changed.connect(self.model.apply_change)
+        events, forward = self.catalog.changes, self.products_changed.emit
+        events.subscribe(forward)
+        self.destroyed.connect(lambda: events.unsubscribe(forward))
+
     def connect_actions(self):
         self.btn_add.clicked.connect(self.on_add)
-        self.table.cellDoubleClicked.connect(self.handle_edit)
+        self.table.doubleClicked.connect(self.handle_edit)
+        self.btn_stock_movement.clicked.connect(self.on_stock_movement)
         self.btn_stock_reorder.clicked.connect(self.on_stock_reorder)
+        self.btn_price_update.clicked.connect(self.on_price_update)
            
     def init_ui(self):
         layout = QVBoxLayout(self)
@@ -42,17 +57,31 @@ class ProductsListScreen(QWidget):
         header.addStretch()
 
         self.btn_add = QPushButton()
+        self.btn_stock_movement = QPushButton()
         self.btn_stock_reorder = QPushButton() 
+        self.btn_price_update = QPushButton()
         header.addWidget(self.btn_add)
+        header.addWidget(self.btn_stock_movement)
         header.addWidget(self.btn_stock_reorder)
+        header.addWidget(self.btn_price_update)
 
         layout.addLayout(header)
 
         # ---------- Table ----------
-        self.table = QTableWidget(0, 0)
+        # lazy model: rows are fetched page by page (on a worker thread) as the view scrolls
+        self.model = ProductsTableModel(self.catalog, get_lang=self.get_lang,
+                                        executor=get_executor(), parent=self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.table.setAlternatingRowColors(True)
+        # fixed row height: the view never has to measure rows it hasn't painted
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+
+        header = self.table.horizontalHeader()
+        header.setMinimumSectionSize(80)
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
 
         layout.addWidget(self.table)
 
@@ -62,91 +91,9 @@ class ProductsListScreen(QWidget):
     # Data
     # --------------------------------------------------
     def refresh_products(self):
-        try:
-            rows = self.product_service.all_products()
-        except Exception as e:
-            print("Failed to fetch products:", e)
-            rows = []
-
+        # drop loaded pages; the view pulls the first page again through fetchMore
+        self.model.reload()
         lang = self.get_lang() or "ur"
-
-        # ---------- Headers ----------
-        if lang == "ur":
-            headers = [
-                "نام", "شارٹ کوڈ", "کمپنی",
-                "قیمت خرید", "قیمت فروخت",
-                "اسٹاک", "یونٹ",
-                "کھلا وزن", "پیکنگ سائز",
-                "کم اسٹاک"
-            ]
-        else:
-            headers = [
-                "Name", "Short Code", "Company",
-                "Base Price", "Sell Price",
-                "Stock", "Unit",
-                "Custom Packing", "Packing Size",
-                "Reorder Level"
-            ]
-
-        self.table.setColumnCount(len(headers))
-        self.table.setHorizontalHeaderLabels(headers)
-        self.table.setRowCount(len(rows))
-
-        header = self.table.horizontalHeader()
-        header.setMinimumSectionSize(80)
-        header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
-
-        # ---------- Helpers ----------
-        def price_rs(paisa):
-            try:
-                return f"{int(paisa) / 100:.2f}"
-            except Exception:
-                return ""
-
-        def yes_no(v):
-            return "✔" if v else "—"
-
-        # ---------- Rows ----------
-        for r, row in enumerate(rows):
-            (
-                prod_id, short_code, ur_name, en_name, company, _barcode,
-                base_price, sell_price, stock_qty, reorder_threshold,
-                _category_id, unit, custom_packing, packing_size, _supply_pack_qty,
-                _created_at, _updated_at
-            ) = row
-
-            # name by language
-            ur_name = (ur_name or "").strip()
-            en_name = (en_name or "").strip()
-            name = ur_name if lang == "ur" and ur_name else en_name or ur_name
-
-            items = [
-                QTableWidgetItem(name),
-                QTableWidgetItem(short_code or ""),
-                QTableWidgetItem(company or ""),
-                QTableWidgetItem(price_rs(base_price)),
-                QTableWidgetItem(price_rs(sell_price)),
-                QTableWidgetItem(str(stock_qty)),
-                QTableWidgetItem(unit),
-                QTableWidgetItem(yes_no(custom_packing)),
-                QTableWidgetItem(str(packing_size) if packing_size else "—"),
-                QTableWidgetItem(str(reorder_threshold)),
-            ]
-
-            # store product id on first column
-            items[0].setData(Qt.ItemDataRole.UserRole, prod_id)
-
-            # alignment
-            for i, item in enumerate(items):
-                if i in (3, 4):  # prices
-                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-                elif i in (5, 6, 7, 8, 9):
-                    item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                else:
-                    item.setTextAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
-
-                self.table.setItem(r, i, item)
-                
         self._apply_language(lang=lang)
 
     def _apply_language(self, lang=None):
@@ -156,18 +103,17 @@ class ProductsListScreen(QWidget):
             
         self.title.setText("📦 " + t(lang, "products"))
         self.btn_add.setText("＋ " + t(lang, "add_product"))
+        self.btn_stock_movement.setText(t(lang, "stock_movement"))
         self.btn_stock_reorder.setText(t(lang, "stock_reorder"))
+        self.btn_price_update.setText(t(lang, "bulk_prices"))
         
         QTimer.singleShot(0, self._apply_column_ratios)
 
     # --------------------------------------------------
     # Interaction
     # --------------------------------------------------
-    def handle_edit(self, row, col):
-        item = self.table.item(row, 0)
-        if not item:
-            return
-        product_id = item.data(Qt.ItemDataRole.UserRole)
+    def handle_edit(self, index):
+        product_id = self.model.product_id(index.row())
         if product_id:
             self.on_edit(product_id)
 
@@ -202,7 +148,7 @@ class ProductsListScreen(QWidget):
         if not self._column_ratios:
             return
 
-        cols = self.table.columnCount()
+        cols = self.model.columnCount()
         ratios = self._column_ratios[:cols]
         total = sum(ratios) or cols
         avail = self.table.viewport().width()
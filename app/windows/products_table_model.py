@@ -0,0 +1,258 @@
+# app/windows/products_table_model.py
+from bisect import bisect_right
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from app.services.events import BULK_CHANGE, DELETED, STOCK
+from app.utils import instrumentation
+from app.utils.quantity import format_qty
+
+
+def price_rs(paisa):
+    try:
+        return f"{int(paisa) / 100:.2f}"
+    except Exception:
+        return ""
+
+
+def yes_no(v):
+    return "✔" if v else "—"
+
+
+class ProductsTableModel(QAbstractTableModel):
+    """
+    Lazy products model for the products list QTableView.
+
+    Rows are pulled one keyset page at a time (CatalogCache.page: ids from the ur_name
+    index, rows from the cache's columns) as the view scrolls, through
+    canFetchMore/fetchMore, and kept as ProductRow records. Display text
+    (paisa -> rupees, ✔/—, ...) is built in data(), i.e. only for cells that get painted.
+
+    apply_change() updates loaded rows in place from the changes the catalog cache has
+    applied (CatalogCache.changes): a stock or field change is an id -> row dict hit
+    plus one dataChanged, whatever the catalog size; created / updated rows are read
+    from the cache, no DB round trip.
+
+    With an executor (app.windows.executor) pages are fetched on a worker thread and
+    merged in when they arrive; without one, fetches are synchronous.
+    """
+
+    PAGE_SIZE = 200
+
+    HEADERS = {
+        "ur": [
+            "نام", "شارٹ کوڈ", "کمپنی",
+            "قیمت خرید", "قیمت فروخت",
+            "اسٹاک", "یونٹ",
+            "کھلا وزن", "پیکنگ سائز",
+            "کم اسٹاک"
+        ],
+        "en": [
+            "Name", "Short Code", "Company",
+            "Base Price", "Sell Price",
+            "Stock", "Unit",
+            "Custom Packing", "Packing Size",
+            "Reorder Level"
+        ],
+    }
+
+    _ALIGN_RIGHT = Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+    _ALIGN_CENTER = Qt.AlignmentFlag.AlignCenter
+    _ALIGN_LEFT = Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter
+
+    def __init__(self, catalog, get_lang=lambda: "ur", executor=None, parent=None):
+        super().__init__(parent)
+        self.catalog = catalog
+        self.get_lang = get_lang
+        self.executor = executor
+        self._page_key = ("products_page", id(self))
+        self._rows = []
+        self._row_of = {}  # product id -> row number in _rows
+        self._exhausted = False
+        self._fetching = False  # a page request is in flight
+        self._generation = 0  # bumped by reload(): pages fetched for the old rows are dropped
+
+    # -----------------------
+    # Loading
+    # -----------------------
+    def reload(self):
+        """Drop loaded rows; the view asks for the first page again via fetchMore."""
+        if self.executor is not None:
+            self.executor.cancel_key(self._page_key)  # page for the old rows
+        self._generation += 1  # in case it already finished and its result is queued
+        self.beginResetModel()
+        self._rows = []
+        self._row_of = {}
+        self._exhausted = False
+        self._fetching = False
+        self.endResetModel()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted and not self._fetching
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted or self._fetching:
+            return
+        after = None
+        if self._rows:
+            last = self._rows[-1]
+            after = (last.ur_name, last.id)
+        generation = self._generation
+        if self.executor is None:
+            try:
+                page = self.catalog.page(after=after, limit=self.PAGE_SIZE)
+            except Exception as e:
+                self._on_fetch_failed(e, generation)
+                return
+            self._append_page(page, generation)
+            return
+        self._fetching = True
+        self.executor.submit(
+            self.catalog.page, after=after, limit=self.PAGE_SIZE,
+            on_done=lambda page: self._append_page(page, generation),
+            on_error=lambda e: self._on_fetch_failed(e, generation),
+            key=self._page_key,
+        )
+
+    def _on_fetch_failed(self, error, generation):
+        if generation != self._generation:
+            return
+        instrumentation.error("products page", error)
+        self._fetching = False
+        self._exhausted = True
+
+    def _append_page(self, page, generation):
+        if generation != self._generation:
+            return  # fetched before a reload(): its rows and position are stale
+        self._fetching = False
+        if len(page) < self.PAGE_SIZE:
+            self._exhausted = True
+        if not page:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+        for offset, row in enumerate(page):
+            self._row_of[row.id] = first + offset
+        self._rows.extend(page)
+        self.endInsertRows()
+
+    # -----------------------
+    # Incremental updates
+    # -----------------------
+    def apply_change(self, change):
+        """Apply a ProductChange (app.services.events) to the loaded rows."""
+        if change.kind == STOCK:
+            for product_id, stock_milli in change.stock.items():
+                r = self._row_of.get(product_id)
+                if r is not None:
+                    self._rows[r].stock_milli = stock_milli  # records are mutable: patch in place
+                    self.dataChanged.emit(self.index(r, 5), self.index(r, 5))
+        elif change.kind == DELETED:
+            for product_id in change.product_ids:
+                self._remove_row(product_id)
+        elif len(change.product_ids) > BULK_CHANGE:
+            self.reload()  # bulk import: re-page from the top instead of merging row by row
+        else:
+            self._apply_rows(self.catalog.rows(change.product_ids))
+
+    def _apply_rows(self, fresh):
+        """Merge re-read rows (created / updated products) into the loaded window."""
+        for row in fresh:
+            r = self._row_of.get(row.id)
+            if r is not None and row.ur_name == self._rows[r].ur_name:
+                # same sort position: patch in place
+                self._rows[r] = row
+                self.dataChanged.emit(self.index(r, 0), self.index(r, self.columnCount() - 1))
+            else:
+                if r is not None:
+                    self._remove_row(row.id)
+                self._insert_sorted(row)
+
+    def _insert_sorted(self, row):
+        """Insert a new/renamed row at its (ur_name, id) position if it falls inside the loaded window."""
+        key = (row.ur_name, row.id)
+        pos = bisect_right(self._rows, key, key=lambda r: (r.ur_name, r.id))
+        if pos == len(self._rows) and not self._exhausted:
+            return  # beyond the loaded window; a later fetchMore brings it in
+        self.beginInsertRows(QModelIndex(), pos, pos)
+        self._rows.insert(pos, row)
+        self.endInsertRows()
+        self._reindex(pos)
+
+    def _remove_row(self, product_id):
+        r = self._row_of.pop(product_id, None)
+        if r is None:
+            return
+        self.beginRemoveRows(QModelIndex(), r, r)
+        del self._rows[r]
+        self.endRemoveRows()
+        self._reindex(r)
+
+    def _reindex(self, start):
+        for r in range(start, len(self._rows)):
+            self._row_of[self._rows[r].id] = r
+
+    def product_id(self, row: int):
+        if 0 <= row < len(self._rows):
+            return self._rows[row].id
+        return None
+
+    # -----------------------
+    # Qt model API
+    # -----------------------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS["en"])
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or orientation != Qt.Orientation.Horizontal:
+            return None
+        lang = self.get_lang() or "ur"
+        headers = self.HEADERS.get(lang, self.HEADERS["en"])
+        return headers[section] if 0 <= section < len(headers) else None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        col = index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._display(row, col)
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            if col in (3, 4):  # prices
+                return self._ALIGN_RIGHT
+            if col in (5, 6, 7, 8, 9):
+                return self._ALIGN_CENTER
+            return self._ALIGN_LEFT
+        if role == Qt.ItemDataRole.UserRole:
+            return row.id
+        return None
+
+    def _display(self, row, col):
+        if col == 0:
+            # name by language
+            ur_name = (row.ur_name or "").strip()
+            en_name = (row.en_name or "").strip()
+            lang = self.get_lang() or "ur"
+            return ur_name if lang == "ur" and ur_name else en_name or ur_name
+        if col == 1:
+            return row.short_code or ""
+        if col == 2:
+            return row.company or ""
+        if col == 3:
+            return price_rs(row.base_price)
+        if col == 4:
+            return price_rs(row.sell_price)
+        if col == 5:
+            return format_qty(row.stock_milli)
+        if col == 6:
+            return row.unit
+        if col == 7:
+            return yes_no(row.custom_packing)
+        if col == 8:
+            packing_size = row.packing_size_milli
+            return format_qty(packing_size) if packing_size else "—"
+        if col == 9:
+            return format_qty(row.reorder_threshold_milli)
+        return None
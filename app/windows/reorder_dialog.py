@@ -0,0 +1,105 @@
+# app/windows/reorder_dialog.py
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView
+)
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QColor
+from app.services.reorder_service import ReorderService
+from app.utils import instrumentation
+from app.utils.i18n import t
+from app.utils.quantity import format_qty
+from app.windows.executor import get_executor
+
+
+class ReorderDialog(QDialog):
+    """
+    Low-stock products with the packs to order (ReorderService.suggestions), most urgent
+    first. "Receive stock" closes it with `chosen` set to the selected suggestion, for
+    the stock movement form to book the delivery.
+    """
+
+    URGENT_DAYS = 3  # rows with fewer days of stock left are shown in red
+
+    def __init__(self, get_lang=lambda: "ur", parent=None):
+        super().__init__(parent)
+        self.get_lang = get_lang
+        self.service = ReorderService()
+        self.executor = get_executor()
+        self.suggestions = []
+        self.chosen = None  # the ReorderSuggestion to receive, set on accept
+        self._build_ui()
+        self.update_texts()
+        self.msg.setText("…")
+        self.executor.submit(self.service.suggestions, on_done=self._show, on_error=self._load_failed)
+
+    def _build_ui(self):
+        self.setModal(True)
+        self.resize(820, 520)
+        layout = QVBoxLayout(self)
+
+        self.table = QTableWidget(0, 7)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table)
+
+        self.msg = QLabel()
+        layout.addWidget(self.msg)
+
+        row = QHBoxLayout()
+        row.addStretch()
+        self.btn_receive = QPushButton()
+        self.btn_receive.setEnabled(False)
+        self.btn_close = QPushButton()
+        row.addWidget(self.btn_receive)
+        row.addWidget(self.btn_close)
+        layout.addLayout(row)
+
+        self.btn_receive.clicked.connect(self.receive)
+        self.btn_close.clicked.connect(self.reject)
+        self.table.itemSelectionChanged.connect(
+            lambda: self.btn_receive.setEnabled(bool(self.table.selectionModel().selectedRows())))
+        self.table.cellDoubleClicked.connect(lambda r, c: self.receive())
+
+    def update_texts(self):
+        lang = self.get_lang() or "ur"
+        self.setWindowTitle(t(lang, "stock_reorder"))
+        self.btn_receive.setText(t(lang, "receive_stock"))
+        self.btn_close.setText(t(lang, "close"))
+        self.table.setHorizontalHeaderLabels(
+            [t(lang, h) for h in ("product", "in_stock", "reorder_level", "sold_per_day",
+                                  "days_left", "packs", "order_qty")])
+
+    def _show(self, suggestions):
+        lang = self.get_lang() or "ur"
+        self.suggestions = suggestions
+        self.table.setRowCount(len(suggestions))
+        for r, s in enumerate(suggestions):
+            name = (s.en_name if lang == "en" and s.en_name else s.ur_name) or s.en_name or f"#{s.product_id}"
+            unit = f" {s.unit}" if s.unit else ""
+            cells = (name, format_qty(s.stock_milli) + unit, format_qty(s.reorder_threshold_milli) + unit,
+                     format_qty(s.daily_sales_milli) + unit, "—" if s.days_left is None else f"{s.days_left:g}",
+                     str(s.packs), format_qty(s.order_milli) + unit)
+            urgent = s.days_left is not None and s.days_left < self.URGENT_DAYS
+            for c, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                if c >= 1:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                if urgent:
+                    item.setForeground(QColor("#c0392b"))
+                self.table.setItem(r, c, item)
+        self.msg.setText(f"{t(lang, 'low_stock')}: {len(suggestions)}" if suggestions
+                         else t(lang, "nothing_to_reorder"))
+
+    def _load_failed(self, error):
+        instrumentation.error("reorder suggestions", error)
+        self.msg.setText(f"{t(self.get_lang() or 'ur', 'reorder_failed')}: {error}")
+
+    def receive(self):
+        rows = self.table.selectionModel().selectedRows()
+        if not rows:
+            return
+        self.chosen = self.suggestions[rows[0].row()]
+        self.accept()
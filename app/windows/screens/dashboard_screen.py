@@ -1,23 +1,94 @@
 # app/windows/screens/dashboard_screen.py
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QGridLayout, QLabel, QFrame
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+from app.services.kpis import get_kpis
 from app.utils.i18n import t
 
+
 class DashboardScreen(QWidget):
+    """
+    Today's KPIs. Rendered from the in-memory KpiAccumulator only: sale / stock events
+    schedule a repaint, nothing here queries the DB.
+    """
+    # any sale / product event, from whatever thread published it
+    kpis_changed = pyqtSignal()
+
+    CARDS = ("today_revenue", "sale_count", "avg_basket", "gross_margin", "low_stock")
+
     def __init__(self, get_lang=lambda: "ur", parent=None):
         super().__init__(parent)
         self.get_lang = get_lang
+        self.kpis = get_kpis()
         self._build_ui()
         self.update_texts()
 
+        # coalesce bursts (a 150-line checkout is one sale + one stock event, an import many)
+        self._render_timer = QTimer(self)
+        self._render_timer.setSingleShot(True)
+        self._render_timer.setInterval(100)
+        self._render_timer.timeout.connect(self.render)
+        self.kpis_changed.connect(self._render_timer.start)
+
+        pool, forward = self.kpis.pool, self.kpis_changed.emit
+        notify = lambda _event: forward()
+        pool.sale_events.subscribe(notify)
+        pool.events.subscribe(notify)
+        self.destroyed.connect(lambda: (pool.sale_events.unsubscribe(notify), pool.events.unsubscribe(notify)))
+
+        # picks up the day change at midnight
+        self._clock = QTimer(self)
+        self._clock.setInterval(60_000)
+        self._clock.timeout.connect(self.render)
+        self._clock.start()
+
     def _build_ui(self):
         layout = QVBoxLayout()
+        layout.setContentsMargins(24, 16, 24, 16)
         self.title = QLabel()
         self.title.setStyleSheet("font-size:18px; font-weight:600;")
         layout.addWidget(self.title)
-        self.info = QLabel("Dashboard content (sales summary, alerts) will go here.")
-        layout.addWidget(self.info)
+
+        grid = QGridLayout()
+        grid.setSpacing(14)
+        self.card_titles = {}
+        self.card_values = {}
+        for i, key in enumerate(self.CARDS):
+            card = QFrame()
+            card.setObjectName("kpiCard")
+            card_layout = QVBoxLayout(card)
+            title = QLabel()
+            title.setStyleSheet("font-size:14px; color:#666;")
+            value = QLabel("—")
+            value.setStyleSheet("font-size:26px; font-weight:700;")
+            value.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            card_layout.addWidget(title)
+            card_layout.addWidget(value)
+            self.card_titles[key] = title
+            self.card_values[key] = value
+            grid.addWidget(card, i // 3, i % 3)
+        layout.addLayout(grid)
+        layout.addStretch()
         self.setLayout(layout)
+        self.setStyleSheet("QFrame#kpiCard { background:#ffffff; border:1px solid #e6e9ee; border-radius:8px; }")
 
     def update_texts(self):
         lang = self.get_lang()
         self.title.setText(t(lang, "dashboard_title"))
+        for key, label in self.card_titles.items():
+            label.setText(t(lang, key))
+        self.render()
+
+    def render(self):
+        snap = self.kpis.snapshot()
+        values = {
+            "today_revenue": f"Rs {snap.revenue / 100:,.2f}",
+            "sale_count": str(snap.sale_count),
+            "avg_basket": f"Rs {snap.avg_basket / 100:,.2f}",
+            "gross_margin": f"{snap.gross_margin:.1f}%",
+            "low_stock": str(snap.low_stock_count),
+        }
+        for key, text in values.items():
+            self.card_values[key].setText(text)
+        self.card_values["low_stock"].setStyleSheet(
+            "font-size:26px; font-weight:700;" + (" color:#c0392b;" if snap.low_stock_count else "")
+        )
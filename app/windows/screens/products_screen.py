@@ -1,7 +1,8 @@
 # app/windows/screens/products_screen.py
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton, QTableWidget, QTableWidgetItem, QHBoxLayout
 from app.utils.i18n import t
-from app.services.db_sqlite3 import get_connection
+from app.services.db_sqlite3 import get_pool
+from app.utils.quantity import format_qty
 
 class ProductsScreen(QWidget):
     def __init__(self, get_lang=lambda: "ur", navigate=None, parent=None):
@@ -36,15 +37,15 @@ class ProductsScreen(QWidget):
         self.add_btn.setText(t(lang, "add_product"))
 
     def refresh_table(self):
-        conn = get_connection()
-        cur = conn.cursor()
-        cur.execute("SELECT ur_name, en_name, stock_qty, sell_price FROM products ORDER BY id;")
-        rows = cur.fetchall()
+        with get_pool().read() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT ur_name, en_name, stock_milli, sell_price FROM products ORDER BY id;")
+            rows = cur.fetchall()
         self.table.setRowCount(0)
         for r in rows:
             row = self.table.rowCount()
             self.table.insertRow(row)
             self.table.setItem(row, 0, QTableWidgetItem(str(r["ur_name"])))
             self.table.setItem(row, 1, QTableWidgetItem(str(r["en_name"] or "")))
-            self.table.setItem(row, 2, QTableWidgetItem(str(r["stock_qty"])))
+            self.table.setItem(row, 2, QTableWidgetItem(format_qty(r["stock_milli"])))
             self.table.setItem(row, 3, QTableWidgetItem(f"{r['sell_price']:.2f}"))
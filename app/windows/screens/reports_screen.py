@@ -1,21 +1,186 @@
 # app/windows/screens/reports_screen.py
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QDateEdit, QComboBox, QCheckBox,
+    QPushButton, QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView, QFileDialog
+)
+from PyQt6.QtCore import Qt, QDate
+from app.services.export import ExportService, FORMATS
+from app.services.report_service import ReportService
+from app.utils import instrumentation
 from app.utils.i18n import t
+from app.utils.quantity import format_qty
+from app.windows.executor import get_executor
+
+
+def rs(paisa):
+    return f"{int(paisa or 0) / 100:,.2f}"
+
 
 class ReportsScreen(QWidget):
+    """Sales / profit for a date range and the top products, from the daily aggregates."""
+
+    TOP_N = 10
+
     def __init__(self, get_lang=lambda: "ur", parent=None):
         super().__init__(parent)
         self.get_lang = get_lang
+        self.report_service = ReportService()
+        self.export_service = ExportService()
+        self.executor = get_executor()
         self._build_ui()
         self.update_texts()
 
     def _build_ui(self):
         layout = QVBoxLayout()
+        layout.setContentsMargins(24, 16, 24, 16)
         self.title = QLabel()
         self.title.setStyleSheet("font-size:18px; font-weight:600;")
         layout.addWidget(self.title)
-        layout.addWidget(QLabel("Reports area — sales & profit will be added later."))
+
+        # ---------- Range ----------
+        controls = QHBoxLayout()
+        today = QDate.currentDate()
+        self.date_from = QDateEdit(QDate(today.year(), today.month(), 1))
+        self.date_to = QDateEdit(today)
+        for edit in (self.date_from, self.date_to):
+            edit.setCalendarPopup(True)
+            edit.setDisplayFormat("yyyy-MM-dd")
+        self.lbl_from = QLabel()
+        self.lbl_to = QLabel()
+        self.order_by = QComboBox()
+        self.btn_refresh = QPushButton()
+        controls.addWidget(self.lbl_from)
+        controls.addWidget(self.date_from)
+        controls.addWidget(self.lbl_to)
+        controls.addWidget(self.date_to)
+        controls.addWidget(self.order_by)
+        controls.addStretch()
+        controls.addWidget(self.btn_refresh)
+        layout.addLayout(controls)
+
+        # ---------- Summary ----------
+        self.lbl_summary = QLabel("—")
+        self.lbl_summary.setStyleSheet("font-size:16px;")
+        layout.addWidget(self.lbl_summary)
+
+        # ---------- Top products ----------
+        self.table = QTableWidget(0, 4)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table)
+
+        # ---------- Export (accountant files) ----------
+        export = QHBoxLayout()
+        self.export_mode = QComboBox()
+        self.export_format = QComboBox()
+        for fmt in FORMATS:
+            self.export_format.addItem(fmt.upper() if fmt == "csv" else "JSON Lines", fmt)
+        self.export_gzip = QCheckBox("gzip")
+        self.btn_export = QPushButton()
+        self.lbl_export = QLabel()
+        export.addWidget(self.export_mode)
+        export.addWidget(self.export_format)
+        export.addWidget(self.export_gzip)
+        export.addWidget(self.btn_export)
+        export.addWidget(self.lbl_export, 1)
+        layout.addLayout(export)
         self.setLayout(layout)
 
+        self.btn_refresh.clicked.connect(self.refresh)
+        self.order_by.activated.connect(self.refresh)
+        self.btn_export.clicked.connect(self.export)
+
     def update_texts(self):
-        self.title.setText(t(self.get_lang(), "reports_title"))
+        lang = self.get_lang()
+        self.title.setText(t(lang, "reports_title"))
+        self.lbl_from.setText(t(lang, "from_date"))
+        self.lbl_to.setText(t(lang, "to_date"))
+        self.btn_refresh.setText(t(lang, "refresh"))
+        current = self.order_by.currentData() or "sales"
+        self.order_by.clear()
+        for key in ("sales", "profit", "qty"):
+            self.order_by.addItem(t(lang, f"top_by_{key}"), key)
+        self.order_by.setCurrentIndex(max(0, self.order_by.findData(current)))
+        self.table.setHorizontalHeaderLabels([t(lang, h) for h in ("product", "quantity", "sales", "profit")])
+        mode = self.export_mode.currentData() or "range"
+        self.export_mode.clear()
+        for key in ("range", "incremental", "full"):
+            self.export_mode.addItem(t(lang, f"export_{key}"), key)
+        self.export_mode.setCurrentIndex(max(0, self.export_mode.findData(mode)))
+        self.btn_export.setText(t(lang, "export"))
+
+    # -----------------------
+    # Data
+    # -----------------------
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+
+    def refresh(self):
+        start = self.date_from.date().toString("yyyy-MM-dd")
+        end = self.date_to.date().toString("yyyy-MM-dd")
+        by = self.order_by.currentData() or "sales"
+        self.executor.submit(self._load, start, end, by,
+                             on_done=self._show, on_error=self._load_failed,
+                             key=("reports", id(self)))
+
+    def _load(self, start, end, by):
+        # worker thread
+        return (self.report_service.summary(start, end),
+                self.report_service.top_products(start, end, self.TOP_N, by))
+
+    def _load_failed(self, error):
+        instrumentation.error("reports load", error)
+        self.lbl_summary.setText(f"{t(self.get_lang() or 'ur', 'reports_failed')}: {error}")
+
+    def _show(self, result):
+        summary, top = result
+        lang = self.get_lang() or "ur"
+        self.lbl_summary.setText(
+            f"{t(lang, 'sale_count')}: {summary['sale_count']}   "
+            f"{t(lang, 'sales')}: Rs {rs(summary['charged_total'])}   "
+            f"{t(lang, 'profit')}: Rs {rs(summary['profit'])}   "
+            f"{t(lang, 'margin')}: {summary['margin']:.1f}%"
+        )
+        self.table.setRowCount(len(top))
+        for r, (pid, ur_name, en_name, qty_milli, sales_total, cost_total, profit) in enumerate(top):
+            name = (en_name if lang == "en" and en_name else ur_name) or en_name or f"#{pid}"
+            cells = (name, format_qty(qty_milli), rs(sales_total), rs(profit))
+            for c, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                if c:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.table.setItem(r, c, item)
+
+    # -----------------------
+    # Export
+    # -----------------------
+    def export(self):
+        lang = self.get_lang() or "ur"
+        folder = QFileDialog.getExistingDirectory(self, t(lang, "export"), str(self.export_service.folder))
+        if not folder:
+            return
+        mode = self.export_mode.currentData()
+        dates = {}
+        if mode == "range":
+            dates = {"date_from": self.date_from.date().toString("yyyy-MM-dd"),
+                     "date_to": self.date_to.date().toString("yyyy-MM-dd")}
+        self.btn_export.setEnabled(False)
+        self.lbl_export.setText("…")
+        self.executor.submit(self.export_service.export, folder, fmt=self.export_format.currentData(),
+                             compress=self.export_gzip.isChecked(), incremental=mode == "incremental", **dates,
+                             on_done=self._export_done, on_error=self._export_failed)
+
+    def _export_done(self, written):
+        self.btn_export.setEnabled(True)
+        lang = self.get_lang() or "ur"
+        rows = sum(info["rows"] for info in written.values())
+        folder = next(iter(written.values()))["file"].parent if written else ""
+        self.lbl_export.setText(f"{t(lang, 'export_done')}: {rows} → {folder}")
+
+    def _export_failed(self, error):
+        self.btn_export.setEnabled(True)
+        instrumentation.error("export", error)
+        self.lbl_export.setText(f"{t(self.get_lang() or 'ur', 'export_failed')}: {error}")
+
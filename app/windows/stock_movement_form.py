@@ -1,21 +1,30 @@
 # app/windows/stock_movement_form.py
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QFormLayout,
-    QLabel, QLineEdit, QPushButton, QComboBox, QMessageBox
+    QLabel, QLineEdit, QPushButton, QComboBox, QMessageBox, QCompleter
 )
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import Qt, pyqtSignal, QTimer, QStringListModel
 from PyQt6.QtGui import QDoubleValidator, QIntValidator
 from app.services.product_service import ProductService
+from app.services.product_index import get_product_index
+from app.services.search_cache import PrefixSearchCache
 from app.services.stock_service import StockService
+from app.utils import instrumentation
 from app.utils.i18n import t
+from app.utils.quantity import MILLI, format_qty, to_decimal, to_milli
+from app.windows.executor import get_executor
 
 
 class StockMovementForm(QWidget):
     """
     Form for recording stock movements. Uses StockService methods to update stock.
-    Emits movement_recorded(product_id:int, new_stock:float) on success.
+    Emits movement_recorded(product_id:int, new_stock_milli:int) on success, the new
+    stock in integer milli-units of the product's base unit (format_qty() to show it).
     """
-    movement_recorded = pyqtSignal(int, float)
+    movement_recorded = pyqtSignal(int, int)
+
+    TYPEAHEAD_DELAY_MS = 150  # pause before a keystroke that misses the cache queries the DB
+    TYPEAHEAD_MIN_CHARS = 2
 
     def __init__(self, on_back=None, get_lang=lambda: "ur", urdu_font_family=None):
         super().__init__()
@@ -25,8 +34,16 @@ class StockMovementForm(QWidget):
 
         self.product_service = ProductService()
         self.stock_service = StockService()
-
-        # currently selected product (None or tuple product row as returned by ProductService.get)
+        self.product_index = get_product_index()
+        self.catalog = self.product_index.catalog  # product records (names, unit, stock) by id
+        self.executor = get_executor()
+        self._find_key = ("stock_find", id(self))
+        self._typeahead_key = ("stock_typeahead", id(self))
+        # type-ahead results; longer prefixes are narrowed in memory from shorter ones
+        self.search_cache = PrefixSearchCache(self.product_service)
+        self._suggestion_ids = {}  # completer text -> product id
+
+        # currently selected product (None or ProductRecord from the catalog cache)
         self.current_product = None
 
         # validators
@@ -76,6 +93,17 @@ class StockMovementForm(QWidget):
         self.btn_find.clicked.connect(self.on_find_product)
         barcode_h = QHBoxLayout()
         barcode_h.addWidget(self.barcode_field)
+
+        # type-ahead: completer fed by PrefixSearchCache; DB queries are debounced
+        self.suggestions = QStringListModel(self)
+        self.completer = QCompleter(self.suggestions, self)
+        self.completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        self.completer.setMaxVisibleItems(self.search_cache.limit)
+        self.barcode_field.setCompleter(self.completer)
+        self._typeahead_timer = QTimer(self)
+        self._typeahead_timer.setSingleShot(True)
+        self._typeahead_timer.setInterval(self.TYPEAHEAD_DELAY_MS)
+        self._typeahead_timer.timeout.connect(self._run_typeahead)
         barcode_h.addWidget(self.btn_find)
 
         self.lbl_product_name = QLabel("—")
@@ -133,6 +161,8 @@ class StockMovementForm(QWidget):
         self.btn_clear.clicked.connect(self.clear_form)
         self.barcode_field.returnPressed.connect(self.on_find_product)
         self.btn_find.clicked.connect(self.on_find_product)
+        self.barcode_field.textEdited.connect(self._on_code_edited)
+        self.completer.activated[str].connect(self._on_suggestion_chosen)
 
         # keep references
         self._form = form_area
@@ -199,16 +229,92 @@ class StockMovementForm(QWidget):
                                 self._label("barcode_required", self.get_lang(), "Please enter barcode or short code"))
             return
 
-        # try exact barcode match first
-        prod = self.product_service.find_by_barcode(code)
-        if prod:
-            product_id = prod[0]
-            prod_full = self.product_service.get(product_id)
+        self._stop_typeahead()
+
+        # exact barcode / short_code hit from the in-memory index (no DB round trip),
+        # or the text of a suggestion picked from the completer
+        prod = self.product_index.lookup(code)
+        if prod is None and code in self._suggestion_ids:
+            prod = self.catalog.get(self._suggestion_ids[code])
+        if prod is not None:
+            self.executor.cancel_key(self._find_key)  # an older search must not overwrite this
+            self._show_product(prod)
+            return
+
+        # free text: search on a worker; a newer lookup supersedes this one
+        self.executor.submit(self.search_cache.search, code,
+                             on_done=self._on_search_done, on_error=self._on_search_failed,
+                             key=self._find_key)
+
+    # -----------------------
+    # Type-ahead
+    # -----------------------
+    def _on_code_edited(self, text):
+        if len(text.strip()) < self.TYPEAHEAD_MIN_CHARS:
+            self._stop_typeahead()
+            self._set_suggestions([])
+            return
+        rows = self.search_cache.peek(text)
+        if rows is not None:
+            # answered from memory: refresh the popup on this keystroke
+            self._typeahead_timer.stop()
+            self.executor.cancel_key(self._typeahead_key)
+            self._set_suggestions(rows)
+        else:
+            self._typeahead_timer.start()  # restart: only query once typing pauses
+
+    def _run_typeahead(self):
+        text = self.barcode_field.text()
+        self.executor.submit(self.search_cache.search, text,
+                             on_done=lambda rows: self._on_typeahead_done(text, rows),
+                             key=self._typeahead_key)
+
+    def _on_typeahead_done(self, text, rows):
+        if self.barcode_field.text() == text:  # ignore results for text already edited away
+            self._set_suggestions(rows)
+
+    def _stop_typeahead(self):
+        self._typeahead_timer.stop()
+        self.executor.cancel_key(self._typeahead_key)
+        self.completer.popup().hide()
+
+    def _set_suggestions(self, rows):
+        lang = self.get_lang() or "ur"
+        self._suggestion_ids = {}
+        for hit in rows:
+            ur_name = (hit.ur_name or "").strip()
+            en_name = (hit.en_name or "").strip()
+            name = en_name if (lang == "en" and en_name) else ur_name or en_name
+            self._suggestion_ids[f"{name} ({hit.short_code or '#' + str(hit.id)})"] = hit.id
+        self.suggestions.setStringList(list(self._suggestion_ids))
+        if self._suggestion_ids and self.barcode_field.hasFocus():
+            self.completer.complete()
         else:
-            rows = self.product_service.search(code, limit=5)
-            prod_full = rows[0] if rows else None
+            self.completer.popup().hide()
+
+    def _on_suggestion_chosen(self, text):
+        product_id = self._suggestion_ids.get(text)
+        prod = None if product_id is None else self.catalog.get(product_id)
+        if prod is not None:
+            self._stop_typeahead()
+            self._show_product(prod)
+
+    def _on_search_done(self, rows):
+        self._show_product(self.catalog.get(rows[0].id) if rows else None)
 
-        if not prod_full:
+    def _on_search_failed(self, error):
+        instrumentation.error("product search", error)
+        lang = self.get_lang() or "ur"
+        QMessageBox.warning(self, self._label("error", lang, "Error"),
+                            f"{self._label('search_failed', lang, 'Product search failed')}\n\n{error}")
+        # no product selected, but not "not found" either: the search itself failed
+        self.current_product = None
+        self.lbl_product_name.setText("—")
+        self.lbl_current_stock.setText("—")
+
+    def _show_product(self, prod):
+        """Populate product name, stock and default unit (or report not found)."""
+        if not prod:
             QMessageBox.information(self, self._label("not_found", self.get_lang(), "Not Found"),
                                     self._label("product_not_found", self.get_lang(), "Product not found"))
             self.current_product = None
@@ -216,23 +322,17 @@ class StockMovementForm(QWidget):
             self.lbl_current_stock.setText("—")
             return
 
-        # product tuple expected as in ProductService.get()
-        self.current_product = prod_full
+        self.current_product = prod
         lang = self.get_lang() or "ur"
-        ur_name = (prod_full[2] or "").strip() if len(prod_full) > 2 else ""
-        en_name = (prod_full[3] or "").strip() if len(prod_full) > 3 else ""
-        display_name = en_name if (lang == "en" and en_name) else ur_name or en_name or prod_full[1] or f"#{prod_full[0]}"
+        ur_name = (prod.ur_name or "").strip()
+        en_name = (prod.en_name or "").strip()
+        display_name = en_name if (lang == "en" and en_name) else ur_name or en_name or prod.short_code or f"#{prod.id}"
         self.lbl_product_name.setText(display_name)
 
-        # set current stock label and default unit (use safe indexes)
-        try:
-            stock_val = float(prod_full[8] or 0.0)
-        except Exception:
-            stock_val = 0.0
-        self.lbl_current_stock.setText(str(stock_val))
+        # set current stock label and default unit
+        self.lbl_current_stock.setText(format_qty(prod.stock_milli or 0))
 
-        unit = prod_full[11] if len(prod_full) > 11 else "kg"
-        self.unit.setText(unit)
+        self.unit.setText(prod.unit or "kg")
 
     # -----------------------
     # Save movement
@@ -252,8 +352,8 @@ class StockMovementForm(QWidget):
             return
 
         try:
-            qty_val = float(qty_text)
-        except Exception:
+            qty_milli = to_milli(qty_text)
+        except ValueError:
             QMessageBox.warning(self, self._label("validation_error", lang, "Validation Error"),
                                 self._label("qty_invalid", lang, "Quantity is invalid"))
             return
@@ -279,75 +379,93 @@ class StockMovementForm(QWidget):
                 return
 
         created_by = (self.created_by.text() or "Admin").strip()
-        product_id = int(self.current_product[0])
-
-        # Decide which stock service method to call:
-        # - If purchase_receipt & incoming and qty is integer -> receive_packs(num_packs)
-        # - If sale & outgoing -> consume_for_sale(abs(qty))
-        # - Otherwise call record_movement with signed qty
-        try:
-            new_stock = None
-            if reason_key == "purchase_receipt" and is_incoming:
-                # Prefer receive_packs when cashier entered number of packs
-                if float(qty_val).is_integer():
-                    num_packs = max(0, int(qty_val))
-                    if num_packs == 0:
-                        raise ValueError("Number of packs must be >= 1")
-                    new_stock = self.stock_service.receive_packs(
-                        product_id=product_id,
-                        num_packs=num_packs,
-                        reason=reason_key,
-                        cost_total=cost_val,
-                        created_by=created_by,
-                        reference_id=ref_id
-                    )
-                else:
-                    # if qty is fractional, fallback to record_movement using base-unit qty
-                    new_stock = self.stock_service.record_movement(
-                        product_id=product_id,
-                        qty=abs(qty_val),
-                        reason=reason_key,
-                        reference_id=ref_id,
-                        related_doc=related_doc if related_doc != "" else None,
-                        unit=self.unit.text() or None,
-                        cost_total=cost_val,
-                        created_by=created_by
-                    )
-            elif reason_key == "sale" and not is_incoming:
-                # sale -> consume stock (consume_for_sale expects a positive qty; it records negative internally)
-                new_stock = self.stock_service.consume_for_sale(
-                    product_id=product_id,
-                    qty=abs(qty_val),
-                    sale_id=ref_id,
-                    created_by=created_by
-                )
-            else:
-                # general movement: sign according to direction
-                movement_qty = abs(qty_val) if is_incoming else -abs(qty_val)
-                new_stock = self.stock_service.record_movement(
+        product_id = int(self.current_product.id)
+        unit = self.unit.text() or None
+
+        # the write runs on a worker; the form stays responsive while SQLite commits
+        self.btn_save.setEnabled(False)
+        self.executor.submit(
+            self._record, product_id, qty_milli, is_incoming, reason_key, ref_id,
+            related_doc if related_doc != "" else None, unit, cost_val, created_by,
+            on_done=lambda new_stock: self._on_saved(product_id, new_stock),
+            on_error=self._on_save_failed,
+        )
+
+    def _record(self, product_id, qty_milli, is_incoming, reason_key, ref_id, related_doc, unit, cost_val, created_by):
+        """
+        Pick the stock service call for the movement and return the new stock (milli-units).
+        Runs on a worker thread: no widget access here.
+        - purchase_receipt & incoming and qty is integer -> receive_packs(num_packs)
+        - sale & outgoing -> consume_for_sale(abs(qty))
+        - otherwise record_movement with signed qty
+        """
+        if reason_key == "purchase_receipt" and is_incoming:
+            # Prefer receive_packs when cashier entered number of packs
+            if qty_milli % MILLI == 0:
+                num_packs = max(0, qty_milli // MILLI)
+                if num_packs == 0:
+                    raise ValueError("Number of packs must be >= 1")
+                return self.stock_service.receive_packs(
                     product_id=product_id,
-                    qty=movement_qty,
+                    num_packs=num_packs,
                     reason=reason_key,
-                    reference_id=ref_id,
-                    related_doc=related_doc if related_doc != "" else None,
-                    unit=self.unit.text() or None,
                     cost_total=cost_val,
-                    created_by=created_by
+                    created_by=created_by,
+                    reference_id=ref_id
                 )
-        except Exception as e:
-            QMessageBox.critical(self, self._label("error", lang, "Error"), str(e))
-            return
+            # if qty is fractional, fallback to record_movement using base-unit qty
+            return self.stock_service.record_movement(
+                product_id=product_id,
+                qty=None,
+                qty_milli=abs(qty_milli),
+                reason=reason_key,
+                reference_id=ref_id,
+                related_doc=related_doc,
+                unit=unit,
+                cost_total=cost_val,
+                created_by=created_by
+            )
+        if reason_key == "sale" and not is_incoming:
+            # sale -> consume stock (consume_for_sale expects a positive qty; it records negative internally)
+            return self.stock_service.consume_for_sale(
+                product_id=product_id,
+                qty=to_decimal(abs(qty_milli)),
+                sale_id=ref_id,
+                created_by=created_by
+            )
+        # general movement: sign according to direction
+        movement_milli = abs(qty_milli) if is_incoming else -abs(qty_milli)
+        return self.stock_service.record_movement(
+            product_id=product_id,
+            qty=None,
+            qty_milli=movement_milli,
+            reason=reason_key,
+            reference_id=ref_id,
+            related_doc=related_doc,
+            unit=unit,
+            cost_total=cost_val,
+            created_by=created_by
+        )
+
+    def _on_save_failed(self, error):
+        self.btn_save.setEnabled(True)
+        lang = self.get_lang() if callable(self.get_lang) else "ur"
+        QMessageBox.critical(self, self._label("error", lang, "Error"), str(error))
+
+    def _on_saved(self, product_id, new_stock):
+        self.btn_save.setEnabled(True)
+        lang = self.get_lang() if callable(self.get_lang) else "ur"
 
         # success
         QMessageBox.information(self, self._label("info", lang, "Info"),
-                                self._label("movement_saved", lang, f"Movement saved. New stock: {new_stock}"))
+                                self._label("movement_saved", lang, f"Movement saved. New stock: {format_qty(new_stock)}"))
 
         # update display of current stock
-        self.lbl_current_stock.setText(str(new_stock))
+        self.lbl_current_stock.setText(format_qty(new_stock))
 
         # emit signal so parent can refresh lists, etc.
         try:
-            self.movement_recorded.emit(product_id, float(new_stock))
+            self.movement_recorded.emit(product_id, int(new_stock))
         except Exception:
             pass
 
@@ -361,6 +479,7 @@ class StockMovementForm(QWidget):
     # Helpers
     # -----------------------
     def clear_form(self):
+        self._stop_typeahead()
         self.barcode_field.clear()
         self.lbl_product_name.setText("—")
         self.lbl_current_stock.setText("—")
@@ -386,6 +505,18 @@ class StockMovementForm(QWidget):
         except Exception:
             pass
 
+    def load_receipt(self, product_id: int, packs: int):
+        """
+        Prepare an incoming purchase receipt of `packs` supply packs of one product
+        (from the reorder suggestions); a whole number here is booked via receive_packs().
+        """
+        self.load_new()
+        self._show_product(self.catalog.get(product_id))
+        self.direction.setCurrentIndex(0)  # Incoming
+        self.reason.setCurrentIndex(max(0, self.reason.findData("purchase_receipt")))
+        self.qty.setText(str(packs))
+        self.qty.setFocus()
+
     def _on_back_clicked(self):
         if callable(self.on_back):
             try:
@@ -0,0 +1,97 @@
+# benchmarks/bench_audit.py
+"""
+Audit overhead on product edits and stock movements: per-event formatted-text
+INSERTs (the old inline audit) vs the buffered AuditLog (one executemany right
+before COMMIT) vs no audit at all. Both audits write one row per movement line.
+
+    python -m benchmarks.bench_audit [ops]
+"""
+import random, sqlite3, statistics, sys, tempfile, time
+from pathlib import Path
+
+from app.services.audit import AuditLog
+from app.services.db_sqlite3 import ConnectionPool
+from app.services.product_service import ProductService
+from app.services.stock_service import StockService
+from init_db import init_db
+
+N_PRODUCTS = 1_000
+LINES_PER_MOVEMENT = 20
+
+
+class InlineAudit:
+    """The old behaviour: one formatted-text INSERT per event, inside the statement flow."""
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def record(self, entity_type, action, entity_id=None, field=None, old=None, new=None, **extra):
+        if field is not None:
+            details = f'{entity_type} {field} with id{entity_id} changed from "{old}" to "{new}"'
+        else:
+            details = f'{entity_type} {action} with id{entity_id} ' + " ".join(f'{k}="{v}"' for k, v in extra.items())
+        with self.pool.transaction() as conn:
+            conn.execute("INSERT INTO audit_logs (entity_type, action, details) VALUES (?, ?, ?)",
+                         (entity_type, action, details))
+
+
+class NoAudit:
+    def __init__(self, pool):
+        pass
+
+    def record(self, *args, **kwargs):
+        pass
+
+
+def seed(db_path):
+    init_db(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO products (ur_name, en_name, sell_price, base_price, stock_milli) VALUES (?, ?, ?, ?, ?)",
+        [(f"p{i}", f"product {i}", 1000, 800, 1_000_000_000) for i in range(N_PRODUCTS)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def run(pool, ops):
+    rnd = random.Random(1)
+    products, stock = ProductService(pool), StockService(pool)
+    edits, moves = [], []
+    for i in range(ops):
+        pid = rnd.randint(1, N_PRODUCTS)
+        start = time.perf_counter()
+        products.update(pid, {"sell_price": 10 + i % 50, "en_name": f"product {pid} v{i}", "reorder_threshold": i % 7})
+        edits.append(time.perf_counter() - start)
+
+        lines = [{"product_id": rnd.randint(1, N_PRODUCTS), "qty": 1, "reason": "adjust"}
+                 for _ in range(LINES_PER_MOVEMENT)]
+        start = time.perf_counter()
+        stock.record_movements(lines)
+        moves.append(time.perf_counter() - start)
+    return statistics.median(edits) * 1000, statistics.median(moves) * 1000
+
+
+def main(ops=300):
+    results = {}
+    for label, audit_cls in (("inline", InlineAudit), ("buffered", AuditLog), ("none", NoAudit)):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = str(Path(tmp) / "bench.db")
+            seed(db_path)
+            pool = ConnectionPool(db_path)
+            pool.audit = audit_cls(pool)
+            results[label] = run(pool, ops)
+            pool.close()
+
+    print(f"{ops} product edits (3 fields) and {ops} stock movements ({LINES_PER_MOVEMENT} lines); median ms per op")
+    print(f"{'audit':>9} {'edit ms':>9} {'movement ms':>12}")
+    for label, (edit_ms, move_ms) in results.items():
+        print(f"{label:>9} {edit_ms:>9.3f} {move_ms:>12.3f}")
+    base_edit, base_move = results["none"]
+    for label in ("inline", "buffered"):
+        edit_ms, move_ms = results[label]
+        print(f"{label} audit overhead: edit +{edit_ms - base_edit:.3f} ms, movement +{move_ms - base_move:.3f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
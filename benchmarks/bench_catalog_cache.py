@@ -0,0 +1,86 @@
+# benchmarks/bench_catalog_cache.py
+"""
+CatalogCache on a 100k-SKU catalog: load time, memory (its own report and what
+tracemalloc saw allocated), and the column filters against the same filter in SQL.
+
+    python -m benchmarks.bench_catalog_cache [num_products]
+"""
+import random, sqlite3, sys, tempfile, time, tracemalloc
+from pathlib import Path
+
+from app.services.catalog_cache import CatalogCache
+from app.services.db_sqlite3 import ConnectionPool
+from app.services.reorder_service import LOW_STOCK_WHERE
+from init_db import init_db
+
+COMPANIES = 200
+ROUNDS = 20
+
+
+def seed(db_path, n_products):
+    init_db(db_path)
+    rnd = random.Random(1)
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO products (short_code, ur_name, en_name, company, barcode, unit, base_price, sell_price, "
+        "stock_milli, reorder_threshold_milli) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [(f"S{i}", f"پروڈکٹ {i} {rnd.choice(['چینی', 'چاول', 'دال', 'صابن'])}", f"product {i}",
+          f"company {rnd.randrange(COMPANIES)}", f"89{i:011d}", rnd.choice(["kg", "pcs", "ltr"]),
+          cost, cost + rnd.randint(0, 5_000), rnd.randrange(0, 50_000), rnd.choice([0, 5_000, 10_000]))
+         for i, cost in ((i, rnd.randint(1_000, 100_000)) for i in range(n_products))],
+    )
+    conn.commit()
+    conn.close()
+
+
+def per_call_ms(fn):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        result = fn()
+    return (time.perf_counter() - start) / ROUNDS * 1000, len(result)
+
+
+def main(n_products=100_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "bench.db")
+        seed(db_path, n_products)
+        pool = ConnectionPool(db_path)
+        cache = CatalogCache(pool)
+        with pool.read():
+            pass  # open the read connection outside the measurements
+
+        start = time.perf_counter()
+        cache.load()
+        load_ms = (time.perf_counter() - start) * 1000
+        cache = CatalogCache(pool)  # again under tracemalloc (slower), for its memory
+        tracemalloc.start()
+        cache.load()
+        held, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        def sql(statement, *params):
+            with pool.read() as conn:
+                return conn.execute(statement, params).fetchall()
+
+        rows = [
+            ("low stock",
+             per_call_ms(cache.low_stock),
+             per_call_ms(lambda: sql(f"SELECT p.id FROM products p WHERE {LOW_STOCK_WHERE}"))),
+            ("by company",
+             per_call_ms(lambda: cache.by_company("company 7")),
+             per_call_ms(lambda: sql("SELECT id FROM products WHERE company = ?", "company 7"))),
+            ("out of stock",
+             per_call_ms(cache.out_of_stock),
+             per_call_ms(lambda: sql("SELECT id FROM products WHERE stock_milli <= 0"))),
+        ]
+        print(f"{n_products} products, load {load_ms:.0f} ms")
+        print(f"tracemalloc: {held / 2 ** 20:.1f} MB held, {peak / 2 ** 20:.1f} MB peak during load")
+        print(cache.format_memory())
+        print(f"{'':>14} {'cache ms':>10} {'SQL ms':>10} {'matches':>8}")
+        for name, (cache_ms, n), (sql_ms, _) in rows:
+            print(f"{name:>14} {cache_ms:>10.2f} {sql_ms:>10.2f} {n:>8}")
+        pool.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
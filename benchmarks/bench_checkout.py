@@ -0,0 +1,55 @@
+# benchmarks/bench_checkout.py
+"""
+SaleService.checkout latency by basket size. Everything is one transaction, so
+the fixed cost (commit, the sales header) is paid once; what is left grows with the
+basket: a sale_items, a stock_movements and an audit_logs row per line (with their
+index entries) and one Python pass pricing the lines. Expect roughly linear, well
+under 0.1 ms a line.
+
+    python -m benchmarks.bench_checkout [checkouts_per_size]
+"""
+import sqlite3, statistics, sys, tempfile, time
+from pathlib import Path
+
+from app.services.db_sqlite3 import ConnectionPool
+from app.services.sale_service import SaleService
+from init_db import init_db
+
+BASKET_SIZES = (1, 10, 50, 150)
+N_PRODUCTS = 500
+
+
+def seed(db_path):
+    init_db(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO products (short_code, ur_name, barcode, sell_price, base_price, stock_milli) VALUES (?, ?, ?, ?, ?, ?)",
+        [(f"P{i}", f"product {i}", f"B{i:08d}", 12_000, 10_000, 1_000_000_000) for i in range(N_PRODUCTS)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def main(checkouts=200):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "bench.db")
+        seed(db_path)
+        pool = ConnectionPool(db_path)
+        sales = SaleService(pool)
+
+        print(f"{'lines':>6} {'median ms':>10} {'p95 ms':>8}")
+        for size in BASKET_SIZES:
+            timings = []
+            for n in range(checkouts):
+                cart = [{"product_id": (n * size + i) % N_PRODUCTS + 1, "qty": 0.25} for i in range(size)]
+                start = time.perf_counter()
+                sales.checkout(cart, payment_method="cash")
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            p95 = timings[int(len(timings) * 0.95) - 1]
+            print(f"{size:>6} {statistics.median(timings):>10.2f} {p95:>8.2f}")
+        pool.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
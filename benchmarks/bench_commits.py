@@ -0,0 +1,77 @@
+# benchmarks/bench_commits.py
+"""
+Commits per second for a record_movement-shaped transaction
+(SELECT, INSERT movement, UPDATE stock, INSERT audit, COMMIT).
+
+Compares the old connection setup (rollback journal, only foreign_keys)
+with the tuned connection from app.services.db_sqlite3.connect().
+
+    python -m benchmarks.bench_commits [num_commits]
+"""
+import sqlite3, sys, tempfile, time
+from datetime import datetime
+from pathlib import Path
+
+from app.services.db_sqlite3 import connect
+from init_db import init_db
+
+
+def legacy_connect(db_path):
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON;")
+    return conn
+
+
+def seed(db_path, n_products=100):
+    init_db(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO products (short_code, ur_name, barcode, stock_milli) VALUES (?, ?, ?, ?)",
+        [(f"P{i}", f"product {i}", f"B{i:08d}", 1_000_000) for i in range(n_products)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def run_movements(conn, num_commits, n_products=100):
+    cur = conn.cursor()
+    start = time.perf_counter()
+    for i in range(num_commits):
+        product_id = (i % n_products) + 1
+        now = datetime.now().isoformat()
+        cur.execute("SELECT unit, stock_milli FROM products WHERE id = ?", (product_id,))
+        unit, stock = cur.fetchone()
+        cur.execute(
+            "INSERT INTO stock_movements (product_id, qty_milli, reason, unit, created_at) VALUES (?, ?, ?, ?, ?)",
+            (product_id, -1000, "sale", unit, now),
+        )
+        cur.execute("UPDATE products SET stock_milli = ?, updated_at = ? WHERE id = ?", (stock - 1000, now, product_id))
+        cur.execute("INSERT INTO audit_logs (entity_type, action, details) VALUES (?, ?, ?)",
+                    ("product", "stock_movement", f"bench movement {i}"))
+        conn.commit()
+    return num_commits / (time.perf_counter() - start)
+
+
+def main(num_commits=2000):
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = str(Path(tmp) / "legacy.db")
+        tuned_path = str(Path(tmp) / "tuned.db")
+        seed(legacy_path)
+        seed(tuned_path)
+
+        conn = legacy_connect(legacy_path)
+        legacy = run_movements(conn, num_commits)
+        conn.close()
+
+        conn = connect(tuned_path)
+        tuned = run_movements(conn, num_commits)
+        conn.close()
+
+    print(f"commits: {num_commits}")
+    print(f"legacy (rollback journal): {legacy:10.0f} commits/s")
+    print(f"tuned  (WAL, NORMAL sync): {tuned:10.0f} commits/s  ({tuned / legacy:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
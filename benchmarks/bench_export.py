@@ -0,0 +1,74 @@
+# benchmarks/bench_export.py
+"""
+Streaming export of a long stock ledger: rows/s and peak Python memory per format,
+against reading the same query with fetchall() first. Speed is timed without
+tracemalloc (it slows allocation-heavy code several times), memory in a second run.
+
+    python -m benchmarks.bench_export [movements]
+"""
+import random, sqlite3, sys, tempfile, time, tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from app.services.db_sqlite3 import ConnectionPool
+from app.services.export import ExportService
+from init_db import init_db
+
+DAYS = 365
+
+
+def seed(db_path, n_products, movements):
+    init_db(db_path)
+    rnd = random.Random(1)
+    conn = sqlite3.connect(db_path)
+    conn.executemany("INSERT INTO products (ur_name) VALUES (?)", [(f"p{i}",) for i in range(n_products)])
+    start = datetime.now() - timedelta(days=DAYS)
+    conn.executemany(
+        "INSERT INTO stock_movements (product_id, qty_milli, reason, related_doc, created_at) VALUES (?, ?, 'sale', ?, ?)",
+        [(rnd.randint(1, n_products), rnd.choice((-1000, -250, 12_000)), f"sale {i}",
+          (start + timedelta(seconds=i * DAYS * 86400 // movements)).isoformat()) for i in range(movements)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def measured(fn):
+    """(result, seconds, peak traced MB)"""
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak / 1024 / 1024
+
+
+def main(movements=500_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "bench.db")
+        seed(db_path, 2_000, movements)
+        pool = ConnectionPool(db_path)
+        service = ExportService(pool)
+
+        def fetch_all():
+            with pool.read() as conn:
+                return len(conn.execute("SELECT * FROM stock_movements ORDER BY id").fetchall())
+
+        print(f"stock_movements: {movements} rows")
+        print(f"{'':>22} {'rows/s':>9} {'peak MB':>8} {'file MB':>8}")
+        rows, seconds, peak = measured(fetch_all)
+        print(f"{'fetchall (no file)':>22} {rows / seconds:>9.0f} {peak:>8.1f} {'':>8}")
+        for fmt, compress in (("csv", False), ("csv", True), ("jsonl", False), ("jsonl", True)):
+            written, seconds, peak = measured(lambda: service.export(
+                Path(tmp) / "out", ["stock_movements"], fmt=fmt, compress=compress))
+            info = written["stock_movements"]
+            label = f"{fmt}{'.gz' if compress else ''}"
+            print(f"{label:>22} {info['rows'] / seconds:>9.0f} {peak:>8.1f} "
+                  f"{info['file'].stat().st_size / 1024 / 1024:>8.1f}")
+        pool.close()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:2]]
+    main(*args)
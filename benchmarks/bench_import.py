@@ -0,0 +1,68 @@
+# benchmarks/bench_import.py
+"""
+Onboarding a wholesaler price list: ProductService.create per row (one commit,
+audit row and event each) against CatalogImporter (one transaction, chunked upsert).
+
+    python -m benchmarks.bench_import [rows]
+"""
+import csv, sys, tempfile, time
+from pathlib import Path
+
+from app.services.catalog_import import CatalogImporter
+from app.services.db_sqlite3 import ConnectionPool
+from app.services.product_service import ProductService
+from init_db import init_db
+
+PER_ROW_SAMPLE = 2_000  # create() is timed on a sample, it is too slow for the full file
+
+
+def write_price_list(path, rows, price_offset=0):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(("barcode", "short_code", "ur_name", "en_name", "company", "cost", "price", "unit", "stock"))
+        for i in range(rows):
+            writer.writerow((f"89{i:011d}", f"S{i}", f"پروڈکٹ {i}", f"product {i}", "شان",
+                             f"{100 + i % 400}.25", f"{120 + i % 400 + price_offset}.50",
+                             "kg" if i % 2 else "pcs", "10" if i % 3 else ""))
+
+
+def main(rows=30_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        prices = Path(tmp) / "prices.csv"
+        write_price_list(prices, rows)
+
+        db_path = str(Path(tmp) / "per_row.db")
+        init_db(db_path)
+        pool = ConnectionPool(db_path)
+        products = ProductService(pool)
+        with open(prices, newline="", encoding="utf-8") as f:
+            sample = [row for _, row in zip(range(PER_ROW_SAMPLE), csv.DictReader(f))]
+        start = time.perf_counter()
+        for row in sample:
+            products.create({"barcode": row["barcode"], "short_code": row["short_code"], "ur_name": row["ur_name"],
+                             "en_name": row["en_name"], "company": row["company"], "base_price": row["cost"],
+                             "sell_price": row["price"], "unit": row["unit"], "stock_qty": row["stock"] or 0})
+        per_row = len(sample) / (time.perf_counter() - start)
+        pool.close()
+
+        db_path = str(Path(tmp) / "import.db")
+        init_db(db_path)
+        pool = ConnectionPool(db_path)
+        importer = CatalogImporter(pool)
+        first = importer.import_file(prices)
+        same = importer.import_file(prices)
+        write_price_list(prices, rows, price_offset=5)
+        changed = importer.import_file(prices)
+        pool.close()
+
+        print(f"price list: {rows} rows")
+        print(f"{'':>28} {'rows/s':>9}")
+        print(f"{'ProductService.create':>28} {per_row:>9.0f}")
+        for label, result in (("import (all new)", first), ("re-import (unchanged)", same),
+                              ("re-import (new prices)", changed)):
+            print(f"{label:>28} {result.rows / result.seconds:>9.0f}   {result!r}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:2]]
+    main(*args)
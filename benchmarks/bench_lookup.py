@@ -0,0 +1,61 @@
+# benchmarks/bench_lookup.py
+"""
+Scanner lookups per second on a 50k-SKU catalog: the old two-query path
+(find_by_barcode + get) against the resident ProductIndex.
+
+    python -m benchmarks.bench_lookup [num_products]
+"""
+import random, sqlite3, sys, tempfile, time
+from pathlib import Path
+
+from app.services.db_sqlite3 import ConnectionPool
+from app.services.product_index import ProductIndex
+from app.services.product_service import ProductService
+from init_db import init_db
+
+SCANS = 20_000
+
+
+def seed(db_path, n_products):
+    init_db(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO products (short_code, ur_name, en_name, barcode, sell_price, stock_milli) VALUES (?, ?, ?, ?, ?, ?)",
+        [(f"S{i}", f"پروڈکٹ {i}", f"product {i}", f"89{i:011d}", 10_000 + i, 50_000) for i in range(n_products)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def main(n_products=50_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "bench.db")
+        seed(db_path, n_products)
+        pool = ConnectionPool(db_path)
+        codes = [f"89{random.randrange(n_products):011d}" for _ in range(SCANS)]
+
+        products = ProductService(pool)
+        start = time.perf_counter()
+        for code in codes:
+            row = products.find_by_barcode(code)
+            products.get(row[0])
+        db_rate = SCANS / (time.perf_counter() - start)
+
+        index = ProductIndex(pool)
+        start = time.perf_counter()
+        index.load()
+        load_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for code in codes:
+            index.lookup(code)
+        index_rate = SCANS / (time.perf_counter() - start)
+        pool.close()
+
+    print(f"catalog: {n_products} products, index load {load_ms:.0f} ms")
+    print(f"find_by_barcode + get: {db_rate:12.0f} scans/s")
+    print(f"ProductIndex.lookup:   {index_rate:12.0f} scans/s  ({index_rate / db_rate:.0f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
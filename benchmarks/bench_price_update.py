@@ -0,0 +1,71 @@
+# benchmarks/bench_price_update.py
+"""
+A +7.5% supplier price change on a 10k-product catalog: ProductService.update per
+product (full-row SELECT + UPDATE + audit events, one commit each) against
+PriceUpdateService (preview, then one UPDATE and one audit batch).
+
+    python -m benchmarks.bench_price_update [num_products]
+"""
+import random, sqlite3, sys, tempfile, time
+from pathlib import Path
+
+from app.services.db_sqlite3 import ConnectionPool
+from app.services.price_update import PriceChange, PriceUpdateService
+from app.services.product_service import ProductService
+from init_db import init_db
+
+COMPANIES = 20
+PER_PRODUCT_SAMPLE = 500  # update() is timed on a sample and extrapolated
+
+
+def seed(db_path, n_products):
+    init_db(db_path)
+    rnd = random.Random(1)
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO products (ur_name, company, base_price, sell_price) VALUES (?, ?, ?, ?)",
+        [(f"p{i}", f"company {i % COMPANIES}", cost, cost + rnd.randint(0, 5_000))
+         for i, cost in ((i, rnd.randint(1_000, 100_000)) for i in range(n_products))],
+    )
+    conn.commit()
+    conn.close()
+
+
+def main(n_products=10_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "bench.db")
+        seed(db_path, n_products)
+        pool = ConnectionPool(db_path)
+
+        products = ProductService(pool)
+        with pool.read() as conn:
+            sample = conn.execute("SELECT id, sell_price FROM products LIMIT ?", (PER_PRODUCT_SAMPLE,)).fetchall()
+        start = time.perf_counter()
+        for pid, sell in sample:
+            products.update(pid, {"sell_price_paisa": (sell * 1075 + 500) // 1000})
+        per_product = (time.perf_counter() - start) / len(sample) * n_products
+
+        service = PriceUpdateService(pool)
+        everything = PriceChange(percent=7.5, round_to=100, rounding="up")
+        one_company = PriceChange(company="company 3", percent=7.5, round_to=100, rounding="up")
+        start = time.perf_counter()
+        rows = service.preview(everything)
+        preview = time.perf_counter() - start
+        start = time.perf_counter()
+        changed = service.apply(everything)
+        apply = time.perf_counter() - start
+        start = time.perf_counter()
+        company_changed = service.apply(one_company)
+        company = time.perf_counter() - start
+        pool.close()
+
+        print(f"{n_products} products, +7.5% rounded up to the rupee")
+        print(f"{'ProductService.update (est.)':>32} {per_product * 1000:>9.0f} ms")
+        print(f"{'preview':>32} {preview * 1000:>9.1f} ms   {len(rows)} rows")
+        print(f"{'apply (all)':>32} {apply * 1000:>9.1f} ms   {changed} products")
+        print(f"{'apply (one company)':>32} {company * 1000:>9.1f} ms   {company_changed} products")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:2]]
+    main(*args)
@@ -0,0 +1,96 @@
+# benchmarks/bench_product_rows.py
+"""
+Rows per second on the product read paths of a 50k-product catalog: the old
+all_products() / get() (17-column SELECT, sqlite3.Row rows read by position) against
+the product_queries statements (list / detail projections, __slots__ records).
+Each path is timed with the statement cache on and, for get(), with it switched off
+(every call parses the SELECT again).
+
+    python -m benchmarks.bench_product_rows [num_products]
+"""
+import random, sqlite3, sys, tempfile, time
+from pathlib import Path
+
+from app.services import product_queries as q
+from app.services.db_sqlite3 import ConnectionPool, STATEMENT_CACHE
+from init_db import init_db
+
+ROUNDS = 5       # best of, for the whole-catalog reads
+LOOKUPS = 20_000
+
+OLD_COLUMNS = """id, short_code, ur_name, en_name, company, barcode,
+                 base_price, sell_price, stock_milli, reorder_threshold_milli,
+                 category_id, unit, custom_packing, packing_size_milli, supply_pack_milli,
+                 created_at, updated_at"""
+OLD_ALL = f"SELECT {OLD_COLUMNS} FROM products ORDER BY ur_name"
+OLD_GET = f"SELECT {OLD_COLUMNS} FROM products WHERE id = ?"
+
+
+def seed(db_path, n_products):
+    init_db(db_path)
+    rnd = random.Random(1)
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO products (short_code, ur_name, en_name, company, barcode, base_price, sell_price, stock_milli) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [(f"S{i}", f"پروڈکٹ {rnd.randrange(10 ** 6)}", f"product {i}", f"company {i % 40}", f"89{i:011d}",
+          10_000 + i, 12_000 + i, rnd.randrange(100_000)) for i in range(n_products)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def best(fn, rounds=ROUNDS):
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(n_products=50_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "bench.db")
+        seed(db_path, n_products)
+        pool = ConnectionPool(db_path)
+        ids = [random.randrange(1, n_products + 1) for _ in range(LOOKUPS)]
+
+        def old_all():
+            # the old callers then read e.g. row[7], row[8]
+            return [(row[7], row[8]) for row in conn.execute(OLD_ALL).fetchall()]
+
+        def new_all():
+            return [(row.sell_price, row.stock_milli) for row in q.PRODUCT_LIST.rows(conn)]
+
+        def old_get():
+            for pid in ids:
+                conn.execute(OLD_GET, (pid,)).fetchone()[7]
+
+        def new_get():
+            for pid in ids:
+                q.PRODUCT_DETAIL.one(conn, (pid,)).sell_price
+
+        results = []
+        with pool.read() as conn:
+            for label, fn, n in (("all_products, 17 cols, sqlite3.Row", old_all, n_products),
+                                 ("all_products, ProductRow", new_all, n_products),
+                                 ("get, 17 cols, sqlite3.Row", old_get, LOOKUPS),
+                                 ("get, ProductDetail", new_get, LOOKUPS)):
+                results.append((label, n / best(fn, ROUNDS if n == n_products else 1)))
+        pool.close()
+
+        # the same lookups with nothing cached: each execute() parses and plans the SELECT
+        for cache, label in ((0, "get, ProductDetail, no statement cache"),
+                             (STATEMENT_CACHE, f"get, ProductDetail, cached_statements={STATEMENT_CACHE}")):
+            conn = sqlite3.connect(db_path, cached_statements=cache)
+            results.append((label, LOOKUPS / best(new_get, 1)))
+            conn.close()
+
+    print(f"{n_products} products")
+    for label, rate in results:
+        print(f"{label:>48} {rate:>12,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,61 @@
+# benchmarks/bench_products_list.py
+"""
+Products list first paint: rows loaded before the table can show anything.
+Old screen: all_products() for the whole catalog. Lazy model: one fetch_page(), and
+what the screen now does, one CatalogCache.page() (ids from the index, rows from the
+loaded cache's columns).
+
+    python -m benchmarks.bench_products_list
+"""
+import sqlite3, tempfile, time, tracemalloc
+from pathlib import Path
+
+from app.services.catalog_cache import CatalogCache
+from app.services.db_sqlite3 import ConnectionPool
+from app.services.product_service import ProductService
+from init_db import init_db
+
+SIZES = (2_000, 20_000, 100_000)
+
+
+def seed(db_path, n_products):
+    init_db(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO products (short_code, ur_name, en_name, company, barcode, sell_price, stock_milli) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [(f"S{i}", f"پروڈکٹ {i:06d}", f"product {i}", "شان", f"89{i:011d}", 10_000 + i, 50_000) for i in range(n_products)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = fn()
+    ms = (time.perf_counter() - start) * 1000
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return len(rows), ms, peak
+
+
+def main():
+    print(f"{'catalog':>8} {'all_products ms':>16} {'MB':>6} {'first page ms':>14} {'MB':>6} {'cache page ms':>14}")
+    for size in SIZES:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = str(Path(tmp) / "bench.db")
+            seed(db_path, size)
+            pool = ConnectionPool(db_path)
+            products = ProductService(pool)
+            products.fetch_page(limit=1)  # open the read connection outside the timings
+            _, all_ms, all_mb = measure(products.all_products)
+            _, page_ms, page_mb = measure(lambda: products.fetch_page(limit=200))
+            cache = CatalogCache(pool)
+            cache.load()
+            _, cache_ms, _ = measure(lambda: cache.page(limit=200))
+            pool.close()
+        print(f"{size:>8} {all_ms:>16.1f} {all_mb:>6.1f} {page_ms:>14.2f} {page_mb:>6.2f} {cache_ms:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
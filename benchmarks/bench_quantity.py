@@ -0,0 +1,62 @@
+# benchmarks/bench_quantity.py
+"""
+REAL base-unit quantities against integer milli-units (migration 8): per-product
+SUM over stock_movements and the error left after many 0.25 kg movements.
+
+    python -m benchmarks.bench_quantity [num_products] [movements]
+"""
+import random, sqlite3, statistics, sys, tempfile, time
+from pathlib import Path
+
+from app.utils.quantity import format_qty, to_milli
+
+QUANTITIES = (0.25, 0.1, -0.35, 1.5, -0.05)
+
+
+def seed(db_path, n_products, movements):
+    rnd = random.Random(1)
+    rows = [(rnd.randint(1, n_products), rnd.choice(QUANTITIES)) for _ in range(movements)]
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE real_movements (product_id INTEGER, qty REAL)")
+    conn.execute("CREATE TABLE milli_movements (product_id INTEGER, qty_milli INTEGER)")
+    conn.executemany("INSERT INTO real_movements VALUES (?, ?)", rows)
+    conn.executemany("INSERT INTO milli_movements VALUES (?, ?)", [(pid, to_milli(qty)) for pid, qty in rows])
+    conn.execute("CREATE INDEX real_movements_idx ON real_movements(product_id, qty)")
+    conn.execute("CREATE INDEX milli_movements_idx ON milli_movements(product_id, qty_milli)")
+    conn.commit()
+    return conn
+
+
+def timed(fn, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main(n_products=5_000, movements=1_000_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = seed(str(Path(tmp) / "bench.db"), n_products, movements)
+        by_real = "SELECT product_id, SUM(qty) FROM real_movements GROUP BY product_id"
+        by_milli = "SELECT product_id, SUM(qty_milli) FROM milli_movements GROUP BY product_id"
+        real = dict(conn.execute(by_real).fetchall())
+        milli = dict(conn.execute(by_milli).fetchall())
+        off = [pid for pid in milli if real[pid] * 1000 != milli[pid]]
+        worst = max(abs(real[pid] * 1000 - milli[pid]) for pid in milli)
+
+        print(f"{n_products} products, {movements} movements of {', '.join(map(str, QUANTITIES))}")
+        print(f"{'':>22} {'REAL ms':>9} {'milli ms':>9}")
+        print(f"{'SUM by product':>22} {timed(lambda: conn.execute(by_real).fetchall()):>9.1f} "
+              f"{timed(lambda: conn.execute(by_milli).fetchall()):>9.1f}")
+        print(f"{'SUM all':>22} {timed(lambda: conn.execute('SELECT SUM(qty) FROM real_movements').fetchone()):>9.1f} "
+              f"{timed(lambda: conn.execute('SELECT SUM(qty_milli) FROM milli_movements').fetchone()):>9.1f}")
+        print(f"REAL sums not exact for {len(off)} of {len(milli)} products "
+              f"(worst off by {worst:.3g} milli); total {format_qty(sum(milli.values()))}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,83 @@
+# benchmarks/bench_reorder.py
+"""
+Low-stock count and reorder suggestions on a 100k-product catalog with a year of
+sale movements: full-table scan + one velocity query per product against the
+partial index and single grouped join (migration 4, ReorderService).
+
+    python -m benchmarks.bench_reorder [num_products]
+"""
+import random, sqlite3, statistics, sys, tempfile, time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from app.services.db_sqlite3 import ConnectionPool
+from app.services.reorder_service import ReorderService
+from init_db import init_db
+
+LOW_SHARE = 0.005
+MOVEMENTS = 300_000
+
+
+def seed(db_path, n_products):
+    init_db(db_path)
+    rnd = random.Random(1)
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO products (ur_name, stock_milli, reorder_threshold_milli, supply_pack_milli) VALUES (?, ?, ?, ?)",
+        [(f"p{i}", 5_000 if rnd.random() < LOW_SHARE else 100_000, 10_000, 12_000) for i in range(n_products)],
+    )
+    start = datetime.now() - timedelta(days=365)
+    conn.executemany(
+        "INSERT INTO stock_movements (product_id, qty_milli, reason, created_at) VALUES (?, ?, 'sale', ?)",
+        [(rnd.randint(1, n_products), -rnd.randint(1, 3) * 1000,
+          (start + timedelta(minutes=i * 365 * 24 * 60 // MOVEMENTS)).isoformat()) for i in range(MOVEMENTS)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def naive(pool, window_days=30):
+    since = (datetime.now() - timedelta(days=window_days)).isoformat()
+    with pool.read() as conn:
+        low = conn.execute("""
+            SELECT id, stock_milli, reorder_threshold_milli FROM products
+            WHERE +stock_milli <= +reorder_threshold_milli AND +reorder_threshold_milli > 0
+        """).fetchall()
+        out = []
+        for product_id, _, _ in low:
+            sold = conn.execute("""
+                SELECT -SUM(qty_milli) FROM stock_movements NOT INDEXED
+                WHERE product_id = ? AND reason = 'sale' AND created_at >= ?
+            """, (product_id, since)).fetchone()[0]
+            out.append((product_id, sold))
+    return out
+
+
+def timed(fn, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main(n_products=100_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "bench.db")
+        seed(db_path, n_products)
+        pool = ConnectionPool(db_path)
+        reorder = ReorderService(pool)
+        low = reorder.low_stock_count()
+        print(f"catalog: {n_products} products ({low} low), {MOVEMENTS} sale movements")
+        print(f"{'':>22} {'scan ms':>9} {'indexed ms':>11}")
+        with pool.read() as conn:
+            count_scan = timed(lambda: conn.execute(
+                "SELECT COUNT(*) FROM products WHERE +stock_milli <= +reorder_threshold_milli AND +reorder_threshold_milli > 0").fetchone())
+        print(f"{'low-stock count':>22} {count_scan:>9.1f} {timed(reorder.low_stock_count):>11.2f}")
+        print(f"{'reorder suggestions':>22} {timed(lambda: naive(pool), repeat=1):>9.1f} {timed(reorder.suggestions):>11.2f}")
+        pool.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
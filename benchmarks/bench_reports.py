@@ -0,0 +1,114 @@
+# benchmarks/bench_reports.py
+"""
+Month / year profit report and top-10 products: computed from sale_items against
+ReportService on the daily aggregates (migration 3). Also times a full rebuild.
+
+    python -m benchmarks.bench_reports [days] [sales_per_day]
+"""
+import random, sqlite3, statistics, sys, tempfile, time
+from datetime import date, timedelta
+from pathlib import Path
+
+from app.services.db_sqlite3 import ConnectionPool
+from app.services.report_service import ReportService
+from app.services.sales_aggregates import rebuild
+from init_db import init_db
+
+N_PRODUCTS = 2_000
+LINES_PER_SALE = 5
+
+
+def seed(db_path, days, sales_per_day):
+    init_db(db_path)
+    rnd = random.Random(1)
+    conn = sqlite3.connect(db_path)
+    conn.executemany("INSERT INTO categories (name) VALUES (?)", [(f"cat {i}",) for i in range(20)])
+    conn.executemany(
+        "INSERT INTO products (ur_name, sell_price, base_price, category_id) VALUES (?, ?, ?, ?)",
+        [(f"p{i}", 1000 + i, 800 + i, i % 20 + 1) for i in range(N_PRODUCTS)],
+    )
+    first = date.today() - timedelta(days=days - 1)
+    sale_id = 0
+    for d in range(days):
+        day = (first + timedelta(days=d)).isoformat()
+        sales, items = [], []
+        for s in range(sales_per_day):
+            sale_id += 1
+            created_at = f"{day}T{8 + s * 12 // sales_per_day:02d}:00:00"
+            total = 0
+            for _ in range(LINES_PER_SALE):
+                pid = rnd.randint(1, N_PRODUCTS)
+                qty = rnd.randint(1, 5)
+                line_total = qty * (1000 + pid)
+                total += line_total
+                items.append((sale_id, pid, qty * 1000, "pcs", 1000 + pid, 800 + pid, line_total,
+                              qty * (800 + pid), 0, line_total, created_at))
+            sales.append((sale_id, created_at, total, total))
+        conn.executemany("INSERT INTO sales (id, created_at, total_before_discounts, charged_total) VALUES (?, ?, ?, ?)", sales)
+        conn.executemany("""
+            INSERT INTO sale_items (sale_id, product_id, qty_milli, input_unit, price_per_unit, base_price_per_unit,
+                                    line_total, line_cost_total, line_discount, line_charged, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, items)
+    conn.commit()
+    conn.close()
+
+
+def raw_report(pool, start, end):
+    # what a report without aggregates has to do: scan the range of sale_items
+    end_next = (date.fromisoformat(end) + timedelta(days=1)).isoformat()
+    with pool.read() as conn:
+        totals = conn.execute("""
+            SELECT SUM(line_charged), SUM(line_cost_total) FROM sale_items
+            WHERE created_at >= ? AND created_at < ?
+        """, (start, end_next)).fetchone()
+        top = conn.execute("""
+            SELECT product_id, SUM(line_charged) AS s FROM sale_items
+            WHERE created_at >= ? AND created_at < ?
+            GROUP BY product_id ORDER BY s DESC LIMIT 10
+        """, (start, end_next)).fetchall()
+    return totals, top
+
+
+def agg_report(reports, start, end):
+    return reports.summary(start, end), reports.top_products(start, end, 10)
+
+
+def timed(fn, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main(days=365, sales_per_day=200):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "bench.db")
+        seed(db_path, days, sales_per_day)
+        pool = ConnectionPool(db_path)
+        start = time.perf_counter()
+        with pool.transaction() as conn:
+            rebuild(conn)
+        rebuild_s = time.perf_counter() - start
+        reports = ReportService(pool)
+
+        today = date.today()
+        ranges = {
+            "month": ((today - timedelta(days=29)).isoformat(), today.isoformat()),
+            "year": ((today - timedelta(days=days - 1)).isoformat(), today.isoformat()),
+        }
+        print(f"{days} days x {sales_per_day} sales x {LINES_PER_SALE} lines = "
+              f"{days * sales_per_day * LINES_PER_SALE} sale_items; full rebuild {rebuild_s:.2f}s")
+        print(f"{'range':>6} {'sale_items ms':>14} {'aggregates ms':>14}")
+        for label, (first, last) in ranges.items():
+            raw_ms = timed(lambda: raw_report(pool, first, last))
+            agg_ms = timed(lambda: agg_report(reports, first, last))
+            print(f"{label:>6} {raw_ms:>14.1f} {agg_ms:>14.2f}")
+        pool.close()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
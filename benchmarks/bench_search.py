@@ -0,0 +1,72 @@
+# benchmarks/bench_search.py
+"""
+ProductService.search latency on a 100k-product catalog: the old LIKE '%term%'
+scan against the FTS5 index (migration 1).
+
+    python -m benchmarks.bench_search [num_products]
+"""
+import random, sqlite3, statistics, sys, tempfile, time
+from pathlib import Path
+
+from app.services.db_sqlite3 import ConnectionPool
+from app.services.product_service import ProductService
+from init_db import init_db
+
+UR_WORDS = ["چینی", "چاول", "آٹا", "دال", "مرچ", "نمک", "گھی", "تیل", "صابن", "بسکٹ", "چائے", "دودھ", "مصالحہ", "پاؤڈر"]
+EN_WORDS = ["sugar", "rice", "flour", "lentil", "chilli", "salt", "ghee", "oil", "soap", "biscuit", "tea", "milk", "masala", "powder"]
+COMPANIES = ["نیشنل", "شان", "نیسلے", "ڈالڈا", "لپٹن", "کے اینڈ این"]
+TERMS = ["چی", "مرچ", "دال چا", "sug", "powder", "شان", "890012"]
+
+
+def seed(db_path, n_products):
+    init_db(db_path)
+    rnd = random.Random(1)
+    conn = sqlite3.connect(db_path)
+    rows = []
+    for i in range(n_products):
+        w = rnd.sample(range(len(UR_WORDS)), 2)
+        rows.append((f"S{i}", f"{UR_WORDS[w[0]]} {UR_WORDS[w[1]]} {i}", f"{EN_WORDS[w[0]]} {EN_WORDS[w[1]]} {i}",
+                     rnd.choice(COMPANIES), f"89{i:011d}"))
+    conn.executemany("INSERT INTO products (short_code, ur_name, en_name, company, barcode) VALUES (?, ?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+
+def like_search(pool, term, limit=50):
+    q = f"%{term}%"
+    with pool.read() as conn:
+        return conn.execute("""
+            SELECT id, short_code, ur_name, en_name, company, barcode, sell_price, stock_milli
+            FROM products
+            WHERE ur_name LIKE ? OR en_name LIKE ? OR barcode LIKE ? OR short_code LIKE ?
+            ORDER BY ur_name LIMIT ?
+        """, (q, q, q, q, limit)).fetchall()
+
+
+def timed(fn, repeat=20):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main(n_products=100_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "bench.db")
+        seed(db_path, n_products)
+        pool = ConnectionPool(db_path)
+        products = ProductService(pool)
+
+        print(f"catalog: {n_products} products (median ms, limit 50)")
+        print(f"{'term':>10} {'LIKE':>9} {'FTS5':>9}")
+        for term in TERMS:
+            like_ms = timed(lambda: like_search(pool, term))
+            fts_ms = timed(lambda: products.search(term))
+            print(f"{term:>10} {like_ms:>9.2f} {fts_ms:>9.2f}")
+        pool.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,90 @@
+# benchmarks/bench_stock_ledger.py
+"""
+Stock of a product on a past date and a full stock_milli reconciliation: re-summing
+stock_movements against StockLedgerService on daily snapshots (migration 7).
+
+    python -m benchmarks.bench_stock_ledger [num_products] [movements]
+"""
+import random, sqlite3, statistics, sys, tempfile, time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from app.services.db_sqlite3 import ConnectionPool
+from app.services.stock_ledger import StockLedgerService, next_day
+from init_db import init_db
+
+DAYS = 365
+
+
+def seed(db_path, n_products, movements):
+    init_db(db_path)
+    rnd = random.Random(1)
+    conn = sqlite3.connect(db_path)
+    conn.executemany("INSERT INTO products (ur_name) VALUES (?)", [(f"p{i}",) for i in range(n_products)])
+    start = datetime.now() - timedelta(days=DAYS)
+    conn.executemany(
+        "INSERT INTO stock_movements (product_id, qty_milli, reason, created_at) VALUES (?, ?, 'sale', ?)",
+        [(rnd.randint(1, n_products), rnd.choice((-1000, -2000, 12_000)),
+          (start + timedelta(seconds=i * DAYS * 86400 // movements)).isoformat()) for i in range(movements)],
+    )
+    conn.execute("""
+        UPDATE products SET stock_milli = COALESCE((SELECT SUM(qty_milli) FROM stock_movements m
+                                                    WHERE m.product_id = products.id), 0)
+    """)
+    conn.commit()
+    conn.close()
+
+
+def resum_as_of(pool, product_id, day):
+    with pool.read() as conn:
+        return conn.execute("""
+            SELECT COALESCE(SUM(qty_milli), 0) FROM stock_movements NOT INDEXED
+            WHERE product_id = ? AND created_at < ?
+        """, (product_id, next_day(day))).fetchone()[0]
+
+
+def resum_reconcile(pool):
+    with pool.read() as conn:
+        return conn.execute("""
+            SELECT p.id FROM products p
+            LEFT JOIN (SELECT product_id, SUM(qty_milli) AS qty_milli FROM stock_movements GROUP BY product_id) m
+                   ON m.product_id = p.id
+            WHERE p.stock_milli <> COALESCE(m.qty_milli, 0)
+        """).fetchall()
+
+
+def timed(fn, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main(n_products=5_000, movements=1_000_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "bench.db")
+        seed(db_path, n_products, movements)
+        pool = ConnectionPool(db_path)
+        ledger = StockLedgerService(pool)
+        start = time.perf_counter()
+        ledger.close_day((date.today() - timedelta(days=DAYS)).isoformat())
+        ledger.close_pending()
+        close_s = time.perf_counter() - start
+
+        rnd = random.Random(2)
+        queries = [(rnd.randint(1, n_products), (date.today() - timedelta(days=rnd.randint(1, DAYS))).isoformat())
+                   for _ in range(20)]
+        print(f"{n_products} products, {movements} movements over {DAYS} days; closing {DAYS} days took {close_s:.2f}s")
+        print(f"{'':>18} {'re-sum ms':>10} {'ledger ms':>10}")
+        resum = timed(lambda: [resum_as_of(pool, *q) for q in queries], repeat=1) / len(queries)
+        snap = timed(lambda: [ledger.stock_as_of(*q) for q in queries]) / len(queries)
+        print(f"{'stock as of date':>18} {resum:>10.2f} {snap:>10.3f}")
+        print(f"{'reconcile all':>18} {timed(lambda: resum_reconcile(pool)):>10.1f} {timed(ledger.reconcile):>10.1f}")
+        pool.close()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,63 @@
+# benchmarks/bench_typeahead.py
+"""
+Type-ahead cost per keystroke on a 50k-product catalog: ProductService.search on
+every keystroke against PrefixSearchCache (DB for a prefix until it is complete,
+then in-memory narrowing).
+
+    python -m benchmarks.bench_typeahead [num_products]
+"""
+import statistics, sys, tempfile, time
+from pathlib import Path
+
+from app.services.db_sqlite3 import ConnectionPool
+from app.services.product_service import ProductService
+from app.services.search_cache import PrefixSearchCache
+from benchmarks.bench_search import seed
+
+TYPED = ["چینی دال", "مصالحہ", "sugar tea 12", "biscuit", "890001234"]
+
+
+def keystrokes(word):
+    return [word[:i] for i in range(2, len(word) + 1)]
+
+
+def run(fn, typed):
+    timings = []
+    for word in typed:
+        for text in keystrokes(word):
+            start = time.perf_counter()
+            fn(text)
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main(n_products=50_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "bench.db")
+        seed(db_path, n_products)
+        pool = ConnectionPool(db_path)
+        products = ProductService(pool)
+        products.search("warm up")
+
+        direct = run(lambda text: products.search(text, limit=10), TYPED)
+        cache = PrefixSearchCache(products)
+        db_queries = []
+        search = products.search
+        products.search = lambda *a, **kw: db_queries.append(a) or search(*a, **kw)
+        cached = run(cache.search, TYPED)
+        first_pass = len(db_queries)
+        # the same words again (cashiers look up the same items all day): all from memory
+        again = run(cache.search, TYPED)
+        pool.close()
+
+    print(f"catalog: {n_products} products, {len(direct)} keystrokes")
+    print(f"{'':>24} {'median ms':>10} {'p95 ms':>8} {'max ms':>8} {'DB queries':>11}")
+    for label, timings, queries in (("search per keystroke", direct, len(direct)),
+                                    ("PrefixSearchCache", cached, first_pass),
+                                    ("PrefixSearchCache again", again, len(db_queries) - first_pass)):
+        p95 = statistics.quantiles(timings, n=20)[-1]
+        print(f"{label:>24} {statistics.median(timings):>10.2f} {p95:>8.2f} {max(timings):>8.2f} {queries:>11}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
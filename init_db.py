@@ -1,6 +1,7 @@
 # init_db.py
 import sqlite3, os, sys
 from pathlib import Path
+from app.services.migrations import migrate
 
 ROOT = Path(__file__).parent
 SCHEMA = ROOT / "schema.sql"
@@ -19,6 +20,7 @@ def init_db(db_path=None):
         sql = f.read()
     conn.executescript(sql)
     conn.commit()
+    migrate(conn)
     conn.close()
     print("Initialized DB at:", db_path)
 
@@ -1,11 +1,18 @@
 # main.py (root of Kiryana Store)
-import sys, os
+from app.utils import startup  # first: starts the cold-start clock
+import logging, sys, os
 from PyQt6.QtWidgets import QApplication
 from PyQt6.QtGui import QFontDatabase, QFont
-from PyQt6.QtCore import QLocale
-from app.services.db_sqlite3 import get_connection
+from PyQt6.QtCore import QLocale, QTimer
+from app.services.db_sqlite3 import get_pool
+from app.services.migrations import migrate
 from app.services.auth_service_sqlite3 import AuthServiceSQLite3
+from app.services.kpis import get_kpis
+from app.services.stock_ledger import StockLedgerService
+from app.services.product_index import get_product_index
+from app.windows.executor import get_executor
 from app.windows.login_screen import LoginScreen
+startup.mark("imports")
 
 def resource_path(rel):
     if hasattr(sys, "_MEIPASS"):
@@ -24,14 +31,20 @@ def load_urdu_font():
     return None
 
 def main():
+    # handled errors (app.utils.instrumentation.error) go to stderr with their traceback
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
     app = QApplication(sys.argv)
     QLocale.setDefault(QLocale(QLocale.Language.Urdu))
+    startup.mark("qt")
 
     # ensure DB exists (use init_db.py or call schema here)
     # if DB not created, you should run init_db.py once beforehand.
-    conn = get_connection()  # will fail if DB not initialized; run init_db.py first
-    auth = AuthServiceSQLite3()
+    pool = get_pool()  # will fail if DB not initialized; run init_db.py first
+    with pool.write() as conn:
+        migrate(conn)  # upgrade existing shop.db files in place
+    auth = AuthServiceSQLite3(pool)
     auth.ensure_default_user("Admin", "admin")
+    startup.mark("database")
 
     urdu_font = load_urdu_font()
     if urdu_font:
@@ -42,9 +55,20 @@ def main():
         # Try values between: 1.0 – 2.5 for best look
 
         app.setFont(font)
+    startup.mark("font")
 
     login = LoginScreen(urdu_font_family=urdu_font)
     login.show()
+    # runs once the event loop has painted the login window
+    QTimer.singleShot(0, lambda: (startup.mark("login window shown"),
+                                  startup.report(budget=startup.STARTUP_BUDGET_S)))
+    # while the password is typed: the day close for the days since the last run, the
+    # barcode/short-code index (before the first scan) and today's KPIs (dashboard), in
+    # the background
+    executor = get_executor()
+    executor.submit(StockLedgerService(pool).close_pending)
+    executor.submit(get_product_index)
+    executor.submit(get_kpis)
     sys.exit(app.exec())
 
 if __name__ == "__main__":